@@ -4,15 +4,32 @@ import traceback
 import random
 from logging.handlers import RotatingFileHandler
 from flask import Flask, request, jsonify, send_from_directory, session
+from flask.sessions import SessionInterface, SessionMixin
 from flask_cors import CORS
 from flask_sqlalchemy import SQLAlchemy
-from sqlalchemy import JSON, func
-from datetime import datetime, timedelta
+from sqlalchemy import JSON, func, event, update, case, inspect as sa_inspect
+from sqlalchemy.exc import DBAPIError
+from datetime import datetime, date, timedelta
 from dotenv import load_dotenv
 from functools import wraps
 from werkzeug.utils import secure_filename
+from werkzeug.middleware.proxy_fix import ProxyFix
 import bcrypt
 import secrets
+import threading
+import time
+import copy
+import json
+import calendar
+import sqlite3
+import re
+import hashlib
+import bisect
+import base64
+import gzip
+import tempfile
+from collections import deque, namedtuple
+from concurrent.futures import ThreadPoolExecutor, TimeoutError as FutureTimeoutError
 
 load_dotenv()
 
@@ -77,7 +94,15 @@ WEB_DIR = os.path.join(PARENT_DIR, 'web')
 UPLOAD_FOLDER = os.path.join(APP_DIR, 'uploads')
 
 app = Flask(__name__, static_folder=WEB_DIR, static_url_path='')
-CORS(app, resources={r"/api/*": {"origins": "*"}}, supports_credentials=True)
+
+# Number of reverse proxies in front of the app (0 = clients connect directly).
+# With N > 0 the client address is taken from the N-th X-Forwarded-For entry
+# from the right, so rate limits see real clients instead of the proxy.
+TRUSTED_PROXIES = int(os.getenv('TRUSTED_PROXIES', '0'))
+if TRUSTED_PROXIES > 0:
+    app.wsgi_app = ProxyFix(app.wsgi_app, x_for=TRUSTED_PROXIES, x_proto=TRUSTED_PROXIES, x_host=TRUSTED_PROXIES)
+CORS(app, resources={r"/api/*": {"origins": "*"}}, supports_credentials=True,
+     expose_headers=['ETag', 'X-Next-Cursor', 'X-Total-Count'])
 
 # Secret key for sessions
 app.config['SECRET_KEY'] = os.getenv('SECRET_KEY', secrets.token_hex(32))
@@ -109,18 +134,445 @@ app.config['SQLALCHEMY_TRACK_MODIFICATIONS'] = False
 db = SQLAlchemy(app)
 
 # Password Hashing Utilities
+# The bcrypt work factor is calibrated once per process so a verification
+# costs about BCRYPT_TARGET_MS on this hardware. BCRYPT_ROUNDS pins it instead;
+# pin it for multi-worker / multi-node deployments so every process hashes
+# with the same cost. Stored hashes are only ever upgraded, never downgraded.
+BCRYPT_TARGET_MS = float(os.getenv('BCRYPT_TARGET_MS', '250'))
+BCRYPT_MIN_ROUNDS = int(os.getenv('BCRYPT_MIN_ROUNDS', '10'))
+BCRYPT_MAX_ROUNDS = int(os.getenv('BCRYPT_MAX_ROUNDS', '15'))
+
+_bcrypt_rounds = None
+_bcrypt_rounds_lock = threading.Lock()
+
+
+def calibrate_bcrypt_rounds():
+    """Pick the largest work factor whose hash time stays within BCRYPT_TARGET_MS"""
+    global _bcrypt_rounds
+    pinned = os.getenv('BCRYPT_ROUNDS')
+    if pinned:
+        rounds = int(pinned)
+    else:
+        # Each extra round doubles the cost, so one timing at the minimum is enough
+        sample = b'calibration-sample'
+        salt = bcrypt.gensalt(rounds=BCRYPT_MIN_ROUNDS)
+        elapsed_ms = None
+        for _ in range(2):
+            started = time.perf_counter()
+            bcrypt.hashpw(sample, salt)
+            took = (time.perf_counter() - started) * 1000
+            elapsed_ms = took if elapsed_ms is None else min(elapsed_ms, took)
+        rounds = BCRYPT_MIN_ROUNDS
+        while rounds < BCRYPT_MAX_ROUNDS and elapsed_ms * 2 <= BCRYPT_TARGET_MS:
+            rounds += 1
+            elapsed_ms *= 2
+        logger.info(f"bcrypt work factor calibrated to {rounds} (~{elapsed_ms:.0f}ms per hash)")
+    with _bcrypt_rounds_lock:
+        _bcrypt_rounds = rounds
+    return rounds
+
+
+def get_bcrypt_rounds():
+    """Calibrated bcrypt work factor (calibrates lazily on first use)"""
+    if _bcrypt_rounds is None:
+        return calibrate_bcrypt_rounds()
+    return _bcrypt_rounds
+
+
+def password_needs_rehash(password_hash):
+    """True when a stored hash was made with a lower work factor than the current one"""
+    try:
+        return int(password_hash.split('$')[2]) < get_bcrypt_rounds()
+    except (AttributeError, IndexError, ValueError):
+        return False
+
+
 def hash_password(password):
     """Hash password using bcrypt"""
-    return bcrypt.hashpw(password.encode('utf-8'), bcrypt.gensalt()).decode('utf-8')
+    return bcrypt.hashpw(password.encode('utf-8'), bcrypt.gensalt(rounds=get_bcrypt_rounds())).decode('utf-8')
 
 def verify_password(password, password_hash):
     """Verify password against hash"""
     return bcrypt.checkpw(password.encode('utf-8'), password_hash.encode('utf-8'))
 
+
+# ============================================================================
+# PASSWORD HASHING POOL
+# bcrypt is CPU-bound, so login verification runs on a small bounded thread
+# pool (bcrypt releases the GIL). When every worker is busy and the wait queue
+# is full, callers get PasswordPoolBusy and the endpoint answers 429 instead
+# of tying up the request worker.
+# ============================================================================
+PASSWORD_POOL_WORKERS = int(os.getenv('PASSWORD_POOL_WORKERS', str(min(4, os.cpu_count() or 1))))
+PASSWORD_POOL_QUEUE = int(os.getenv('PASSWORD_POOL_QUEUE', '32'))
+PASSWORD_POOL_TIMEOUT = float(os.getenv('PASSWORD_POOL_TIMEOUT', '10'))
+PASSWORD_RETRY_AFTER = int(os.getenv('PASSWORD_RETRY_AFTER', '2'))
+
+
+class PasswordPoolBusy(Exception):
+    """Raised when the password pool cannot admit another job"""
+
+
+class PasswordPool:
+    """Bounded executor for bcrypt work with admission control and latency metrics"""
+
+    def __init__(self, workers, queue_size, timeout):
+        self.workers = max(1, workers)
+        self.queue_size = max(0, queue_size)
+        self.timeout = timeout
+        self._executor = ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix='bcrypt')
+        self._slots = threading.BoundedSemaphore(self.workers + self.queue_size)
+        self._lock = threading.Lock()
+        self._admitted = 0
+        self._running = 0
+        self._completed = 0
+        self._rejected = 0
+        self._total_ms = 0.0
+        self._max_ms = 0.0
+        self._recent_ms = deque(maxlen=256)
+
+    def run(self, fn, *args):
+        """Run fn(*args) on the pool and wait for the result, or raise PasswordPoolBusy"""
+        if not self._slots.acquire(blocking=False):
+            with self._lock:
+                self._rejected += 1
+            raise PasswordPoolBusy()
+        with self._lock:
+            self._admitted += 1
+        try:
+            future = self._executor.submit(self._timed, fn, args)
+        except RuntimeError:
+            self._finish(None)
+            raise PasswordPoolBusy()
+        try:
+            return future.result(timeout=self.timeout)
+        except FutureTimeoutError:
+            with self._lock:
+                self._rejected += 1
+            raise PasswordPoolBusy()
+
+    def verify(self, password, password_hash):
+        return self.run(verify_password, password, password_hash)
+
+    def _timed(self, fn, args):
+        with self._lock:
+            self._running += 1
+        started = time.perf_counter()
+        try:
+            return fn(*args)
+        finally:
+            self._finish((time.perf_counter() - started) * 1000)
+
+    def _finish(self, elapsed_ms):
+        with self._lock:
+            self._admitted -= 1
+            if elapsed_ms is not None:
+                self._running -= 1
+                self._completed += 1
+                self._total_ms += elapsed_ms
+                self._max_ms = max(self._max_ms, elapsed_ms)
+                self._recent_ms.append(elapsed_ms)
+        self._slots.release()
+
+    def metrics(self):
+        with self._lock:
+            recent = sorted(self._recent_ms)
+            return {
+                'workers': self.workers,
+                'queueCapacity': self.queue_size,
+                'running': self._running,
+                'queueDepth': self._admitted - self._running,
+                'completed': self._completed,
+                'rejected': self._rejected,
+                'avgHashMs': round(self._total_ms / self._completed, 2) if self._completed else 0,
+                'p95HashMs': round(recent[min(len(recent) - 1, int(len(recent) * 0.95))], 2) if recent else 0,
+                'maxHashMs': round(self._max_ms, 2)
+            }
+
+
+password_pool = PasswordPool(PASSWORD_POOL_WORKERS, PASSWORD_POOL_QUEUE, PASSWORD_POOL_TIMEOUT)
+
+
+def rehash_password_if_needed(user, password):
+    """After a successful login, upgrade a hash made with a stale work factor.
+    The caller commits. Returns True when the hash was replaced."""
+    if not password_needs_rehash(user.password_hash):
+        return False
+    try:
+        user.password_hash = password_pool.run(hash_password, password)
+    except PasswordPoolBusy:
+        return False  # Keep the old hash; the next login retries
+    return True
+
+
+def too_many_requests(payload, retry_after):
+    """Build a 429 response carrying a Retry-After header"""
+    response = jsonify(payload)
+    response.status_code = 429
+    response.headers['Retry-After'] = str(max(1, int(retry_after)))
+    return response
+
 def generate_temp_password(prefix="TEMP"):
     """Generate temporary password"""
     return f"{prefix}{secrets.token_hex(4).upper()}@123"
 
+# ============================================================================
+# PRINCIPAL CACHE
+# Compact (user id, role, is_active, profile_completed) records used by
+# require_role, filled with one joined query and kept for a short TTL.
+# Endpoints that change a user's role/status must call invalidate_principal().
+# ============================================================================
+PRINCIPAL_CACHE_TTL = float(os.getenv('PRINCIPAL_CACHE_TTL', '30'))
+
+Principal = namedtuple('Principal', ['user_id', 'role_name', 'is_active', 'profile_completed'])
+
+_principal_cache = {}  # user_id -> (expires_at, Principal)
+_principal_lock = threading.Lock()
+
+
+def load_principal(user_id):
+    """Return the cached Principal for user_id, loading it with one joined query on a miss"""
+    now = time.monotonic()
+    with _principal_lock:
+        entry = _principal_cache.get(user_id)
+    if entry and entry[0] > now:
+        return entry[1]
+
+    row = db.session.query(
+        User.id, Role.name, User.is_active, User.profile_completed
+    ).outerjoin(Role, User.role_id == Role.id).filter(User.id == user_id).first()
+    if not row:
+        invalidate_principal(user_id)
+        return None
+
+    principal = Principal(row[0], row[1], bool(row[2]), bool(row[3]))
+    if PRINCIPAL_CACHE_TTL > 0:
+        with _principal_lock:
+            _principal_cache[user_id] = (now + PRINCIPAL_CACHE_TTL, principal)
+    return principal
+
+
+def invalidate_principal(user_id=None):
+    """Drop one cached principal, or the whole cache when user_id is None"""
+    with _principal_lock:
+        if user_id is None:
+            _principal_cache.clear()
+        else:
+            _principal_cache.pop(user_id, None)
+
+
+# ============================================================================
+# RATE LIMITING
+# Token buckets keyed by client IP and by account identifier (email, HOD id,
+# roll number). The check runs before the view, so a throttled request never
+# reaches the database or the bcrypt pool. Limits are "<requests>/<seconds>"
+# strings, overridable per endpoint with RATE_LIMIT_<SCOPE>_IP and
+# RATE_LIMIT_<SCOPE>_ACCOUNT. RATE_LIMIT_STORE=sqlite shares the buckets
+# between workers on one host. Per-IP limits are sized for a campus NAT (many
+# students behind one address); the per-account limits do the tight
+# throttling. Set TRUSTED_PROXIES so the IP is the client, not the proxy.
+# ============================================================================
+RATE_LIMIT_ENABLED = os.getenv('RATE_LIMIT_ENABLED', 'true').lower() == 'true'
+RATE_LIMIT_STORE = os.getenv('RATE_LIMIT_STORE', 'memory').strip().lower()
+RATE_LIMIT_SQLITE_PATH = os.getenv('RATE_LIMIT_SQLITE_PATH', os.path.join(APP_DIR, 'ratelimit.sqlite3'))
+RATE_LIMIT_MAX_KEYS = 50000  # Memory store sweeps idle (full) buckets past this size
+
+
+def parse_rate(spec):
+    """'10/60' -> (capacity 10, refill 10/60 tokens per second); None/'' disables"""
+    if not spec:
+        return None
+    count, _, seconds = str(spec).partition('/')
+    count, seconds = int(count), float(seconds or 1)
+    if count <= 0 or seconds <= 0:
+        return None
+    return count, count / seconds
+
+
+def _bucket_wait(checks, levels):
+    """Seconds until every bucket in checks holds its cost (0 = allowed now).
+    A key listed twice (same identifier twice in a batch) is charged for both."""
+    costs = {}
+    for key, capacity, refill, cost in checks:
+        costs[key] = costs.get(key, 0) + cost
+    wait = 0
+    for key, capacity, refill, cost in checks:
+        missing = costs[key] - levels[key][0]
+        if missing > 0:
+            wait = max(wait, missing / refill)
+    return wait
+
+
+class MemoryBucketStore:
+    """Token buckets for this process only"""
+
+    def __init__(self):
+        self._buckets = {}  # key -> [tokens, last_refill]
+        self._lock = threading.Lock()
+
+    def take(self, checks):
+        """Consume tokens from every (key, capacity, refill, cost) bucket, or from
+        none of them. Returns 0 when allowed, else seconds until all are available"""
+        now = time.monotonic()
+        with self._lock:
+            levels = {}
+            for key, capacity, refill, cost in checks:
+                tokens, last = self._buckets.get(key, (capacity, now))
+                levels[key] = [min(capacity, tokens + (now - last) * refill), now]
+            wait = _bucket_wait(checks, levels)
+            if not wait:
+                for key, capacity, refill, cost in checks:
+                    levels[key][0] -= cost
+            self._buckets.update(levels)
+            if len(self._buckets) > RATE_LIMIT_MAX_KEYS:
+                self._sweep(now)
+            return wait
+
+    def _sweep(self, now):
+        # A bucket idle long enough to refill completely is equivalent to no bucket
+        for key in [k for k, (tokens, last) in self._buckets.items() if now - last > 3600]:
+            del self._buckets[key]
+
+
+class SQLiteBucketStore:
+    """Token buckets in a local SQLite file, shared by all workers on the host"""
+
+    def __init__(self, path):
+        self.path = path
+        self._local = threading.local()
+        conn = self._connect()
+        with conn:
+            conn.execute(
+                'CREATE TABLE IF NOT EXISTS buckets ('
+                'key TEXT PRIMARY KEY, tokens REAL NOT NULL, updated REAL NOT NULL)'
+            )
+
+    def _connect(self):
+        conn = getattr(self._local, 'conn', None)
+        if conn is None:
+            conn = sqlite3.connect(self.path, timeout=5, isolation_level=None)
+            conn.execute('PRAGMA journal_mode=WAL')
+            self._local.conn = conn
+        return conn
+
+    def take(self, checks):
+        conn = self._connect()
+        now = time.time()
+        conn.execute('BEGIN IMMEDIATE')
+        try:
+            levels = {}
+            for key, capacity, refill, cost in checks:
+                row = conn.execute('SELECT tokens, updated FROM buckets WHERE key = ?', (key,)).fetchone()
+                levels[key] = [min(capacity, row[0] + (now - row[1]) * refill) if row else capacity, now]
+            wait = _bucket_wait(checks, levels)
+            if not wait:
+                for key, capacity, refill, cost in checks:
+                    levels[key][0] -= cost
+            conn.executemany(
+                'INSERT OR REPLACE INTO buckets (key, tokens, updated) VALUES (?, ?, ?)',
+                [(key, tokens, updated) for key, (tokens, updated) in levels.items()]
+            )
+            conn.execute('COMMIT')
+        except Exception:
+            conn.execute('ROLLBACK')
+            raise
+        return wait
+
+
+rate_limit_store = SQLiteBucketStore(RATE_LIMIT_SQLITE_PATH) if RATE_LIMIT_STORE == 'sqlite' else MemoryBucketStore()
+_rate_limit_stats = {}  # scope -> {'allowed': n, 'limited': n}
+_rate_limit_stats_lock = threading.Lock()
+
+
+def _count_rate_limit(scope, outcome):
+    with _rate_limit_stats_lock:
+        stats = _rate_limit_stats.setdefault(scope, {'allowed': 0, 'limited': 0})
+        stats[outcome] += 1
+
+
+def rate_limit(scope, ip='60/60', account=None, account_key=None):
+    """Decorator applying token buckets per client IP and, when account_key
+    returns an identifier, per account. Defaults can be overridden in env.
+    When account_key returns a list (batch endpoints), every identifier is
+    charged to its own account bucket and the IP bucket is charged once per
+    identifier, so a batch costs the same as the equivalent single requests."""
+    env_scope = scope.upper().replace('-', '_')
+    ip_rate = parse_rate(os.getenv(f'RATE_LIMIT_{env_scope}_IP', ip))
+    account_rate = parse_rate(os.getenv(f'RATE_LIMIT_{env_scope}_ACCOUNT', account))
+
+    def decorator(f):
+        @wraps(f)
+        def decorated_function(*args, **kwargs):
+            if not RATE_LIMIT_ENABLED:
+                return f(*args, **kwargs)
+
+            identifiers = account_key() if account_key else None
+            if not isinstance(identifiers, (list, tuple)):
+                identifiers = [identifiers] if identifiers else []
+
+            checks = []
+            if ip_rate:
+                checks.append((f'{scope}:ip:{request.remote_addr}', *ip_rate, max(1, len(identifiers))))
+            if account_rate:
+                for identifier in identifiers:
+                    checks.append((f'{scope}:acct:{str(identifier).strip().lower()[:128]}', *account_rate, 1))
+
+            # All buckets are charged together or not at all, so a request denied
+            # by one bucket does not use up tokens in the others
+            wait = rate_limit_store.take(checks) if checks else 0
+            if wait:
+                _count_rate_limit(scope, 'limited')
+                logger.info(f"Rate limit hit for {scope} ({request.remote_addr})")
+                return too_many_requests(
+                    {"error": "Too many requests. Please try again shortly.", "retryAfter": int(wait) + 1},
+                    wait + 1
+                )
+
+            _count_rate_limit(scope, 'allowed')
+            return f(*args, **kwargs)
+        return decorated_function
+    return decorator
+
+
+def rate_limit_metrics():
+    with _rate_limit_stats_lock:
+        return {
+            'enabled': RATE_LIMIT_ENABLED,
+            'store': RATE_LIMIT_STORE,
+            'scopes': {scope: dict(stats) for scope, stats in _rate_limit_stats.items()}
+        }
+
+
+def _json_field(*names):
+    """Account key reader for rate_limit: first non-empty JSON body field"""
+    def reader():
+        payload = request.get_json(silent=True) or {}
+        for name in names:
+            value = payload.get(name)
+            if value:
+                return value
+        return None
+    return reader
+
+
+def _view_arg(name):
+    """Account key reader for rate_limit: a URL path parameter"""
+    return lambda: (request.view_args or {}).get(name)
+
+
+def _query_list(name):
+    """Account key reader for rate_limit: the distinct values of a comma-separated
+    query parameter, capped at MULTI_GET_MAX_BATCH (larger requests are rejected anyway)"""
+    def reader():
+        values = []
+        for part in request.args.get(name, '').split(','):
+            part = part.strip().lower()
+            if part and part not in values:
+                values.append(part)
+        return values[:MULTI_GET_MAX_BATCH]
+    return reader
+
+
 # RBAC Decorator
 def require_role(*allowed_roles):
     """Decorator to require specific roles for endpoints"""
@@ -130,18 +582,16 @@ def require_role(*allowed_roles):
             user_id = session.get('user_id')
             if not user_id:
                 return jsonify({"error": "Unauthorized - Please login"}), 401
-            
-            user = User.query.get(user_id)
-            if not user or not user.is_active:
+
+            principal = load_principal(user_id)
+            if not principal or not principal.is_active:
                 return jsonify({"error": "User not found or inactive"}), 401
-            
-            # Get role name
-            role = Role.query.get(user.role_id)
-            if not role or role.name not in allowed_roles:
+
+            if not principal.role_name or principal.role_name not in allowed_roles:
                 return jsonify({"error": "Forbidden - Insufficient permissions"}), 403
-            
+
             # Check profile completion for non-creator roles
-            if role.name != 'CREATOR' and not user.profile_completed:
+            if principal.role_name != 'CREATOR' and not principal.profile_completed:
                 return jsonify({"error": "Profile incomplete", "requiresProfileCompletion": True}), 403
             
             return f(*args, **kwargs)
@@ -217,14 +667,24 @@ class User(db.Model):
     created_at = db.Column(db.DateTime, default=datetime.utcnow)
     updated_at = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
     last_login = db.Column(db.DateTime)
+    row_version = db.Column(db.Integer, nullable=False, default=0, server_default='0')  # Bumped on every update; ETag validator (migration 011)
     
     # Relationships
     role = db.relationship('Role', backref='users')
     department = db.relationship('Department', backref='users')
     
-    def to_dict(self, include_sensitive=False):
-        role = Role.query.get(self.role_id)
-        department = Department.query.get(self.assigned_department_id) if self.assigned_department_id else None
+    def to_dict(self, include_sensitive=False, roles=None, departments=None):
+        # roles/departments are optional {id: row} maps preloaded by serialize_users()
+        if roles is not None:
+            role = roles.get(self.role_id)
+        else:
+            role = Role.query.get(self.role_id)
+        if not self.assigned_department_id:
+            department = None
+        elif departments is not None:
+            department = departments.get(self.assigned_department_id)
+        else:
+            department = Department.query.get(self.assigned_department_id)
         
         data = {
             'id': self.id,
@@ -258,6 +718,15 @@ class User(db.Model):
         
         return data
 
+
+def serialize_users(users, include_sensitive=False):
+    """Serialize a list of users with one query per dimension instead of two per user"""
+    role_ids = {u.role_id for u in users if u.role_id}
+    dept_ids = {u.assigned_department_id for u in users if u.assigned_department_id}
+    roles = {r.id: r for r in Role.query.filter(Role.id.in_(role_ids)).all()} if role_ids else {}
+    departments = {d.id: d for d in Department.query.filter(Department.id.in_(dept_ids)).all()} if dept_ids else {}
+    return [u.to_dict(include_sensitive, roles=roles, departments=departments) for u in users]
+
 class ActivityUser(db.Model):
     """Many-to-many mapping for coordinators assigned to multiple activities"""
     __tablename__ = 'activity_users'
@@ -268,15 +737,45 @@ class ActivityUser(db.Model):
 
 # Legacy models (keep for backward compatibility)
 
+# Student.profile keys copied into indexed columns (column -> (profile key, max length))
+STUDENT_PROFILE_COLUMNS = {
+    'student_name': ('studentName', 255),
+    'program': ('program', 255),
+    'pcode': ('pcode', 20),
+    'department_code': ('departmentCode', 50),
+    'joining_year': ('joiningYear', 10),
+    'section': ('section', 20),
+}
+
+
 class Student(db.Model):
     __tablename__ = 'students'
+    __table_args__ = (
+        db.Index('ix_students_dept_year_section', 'department_code', 'joining_year', 'section'),
+    )
     id = db.Column(db.Integer, primary_key=True)
     # We store the calculated key (rollNo or email) to maintain the uniqueness logic
     lookup_key = db.Column(db.String(255), unique=True, index=True)
     department = db.Column(db.String(255))  # For HOD filtering
     profile = db.Column(JSON)
+    # Copies of hot profile fields, kept in sync by sync_profile_columns() (migration 006)
+    student_name = db.Column(db.String(255), index=True)
+    program = db.Column(db.String(255), index=True)
+    pcode = db.Column(db.String(20), index=True)
+    department_code = db.Column(db.String(50), index=True)
+    joining_year = db.Column(db.String(10), index=True)
+    section = db.Column(db.String(20))
     created_at = db.Column(db.DateTime, default=datetime.utcnow)
-    updated_at = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+    updated_at = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow, index=True)
+    row_version = db.Column(db.Integer, nullable=False, default=0, server_default='0')  # Bumped on every update; ETag validator (migration 011)
+
+    def sync_profile_columns(self):
+        """Copy the hot profile fields into their indexed columns"""
+        profile = self.profile or {}
+        for column, (key, length) in STUDENT_PROFILE_COLUMNS.items():
+            value = profile.get(key)
+            value = str(value).strip()[:length] if value not in (None, '') else None
+            setattr(self, column, value or None)
 
     def to_dict(self):
         # Merge metadata with the profile data for the API response
@@ -286,6 +785,12 @@ class Student(db.Model):
         data['department'] = self.department
         return data
 
+
+@event.listens_for(Student, 'before_insert')
+@event.listens_for(Student, 'before_update')
+def _sync_student_profile_columns(mapper, connection, target):
+    target.sync_profile_columns()
+
 class HOD(db.Model):
     __tablename__ = 'hods'
     id = db.Column(db.Integer, primary_key=True)
@@ -351,8 +856,30 @@ class Coordinator(db.Model):
             'updatedAt': self.updated_at.isoformat() if self.updated_at else None
         }
 
+# Registration.data / CourseRegistration.data keys copied into indexed roster columns
+# (column -> (data key, max length)); kept in sync by sync_roster_columns() (migration 010)
+REGISTRATION_ROSTER_COLUMNS = {
+    'branch': ('branch', 255),
+    'year': ('year', 20),
+    'section': ('section', 20),
+}
+
+
+def sync_roster_columns(registration):
+    """Copy branch/year/section from the registration data into their columns"""
+    data = registration.data or {}
+    for column, (key, length) in REGISTRATION_ROSTER_COLUMNS.items():
+        value = data.get(key)
+        value = str(value).strip()[:length] if value not in (None, '') else None
+        setattr(registration, column, value or None)
+
+
 class Registration(db.Model):
     __tablename__ = 'registrations'
+    __table_args__ = (
+        db.Index('ix_registrations_status_roster', 'status', 'year', 'branch', 'section'),
+        db.Index('ix_registrations_sub_activity_roster', 'sub_activity_id', 'year', 'branch', 'section'),
+    )
     id = db.Column(db.Integer, primary_key=True)
     student_email = db.Column(db.String(255), index=True)  # Track student
     admission_id = db.Column(db.String(100), index=True)
@@ -365,6 +892,9 @@ class Registration(db.Model):
     hod_status = db.Column(db.String(50), default='pending')  # pending, approved, rejected
     rejection_reason = db.Column(db.Text)  # Why rejected
     data = db.Column(JSON)
+    branch = db.Column(db.String(255))  # Copies of data.branch/year/section (REGISTRATION_ROSTER_COLUMNS)
+    year = db.Column(db.String(20))
+    section = db.Column(db.String(20))
     timestamp = db.Column(db.DateTime, default=datetime.utcnow)
     updated_at = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
 
@@ -395,6 +925,18 @@ class Activity(db.Model):
     created_at = db.Column(db.DateTime, default=datetime.utcnow)
     updated_at = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
 
+    def program_keys(self):
+        """(program code, short name) from data; programCode falls back to the pcode key the seed script writes"""
+        data = self.data or {}
+        code = data.get('programCode')
+        if code in (None, ''):
+            code = data.get('pcode')
+        keys = []
+        for value in (code, data.get('pshort')):
+            value = str(value).strip() if value not in (None, '') else ''
+            keys.append(value or None)
+        return tuple(keys)
+
     def to_dict(self):
         return {
             'id': self.id,
@@ -420,6 +962,7 @@ class SubActivity(db.Model):
     data = db.Column(JSON)
     created_at = db.Column(db.DateTime, default=datetime.utcnow)
     updated_at = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+    row_version = db.Column(db.Integer, nullable=False, default=0, server_default='0')  # Bumped on every update; ETag validator (migration 011)
 
     def to_dict(self):
         total = self.total_slots if self.total_slots is not None else 0
@@ -448,6 +991,19 @@ class SubActivity(db.Model):
 
 class CourseRegistration(db.Model):
     __tablename__ = 'course_registrations'
+    # Composite indexes matching the list/approval filters; see migrations/009_add_hot_filter_indexes.py
+    __table_args__ = (
+        db.Index('ix_course_registrations_created', 'created_at', 'id'),
+        db.Index('ix_course_registrations_status_created', 'status', 'created_at', 'id'),
+        db.Index('ix_course_registrations_category_status', 'activity_category', 'status'),
+        db.Index('ix_course_registrations_activity_status', 'activity_name', 'status'),
+        db.Index('ix_course_registrations_sub_activity_status', 'sub_activity_id', 'status'),
+        db.Index('ix_course_registrations_department_status', 'department', 'status'),
+        db.Index('ix_course_registrations_course', 'course'),
+        db.Index('ix_course_registrations_admission_created', 'admission_id', 'created_at'),
+        db.Index('ix_course_registrations_branch_status', 'branch', 'status'),
+        db.Index('ix_course_registrations_sub_activity_roster', 'sub_activity_id', 'year', 'branch', 'section'),
+    )
     id = db.Column(db.Integer, primary_key=True)
     student_name = db.Column(db.String(255))
     admission_id = db.Column(db.String(255))
@@ -458,8 +1014,12 @@ class CourseRegistration(db.Model):
     sub_activity_id = db.Column(db.Integer, db.ForeignKey('sub_activities.id'))  # Link to sub-activity
     status = db.Column(db.String(100), default='Pending Coordinator')
     data = db.Column(JSON)  # Store all registration data
+    branch = db.Column(db.String(255))  # Copies of data.branch/year/section (REGISTRATION_ROSTER_COLUMNS)
+    year = db.Column(db.String(20))
+    section = db.Column(db.String(20))
     created_at = db.Column(db.DateTime, default=datetime.utcnow)
     last_updated = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+    row_version = db.Column(db.Integer, nullable=False, default=0, server_default='0')  # Bumped on every update; ETag validator (migration 011)
 
     def to_dict(self):
         result = self.data.copy() if self.data else {}
@@ -479,8 +1039,167 @@ class CourseRegistration(db.Model):
         })
         return result
 
+
+@event.listens_for(CourseRegistration, 'before_insert')
+@event.listens_for(CourseRegistration, 'before_update')
+@event.listens_for(Registration, 'before_insert')
+@event.listens_for(Registration, 'before_update')
+def _sync_registration_roster_columns(mapper, connection, target):
+    sync_roster_columns(target)
+
+# Enrollment source -> registration status -> normalized state. These are the buckets the
+# member, summary and analytics endpoints always used; any other status ('Approved', the
+# Queued* statuses) is 'other' and is not counted as accepted or pending.
+ENROLLMENT_STATES = {
+    'course': {
+        'Accepted': 'accepted', 'hod_approved': 'accepted',
+        'Pending Coordinator': 'pending', 'coordinator_approved': 'pending', 'Pending HOD': 'pending',
+        'Rejected': 'rejected',
+    },
+    'legacy': {
+        'Accepted': 'accepted', 'hod_approved': 'accepted',
+        'pending': 'pending', 'coordinator_approved': 'pending',
+        'rejected': 'rejected',
+    },
+}
+# Activity and department analytics only ever counted hod_approved legacy registrations
+LEGACY_ANALYTICS_ACCEPTED = 'hod_approved'
+
+
+class Enrollment(db.Model):
+    """Read model with one row per course registration or legacy registration.
+    Written only by the mapper events below, inside the same transaction as the source row."""
+    __tablename__ = 'enrollments'
+    __table_args__ = (
+        db.UniqueConstraint('source', 'source_id', name='uq_enrollments_source'),
+        db.Index('ix_enrollments_state_activity', 'state', 'activity'),
+        db.Index('ix_enrollments_state_department', 'state', 'department'),
+        db.Index('ix_enrollments_state_sub_activity', 'state', 'sub_activity_id'),
+    )
+    id = db.Column(db.Integer, primary_key=True)
+    source = db.Column(db.String(20), nullable=False)  # 'course' (course_registrations) or 'legacy' (registrations)
+    source_id = db.Column(db.Integer, nullable=False)
+    admission_id = db.Column(db.String(255), index=True)
+    student_name = db.Column(db.String(255))
+    student_email = db.Column(db.String(255))
+    department = db.Column(db.String(255))
+    course = db.Column(db.String(255))
+    activity = db.Column(db.String(255))  # Main activity: category if set, else activity name
+    activity_name = db.Column(db.String(255))
+    activity_category = db.Column(db.String(255))
+    sub_activity_id = db.Column(db.Integer)
+    status = db.Column(db.String(100))  # Raw status from the source table
+    state = db.Column(db.String(20), nullable=False, default='other')  # pending / accepted / rejected / other
+    year = db.Column(db.String(20))
+    phone = db.Column(db.String(20))
+    accepted_at = db.Column(db.DateTime)
+    updated_at = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+
+    def to_dict(self):
+        return {
+            'registrationId': self.source_id,
+            'source': self.source,
+            'admissionId': self.admission_id,
+            'studentName': self.student_name,
+            'studentEmail': self.student_email,
+            'department': self.department,
+            'course': self.course,
+            'activity': self.activity,
+            'activityName': self.activity_name,
+            'activityCategory': self.activity_category,
+            'subActivityId': self.sub_activity_id,
+            'status': self.status,
+            'state': self.state,
+            'year': self.year,
+            'phone': self.phone,
+            'acceptedAt': self.accepted_at.isoformat() if self.accepted_at else None
+        }
+
+
+def _clip(value, length):
+    return str(value)[:length] if value not in (None, '') else None
+
+
+def enrollment_values(target):
+    """Enrollment columns for a CourseRegistration or Registration row"""
+    data = target.data or {}
+    if isinstance(target, CourseRegistration):
+        values = {
+            'source': 'course',
+            'student_email': _clip(data.get('email'), 255),
+            'course': target.course,
+            'activity': target.activity_category or target.activity_name,
+            'activity_category': target.activity_category,
+            'stamp': target.last_updated,
+        }
+    else:
+        values = {
+            'source': 'legacy',
+            'student_email': target.student_email,
+            'course': _clip(data.get('course'), 255),
+            'activity': target.activity_name,
+            'activity_category': None,
+            'stamp': target.updated_at,
+        }
+    state = ENROLLMENT_STATES[values['source']].get(target.status, 'other')
+    stamp = values.pop('stamp') or datetime.utcnow()
+    values.update({
+        'source_id': target.id,
+        'admission_id': target.admission_id,
+        'student_name': target.student_name,
+        'department': target.department,
+        'activity_name': target.activity_name,
+        'sub_activity_id': target.sub_activity_id,
+        'status': target.status,
+        'state': state,
+        'year': target.year,
+        'phone': _clip(data.get('phone'), 20),
+        'accepted_at': stamp if state == 'accepted' else None,
+        'updated_at': datetime.utcnow(),
+    })
+    return values
+
+
+@event.listens_for(CourseRegistration, 'after_insert')
+@event.listens_for(Registration, 'after_insert')
+def _insert_enrollment(mapper, connection, target):
+    connection.execute(Enrollment.__table__.insert().values(**enrollment_values(target)))
+
+
+@event.listens_for(CourseRegistration, 'after_update')
+@event.listens_for(Registration, 'after_update')
+def _update_enrollment(mapper, connection, target):
+    values = enrollment_values(target)
+    table = Enrollment.__table__
+    if values['state'] == 'accepted':
+        # Keep the original acceptance time across later edits
+        values['accepted_at'] = func.coalesce(table.c.accepted_at, values['accepted_at'])
+    result = connection.execute(
+        table.update()
+        .where(table.c.source == values['source'], table.c.source_id == values['source_id'])
+        .values(**values)
+    )
+    if result.rowcount == 0:
+        _insert_enrollment(mapper, connection, target)
+
+
+@event.listens_for(CourseRegistration, 'after_delete')
+@event.listens_for(Registration, 'after_delete')
+def _delete_enrollment(mapper, connection, target):
+    table = Enrollment.__table__
+    source = 'course' if isinstance(target, CourseRegistration) else 'legacy'
+    connection.execute(table.delete().where(table.c.source == source, table.c.source_id == target.id))
+
+
 class Event(db.Model):
     __tablename__ = 'events'
+    __table_args__ = (
+        db.Index('ix_events_date', 'event_date', 'id'),
+        db.Index('ix_events_activity_date', 'activity_name', 'event_date', 'id'),
+        db.Index('ix_events_coordinator_date', 'coordinator_email', 'event_date', 'id'),
+        db.Index('ix_events_sub_activity_date', 'sub_activity_id', 'event_date', 'id'),
+        db.Index('ix_events_status_activity_created', 'event_status', 'activity_name', 'created_at'),
+    )
     id = db.Column(db.Integer, primary_key=True)
     event_name = db.Column(db.String(255), nullable=False)
     activity_name = db.Column(db.String(255), nullable=False)
@@ -503,6 +1222,7 @@ class Event(db.Model):
     required_students = db.Column(db.Integer)  # Target number of students needed
     created_at = db.Column(db.DateTime, default=datetime.utcnow)
     updated_at = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+    row_version = db.Column(db.Integer, nullable=False, default=0, server_default='0')  # Bumped on every update; ETag validator (migration 011)
 
     def to_dict(self):
         return {
@@ -531,6 +1251,13 @@ class Event(db.Model):
 
 class Attendance(db.Model):
     __tablename__ = 'attendance'
+    __table_args__ = (
+        db.Index('ix_attendance_activity_date_approval', 'activity_name', 'attendance_date', 'approval_status'),
+        db.Index('ix_attendance_approval_activity_created', 'approval_status', 'activity_name', 'created_at'),
+        db.Index('ix_attendance_student_approval_date', 'student_admission_id', 'approval_status', 'attendance_date'),
+        db.Index('ix_attendance_sub_activity_date', 'sub_activity_id', 'attendance_date', 'id'),
+        db.Index('ix_attendance_batch_approval', 'batch_id', 'approval_status'),
+    )
     id = db.Column(db.Integer, primary_key=True)
     student_admission_id = db.Column(db.String(255), nullable=False, index=True)
     student_name = db.Column(db.String(255))
@@ -630,6 +1357,263 @@ class EventParticipant(db.Model):
         }
 
 
+class ServerSession(db.Model):
+    """Server-side session rows for SESSION_BACKEND=database"""
+    __tablename__ = 'server_sessions'
+    sid = db.Column(db.String(128), primary_key=True)
+    data = db.Column(db.Text, nullable=False)
+    expires_at = db.Column(db.DateTime, nullable=False, index=True)
+
+
+# ============================================================================
+# SERVER-SIDE SESSIONS
+# The cookie only carries an opaque session id; the session dict lives in a
+# pluggable store. It is loaded lazily on first access and written back only
+# when the request changed it. Ids are always minted by the server: a cookie
+# sid the store does not know starts a new session, and logging in (setting
+# user_id / role) moves the session to a fresh sid.
+#   SESSION_BACKEND=memory   - per-process dict (single worker)
+#   SESSION_BACKEND=sqlite   - SQLite file shared by workers on one host
+#   SESSION_BACKEND=database - server_sessions table in the main database
+#   SESSION_BACKEND=cookie   - Flask's default signed cookie
+# ============================================================================
+SESSION_BACKEND = os.getenv('SESSION_BACKEND', 'memory').strip().lower()
+SESSION_SQLITE_PATH = os.getenv('SESSION_SQLITE_PATH', os.path.join(APP_DIR, 'sessions.sqlite3'))
+SESSION_PURGE_EVERY = 500  # Sweep expired sessions once every N writes
+# Setting any of these (login, role switch) moves the session to a fresh sid
+SESSION_IDENTITY_KEYS = ('user_id', 'role')
+
+
+class MemorySessionStore:
+    """Session store kept in this process only"""
+
+    def __init__(self):
+        self._sessions = {}
+        self._lock = threading.Lock()
+        self._writes = 0
+
+    def load(self, sid):
+        with self._lock:
+            entry = self._sessions.get(sid)
+            if not entry:
+                return None
+            if entry[0] <= datetime.utcnow():
+                del self._sessions[sid]
+                return None
+            return copy.deepcopy(entry[1])
+
+    def save(self, sid, data, expires_at):
+        with self._lock:
+            self._sessions[sid] = (expires_at, copy.deepcopy(data))
+            self._writes += 1
+            if self._writes % SESSION_PURGE_EVERY == 0:
+                now = datetime.utcnow()
+                for key in [k for k, v in self._sessions.items() if v[0] <= now]:
+                    del self._sessions[key]
+
+    def delete(self, sid):
+        with self._lock:
+            self._sessions.pop(sid, None)
+
+
+class SQLiteSessionStore:
+    """Session store in a local SQLite file, shared by all workers on the host"""
+
+    def __init__(self, path):
+        self.path = path
+        self._local = threading.local()
+        self._writes = 0
+        with self._connect() as conn:
+            conn.execute(
+                'CREATE TABLE IF NOT EXISTS sessions ('
+                'sid TEXT PRIMARY KEY, data TEXT NOT NULL, expires_at REAL NOT NULL)'
+            )
+
+    def _connect(self):
+        conn = getattr(self._local, 'conn', None)
+        if conn is None:
+            conn = sqlite3.connect(self.path, timeout=10)
+            conn.execute('PRAGMA journal_mode=WAL')
+            self._local.conn = conn
+        return conn
+
+    def load(self, sid):
+        row = self._connect().execute(
+            'SELECT data FROM sessions WHERE sid = ? AND expires_at > ?', (sid, time.time())
+        ).fetchone()
+        return json.loads(row[0]) if row else None
+
+    def save(self, sid, data, expires_at):
+        conn = self._connect()
+        with conn:
+            conn.execute(
+                'INSERT OR REPLACE INTO sessions (sid, data, expires_at) VALUES (?, ?, ?)',
+                (sid, json.dumps(data), calendar.timegm(expires_at.timetuple()))
+            )
+            self._writes += 1
+            if self._writes % SESSION_PURGE_EVERY == 0:
+                conn.execute('DELETE FROM sessions WHERE expires_at <= ?', (time.time(),))
+
+    def delete(self, sid):
+        conn = self._connect()
+        with conn:
+            conn.execute('DELETE FROM sessions WHERE sid = ?', (sid,))
+
+
+class DatabaseSessionStore:
+    """Session store in the server_sessions table of the main database.
+    Uses its own connection so it never commits or rolls back request work."""
+
+    def __init__(self):
+        self._writes = 0
+
+    def load(self, sid):
+        table = ServerSession.__table__
+        with db.engine.connect() as conn:
+            row = conn.execute(
+                db.select(table.c.data).where(table.c.sid == sid, table.c.expires_at > datetime.utcnow())
+            ).first()
+        return json.loads(row[0]) if row else None
+
+    def save(self, sid, data, expires_at):
+        table = ServerSession.__table__
+        with db.engine.begin() as conn:
+            updated = conn.execute(
+                table.update().where(table.c.sid == sid).values(data=json.dumps(data), expires_at=expires_at)
+            ).rowcount
+            if not updated:
+                conn.execute(table.insert().values(sid=sid, data=json.dumps(data), expires_at=expires_at))
+            self._writes += 1
+            if self._writes % SESSION_PURGE_EVERY == 0:
+                conn.execute(table.delete().where(table.c.expires_at <= datetime.utcnow()))
+
+    def delete(self, sid):
+        table = ServerSession.__table__
+        with db.engine.begin() as conn:
+            conn.execute(table.delete().where(table.c.sid == sid))
+
+
+class LazyServerSession(SessionMixin):
+    """Session dict that only hits the store when a request first reads or writes it"""
+
+    def __init__(self, store, sid=None):
+        self.store = store
+        self.sid = sid
+        self.new = sid is None
+        self.modified = False
+        self.accessed = False
+        self.retired_sid = None
+        self._data = None
+
+    def _load(self):
+        self.accessed = True
+        if self._data is None:
+            data = self.store.load(self.sid) if self.sid else None
+            if data is None:
+                # Unknown or expired sid from the cookie: never adopt a client-chosen id
+                self.new = True
+                data = {}
+            self._data = data
+        return self._data
+
+    def regenerate(self):
+        """Move the session to a fresh sid on save and drop the old record"""
+        self._load()
+        if not self.new:
+            self.retired_sid = self.sid
+            self.new = True
+        self.modified = True
+
+    def __getitem__(self, key):
+        return self._load()[key]
+
+    def __setitem__(self, key, value):
+        data = self._load()
+        if key in SESSION_IDENTITY_KEYS:
+            self.regenerate()
+        data[key] = value
+        self.modified = True
+
+    def __delitem__(self, key):
+        del self._load()[key]
+        self.modified = True
+
+    def __iter__(self):
+        return iter(self._load())
+
+    def __len__(self):
+        return len(self._load())
+
+    def clear(self):
+        self._load().clear()
+        self.modified = True
+
+    def to_dict(self):
+        return dict(self._load())
+
+
+class ServerSideSessionInterface(SessionInterface):
+    """Flask session interface backed by one of the session stores above"""
+
+    def __init__(self, store):
+        self.store = store
+
+    def open_session(self, app, request):
+        sid = request.cookies.get(self.get_cookie_name(app))
+        if not sid or len(sid) > 128:
+            sid = None
+        return LazyServerSession(self.store, sid)
+
+    def save_session(self, app, session, response):
+        name = self.get_cookie_name(app)
+        domain = self.get_cookie_domain(app)
+        path = self.get_cookie_path(app)
+
+        if session.accessed:
+            response.vary.add('Cookie')
+
+        # Write-back only: untouched sessions cost nothing at the end of a request
+        if not session.modified:
+            return
+
+        if not session.to_dict():
+            if session.sid:
+                self.store.delete(session.sid)
+                response.delete_cookie(name, domain=domain, path=path)
+            return
+
+        if session.new:
+            if session.retired_sid:
+                self.store.delete(session.retired_sid)
+            session.sid = secrets.token_urlsafe(32)
+        expires = self.get_expiration_time(app, session)
+        # Stores work in naive UTC, like the rest of the models
+        expires_at = expires.replace(tzinfo=None) if expires else datetime.utcnow() + app.permanent_session_lifetime
+        self.store.save(session.sid, session.to_dict(), expires_at)
+        response.set_cookie(
+            name,
+            session.sid,
+            expires=expires,
+            httponly=self.get_cookie_httponly(app),
+            domain=domain,
+            path=path,
+            secure=self.get_cookie_secure(app),
+            samesite=self.get_cookie_samesite(app)
+        )
+
+
+def build_session_store(backend):
+    if backend == 'sqlite':
+        return SQLiteSessionStore(SESSION_SQLITE_PATH)
+    if backend == 'database':
+        return DatabaseSessionStore()
+    return MemorySessionStore()
+
+
+if SESSION_BACKEND != 'cookie':
+    app.session_interface = ServerSideSessionInterface(build_session_store(SESSION_BACKEND))
+
+
 @app.route('/', methods=['GET'])
 def serve_index():
     return send_from_directory(WEB_DIR, 'index.html')
@@ -654,6 +1638,39 @@ def health():
         }), 503
 
 
+# Monitoring scrapers send METRICS_TOKEN as "Authorization: Bearer <token>";
+# a logged-in CREATOR can read the metrics without it
+METRICS_TOKEN = os.getenv('METRICS_TOKEN', '')
+
+
+def metrics_authorized():
+    if METRICS_TOKEN:
+        header = request.headers.get('Authorization', '')
+        token = header[7:].strip() if header.lower().startswith('bearer ') else ''
+        if token and secrets.compare_digest(token, METRICS_TOKEN):
+            return True
+    user_id = session.get('user_id')
+    principal = load_principal(user_id) if user_id else None
+    return bool(principal and principal.is_active and principal.role_name == 'CREATOR')
+
+
+@app.route('/api/metrics', methods=['GET'])
+def metrics():
+    """Runtime counters for capacity monitoring (METRICS_TOKEN or CREATOR session)"""
+    if not metrics_authorized():
+        return jsonify({"error": "Unauthorized"}), 401
+    return jsonify({
+        'passwordPool': {**password_pool.metrics(), 'bcryptRounds': get_bcrypt_rounds()},
+        'rateLimit': rate_limit_metrics(),
+        'rollIndex': roll_index.size(),
+        'catalog': catalog.stats(),
+        'slots': slot_metrics(),
+        'admissionQueue': admission_queue.metrics() if admission_queue is not None else None,
+        'staticCatalog': static_catalog.metrics() if CATALOG_EXPORT_ENABLED else None,
+        'timestamp': datetime.utcnow().isoformat()
+    }), 200
+
+
 @app.route('/api/log-frontend-error', methods=['POST'])
 def log_frontend_error():
     """Receives JS/network errors from the browser and logs them."""
@@ -690,8 +1707,1109 @@ def log_frontend_error():
         return jsonify({'logged': False}), 200  # Always 200 to avoid infinite loops
 
 
+# ============================================================================
+# ROLL NUMBER INDEX
+# In-memory map of students.lookup_key -> (student id, name, department) plus
+# active STUDENT-role users keyed by employee_id, so student login answers
+# misses without a query. Loaded on first use (and at startup), refreshed
+# incrementally from students.updated_at (rows where it is NULL included)
+# every ROLL_INDEX_REFRESH_SECONDS and rebuilt in full every
+# ROLL_INDEX_RELOAD_SECONDS to drop deleted rows.
+# Endpoints that write students call roll_index.note_students() (single rows)
+# or roll_index.refresh() (bulk writes) after commit.
+# ============================================================================
+ROLL_INDEX_REFRESH_SECONDS = float(os.getenv('ROLL_INDEX_REFRESH_SECONDS', '15'))
+ROLL_INDEX_RELOAD_SECONDS = float(os.getenv('ROLL_INDEX_RELOAD_SECONDS', '3600'))
+
+RollEntry = namedtuple('RollEntry', ['student_id', 'name', 'department'])
+StudentUserEntry = namedtuple('StudentUserEntry', ['user_id', 'name', 'roll_no', 'email'])
+
+
+class RollIndex:
+    """Roll number lookups for student authentication"""
+
+    def __init__(self):
+        self._students = {}  # lookup_key -> RollEntry
+        self._users = {}     # lower(employee_id) -> StudentUserEntry
+        self._lock = threading.Lock()
+        self._refresh_lock = threading.Lock()
+        self._watermark = None
+        self._next_refresh = 0.0
+        self._next_reload = 0.0
+
+    @staticmethod
+    def _entry(student_id, lookup_key, department, student_name):
+        return RollEntry(student_id, student_name or lookup_key, department)
+
+    def lookup(self, roll_number):
+        """Return a RollEntry, a StudentUserEntry or None for an unknown roll"""
+        self.ensure_fresh()
+        with self._lock:
+            return self._students.get(roll_number) or self._users.get(roll_number)
+
+    def ensure_fresh(self):
+        now = time.monotonic()
+        if now < self._next_refresh:
+            return
+        # One thread refreshes; the others keep serving the current map
+        if not self._refresh_lock.acquire(blocking=self._watermark is None):
+            return
+        try:
+            if now < self._next_refresh:
+                return
+            full = now >= self._next_reload
+            self._refresh(full)
+            self._next_refresh = now + ROLL_INDEX_REFRESH_SECONDS
+            if full:
+                self._next_reload = now + ROLL_INDEX_RELOAD_SECONDS
+        except Exception as e:
+            logger.error(f"Roll index refresh failed: {e}")
+        finally:
+            self._refresh_lock.release()
+
+    def _refresh(self, full):
+        query = db.session.query(Student.id, Student.lookup_key, Student.department, Student.student_name, Student.updated_at)
+        if not full and self._watermark is not None:
+            # >= so rows written in the same second as the last refresh are not missed; rows
+            # without a timestamp (written by older import scripts) are always re-read, and
+            # migration 012 backfills them so that set stays empty
+            query = query.filter((Student.updated_at >= self._watermark) | Student.updated_at.is_(None))
+
+        changed = {}
+        watermark = self._watermark if not full else None
+        for student_id, lookup_key, department, student_name, updated_at in query.yield_per(2000):
+            if not lookup_key:
+                continue
+            changed[lookup_key] = self._entry(student_id, lookup_key, department, student_name)
+            if updated_at and (watermark is None or updated_at > watermark):
+                watermark = updated_at
+
+        user_rows = db.session.query(User.id, User.full_name, User.employee_id, User.email).join(
+            Role, User.role_id == Role.id
+        ).filter(Role.name == 'STUDENT', User.is_active == True, User.employee_id.isnot(None)).all()
+        users = {row[2].lower(): StudentUserEntry(*row) for row in user_rows}
+
+        with self._lock:
+            if full:
+                self._students = changed
+            else:
+                self._students.update(changed)
+            self._users = users
+            self._watermark = watermark
+        if full:
+            logger.info(f"Roll index loaded: {len(self._students)} students, {len(users)} student users")
+
+    def note_students(self, students):
+        """Apply committed Student rows to the index without waiting for a refresh"""
+        with self._lock:
+            for student in students:
+                if student.lookup_key:
+                    self._students[student.lookup_key] = self._entry(
+                        student.id, student.lookup_key, student.department, student.student_name
+                    )
+
+    def refresh(self):
+        """Pick up rows committed by a bulk write now, with one incremental query"""
+        if self._watermark is None:
+            self.ensure_fresh()
+            return
+        with self._refresh_lock:
+            try:
+                self._refresh(False)
+            except Exception as e:
+                logger.error(f"Roll index refresh failed: {e}")
+
+    def invalidate(self):
+        """Force a full reload on the next lookup"""
+        self._next_refresh = 0.0
+        self._next_reload = 0.0
+
+    def size(self):
+        with self._lock:
+            return {'students': len(self._students), 'studentUsers': len(self._users)}
+
+
+roll_index = RollIndex()
+
+
+# ============================================================================
+# DEPARTMENT ALIASES
+# Normalizes free-text department / program names ("B.Sc.-Honours(AI)",
+# "Data Science & AI", "74") to a department key without touching the DB.
+# Names are canonicalized (lowercase, symbol/token rewrites, punctuation
+# dropped) and looked up exactly; failing that, significant tokens are matched
+# against a token + prefix index and the single best-scoring department wins.
+# Static sources: PCODE_TO_DEPT, config/json/departments_and_classes.json and
+# the rules in config/json/department_aliases.json. HodDirectory adds the
+# Department and ProgramDepartmentMapping rows on every rebuild.
+# ============================================================================
+CONFIG_JSON_DIR = os.path.join(APP_DIR, 'config', 'json')
+DEPARTMENT_ALIASES_FILE = os.getenv('DEPARTMENT_ALIASES_FILE', os.path.join(CONFIG_JSON_DIR, 'department_aliases.json'))
+
+# Program code (pcode) to department code mapping based on CSV data
+PCODE_TO_DEPT = {
+    '11': 'ECO',  # B.A.-Honours(ECO)
+    '21': 'COM',  # B.Com.-Honours(General)
+    '22': 'COM',  # B.Com.-Honours(Computer Applications)-A
+    '23': 'COM',  # B.Com.-Honours(Computer Applications)-B
+    '24': 'COM',  # B.Com.-Honours(Computer Applications)-C
+    '25': 'COM',  # B.Com.-Honours(Tax Procedures)
+    '26': 'COM',  # B.Com.-Honours(Finance)
+    '27': 'COM',  # B.Com.-Honours(BPM)
+    '28': 'COM',  # B.Com.-Honours(Banking)
+    '31': 'BBA',  # B.B.A.-Honours-A
+    '32': 'BBA',  # B.B.A.-Honours-B
+    '33': 'BBA',  # B.B.A.-Honours(Business Analytics)
+    '41': 'CSC',  # B.C.A.-Honours-A
+    '42': 'CSC',  # B.C.A.-Honours-B
+    '51': 'BOT',  # B.Sc.-Honours(Botany)
+    '52': 'ZOO',  # B.Sc.-Honours(Zoology)
+    '61': 'MAT',  # B.Sc.-Honours(Mathematics)
+    '62': 'CHE',  # B.Sc.-Honours(Chemistry)
+    '63': 'PHY',  # B.Sc.-Honours(Physics)
+    '64': 'ELE',  # B.Sc.-Honours(Electronics)
+    '65': 'STA',  # B.Sc.-Honours(Statistics)
+    '71': 'CSC',  # B.Sc.-Honours(Computer Science)-A
+    '72': 'CSC',  # B.Sc.-Honours(Computer Science)-B
+    '73': 'CSC',  # B.Sc.-Honours(Computer Science)-C
+    '74': 'DSAI', # B.Sc.-Honours(Data Science)
+    '75': 'DSAI', # B.Sc.-Honours(Data Analytics)
+    '76': 'CSC',  # B.Sc.-Honours(CS and Cognitive Systems)
+    '77': 'DSAI', # B.Sc.-Honours(Artificial Intelligence)
+}
+
+_ALIAS_TOKEN_RE = re.compile(r'[a-z0-9]+')
+
+
+def _load_json_config(path, default):
+    try:
+        with open(path, encoding='utf-8') as f:
+            return json.load(f)
+    except (OSError, ValueError) as e:
+        logger.warning(f"Could not load {path}: {e}")
+        return default
+
+
+class DepartmentAliasIndex:
+    """Canonical alias -> department key, with a token/prefix index for fuzzy names"""
+
+    MIN_PREFIX = 3
+
+    def __init__(self, rules):
+        self.symbols = list((rules.get('symbols') or {}).items())
+        self.token_rewrites = {k.lower(): v.lower() for k, v in (rules.get('tokens') or {}).items()}
+        self.ignore = {t.lower() for t in rules.get('ignoreTokens') or []}
+        self._exact = {}     # canonical alias -> department key
+        self._tokens = {}    # significant token -> {department key}
+        self._prefixes = {}  # token prefix -> {department key}
+
+    def canonical(self, name):
+        text = str(name or '').lower()
+        for symbol, replacement in self.symbols:
+            text = text.replace(symbol, replacement)
+        return ' '.join(self.token_rewrites.get(t, t) for t in _ALIAS_TOKEN_RE.findall(text))
+
+    def _significant(self, canonical):
+        return [t for t in canonical.split() if t not in self.ignore]
+
+    def add(self, alias, target):
+        """Register alias for target (a department name or code); later calls win"""
+        key, target = self.canonical(alias), self.canonical(target)
+        if not key or not target:
+            return
+        self._exact[key] = target
+        for token in self._significant(key):
+            self._tokens.setdefault(token, set()).add(target)
+            for n in range(self.MIN_PREFIX, len(token)):
+                self._prefixes.setdefault(token[:n], set()).add(target)
+
+    def exact(self, name):
+        return self._exact.get(self.canonical(name))
+
+    def fuzzy(self, name, resolve=None):
+        """Best department key for the significant tokens of name, or None when ambiguous.
+        resolve maps keys to the department they stand for (None to skip), so a
+        code and a name of the same department do not compete with each other."""
+        tokens = self._significant(self.canonical(name))
+        if not tokens:
+            return None
+        scores = {}
+        for token in tokens:
+            hits = {resolve(t) if resolve else t for t in self._tokens.get(token) or self._prefixes.get(token) or ()}
+            for target in hits:
+                if target is not None:
+                    scores[target] = scores.get(target, 0) + 1
+        if not scores:
+            return None
+        best = max(scores.values())
+        winners = [t for t, score in scores.items() if score == best]
+        return winners[0] if len(winners) == 1 else None
+
+    def copy(self):
+        clone = DepartmentAliasIndex({})
+        clone.symbols, clone.token_rewrites, clone.ignore = self.symbols, self.token_rewrites, self.ignore
+        clone._exact = dict(self._exact)
+        clone._tokens = {k: set(v) for k, v in self._tokens.items()}
+        clone._prefixes = {k: set(v) for k, v in self._prefixes.items()}
+        return clone
+
+
+def build_static_alias_index():
+    """Alias index from the config files and PCODE_TO_DEPT (no database access)"""
+    rules = _load_json_config(DEPARTMENT_ALIASES_FILE, {})
+    index = DepartmentAliasIndex(rules)
+
+    catalog = _load_json_config(os.path.join(CONFIG_JSON_DIR, 'departments_and_classes.json'), {})
+    programs = (catalog.get('departments_and_classes') or {}).get('departments') or {}
+    for entries in programs.values():
+        for program in entries:
+            dept_code = PCODE_TO_DEPT.get(str(program.get('code', '')))
+            if not dept_code:
+                continue
+            index.add(program.get('shortName'), dept_code)
+            index.add(f"{program.get('title', '')} ({program.get('name', '')})", dept_code)
+    for pcode, dept_code in PCODE_TO_DEPT.items():
+        index.add(pcode, dept_code)
+
+    for dept_code, aliases in (rules.get('aliases') or {}).items():
+        index.add(dept_code, dept_code)
+        for alias in aliases:
+            index.add(alias, dept_code)
+    return index
+
+
+static_department_aliases = build_static_alias_index()
+
+
+# ============================================================================
+# HOD DIRECTORY
+# One in-memory resolution table from every known department name, code,
+# mapped program name and alias to (department, HOD contact), built from
+# Department, ProgramDepartmentMapping, the legacy hods table and active
+# HOD-role users in four queries. An active HOD user assigned to the
+# department wins; the legacy hods row is the fallback and fills a missing
+# phone. The creator CRUD endpoints call hod_directory.invalidate() after
+# commit; HOD_DIRECTORY_TTL bounds staleness for writes from other workers
+# or import scripts.
+# ============================================================================
+HOD_DIRECTORY_TTL = float(os.getenv('HOD_DIRECTORY_TTL', '60'))
+
+DeptRef = namedtuple('DeptRef', ['id', 'name', 'code'])
+HodContact = namedtuple('HodContact', ['user_id', 'legacy_id', 'name', 'email', 'phone', 'employee_id', 'department'])
+
+
+class HodDirectory:
+    """Precomputed department/program -> HOD resolution"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._expires_at = 0.0
+        self._aliases = static_department_aliases
+        self._by_key = {}    # canonical department name or code -> (DeptRef | None, HodContact | None)
+        self._by_id = {}     # department id -> (DeptRef, HodContact | None)
+        self._programs = {}  # canonical program name -> department name
+        self._version = None
+
+    def invalidate(self):
+        self._expires_at = 0.0
+
+    def _ensure(self):
+        if time.monotonic() < self._expires_at:
+            return
+        with self._lock:
+            if time.monotonic() < self._expires_at:
+                return
+            self._build()
+            self._expires_at = time.monotonic() + HOD_DIRECTORY_TTL
+
+    def _build(self):
+        departments = Department.query.order_by(Department.id).all()
+        mappings = ProgramDepartmentMapping.query.order_by(ProgramDepartmentMapping.id).all()
+        legacy_hods = HOD.query.order_by(HOD.id).all()
+        hod_users = User.query.join(Role, User.role_id == Role.id).filter(
+            Role.name == 'HOD',
+            User.is_active == True,
+            User.assigned_department_id.isnot(None)
+        ).order_by(User.id).all()
+
+        aliases = static_department_aliases.copy()
+        canonical = aliases.canonical
+
+        legacy_by_dept = {}
+        for hod in legacy_hods:
+            legacy_by_dept.setdefault(canonical(hod.department), hod)
+        user_by_dept = {}
+        for user in hod_users:
+            user_by_dept.setdefault(user.assigned_department_id, user)
+
+        def legacy_contact(hod):
+            return HodContact(None, hod.id, hod.name, hod.email, hod.phone, hod.employee_id, hod.department)
+
+        def contact_for(dept):
+            legacy = legacy_by_dept.get(canonical(dept.name)) or (legacy_by_dept.get(canonical(dept.code)) if dept.code else None)
+            user = user_by_dept.get(dept.id)
+            if user:
+                return HodContact(
+                    user.id, legacy.id if legacy else None, user.full_name, user.email,
+                    user.phone or (legacy.phone if legacy else None), user.employee_id, dept.name
+                )
+            return legacy_contact(legacy) if legacy else None
+
+        by_key, by_id = {}, {}
+        for dept in departments:
+            entry = (DeptRef(dept.id, dept.name, dept.code), contact_for(dept))
+            by_id[dept.id] = entry
+            if dept.code:
+                by_key.setdefault(canonical(dept.code), entry)
+        for entry in by_id.values():
+            # A department name always wins over a clashing code
+            by_key[canonical(entry[0].name)] = entry
+        # Legacy hods rows whose department matches no Department row still resolve
+        for key, hod in legacy_by_dept.items():
+            if key:
+                by_key.setdefault(key, (None, legacy_contact(hod)))
+
+        # Database rows are added last so they override the static alias rules
+        programs = {}
+        for mapping in mappings:
+            programs[canonical(mapping.program_name)] = mapping.department_name
+            aliases.add(mapping.program_name, mapping.department_name)
+        for key in legacy_by_dept:
+            aliases.add(key, key)
+        for ref, _ in by_id.values():
+            if ref.code:
+                aliases.add(ref.code, ref.name)
+            aliases.add(ref.name, ref.name)
+
+        self._aliases, self._by_key, self._by_id, self._programs = aliases, by_key, by_id, programs
+        # Content digest, so workers agree and a rebuild without changes keeps the version
+        self._version = make_etag(repr(sorted(by_key.items())), repr(sorted(programs.items())))
+
+    @property
+    def version(self):
+        self._ensure()
+        return self._version
+
+    def resolve(self, *names):
+        """(DeptRef | None, HodContact | None) for the first of names that resolves:
+        exact alias/name/code/program first, then fuzzy token matching"""
+        self._ensure()
+        aliases, by_key = self._aliases, self._by_key
+        names = [n for n in names if n and str(n).strip()]
+        for name in names:
+            target = aliases.exact(name)
+            if target in by_key:
+                return by_key[target]
+        for name in names:
+            entry = aliases.fuzzy(name, resolve=by_key.get)
+            if entry:
+                return entry
+        return None, None
+
+    def by_id(self, dept_id):
+        self._ensure()
+        return self._by_id.get(dept_id, (None, None))
+
+    def by_code(self, code):
+        self._ensure()
+        entry = self._by_key.get(self._aliases.canonical(code))
+        return entry if entry and entry[0] and (entry[0].code or '').lower() == (code or '').strip().lower() else (None, None)
+
+    def program_department(self, program_name):
+        """Mapped department name for a program, or None"""
+        self._ensure()
+        return self._programs.get(self._aliases.canonical(program_name))
+
+
+hod_directory = HodDirectory()
+
+
+# ============================================================================
+# CONDITIONAL GET
+# Strong ETags derived from each row's row_version, an integer bumped on every
+# ORM update (and by the _shift_slots UPDATE), plus its timestamp for writes
+# made outside the app. The timestamp alone is not enough: MySQL DATETIME has
+# one-second resolution, so two writes in the same second would share it. The
+# freshness check selects only those columns, so a 304 never loads the full
+# row or runs to_dict(). Last-Modified is not sent for the same reason.
+# ============================================================================
+VERSIONED_MODELS = (User, Student, SubActivity, CourseRegistration, Event)
+
+
+def _bump_row_version(mapper, connection, target):
+    # before_update also fires for objects without net column changes
+    if db.session.is_modified(target, include_collections=False):
+        target.row_version = (target.row_version or 0) + 1
+
+
+for _model in VERSIONED_MODELS:
+    event.listen(_model, 'before_update', _bump_row_version)
+
+
+def make_etag(*parts):
+    """Stable validator for the given parts (identical across workers)"""
+    return hashlib.sha1('|'.join('' if p is None else str(p) for p in parts).encode('utf-8')).hexdigest()[:24]
+
+
+def not_modified(etag):
+    """304 response when the client's copy is current, else None"""
+    if not request.if_none_match or not request.if_none_match.contains_weak(etag):
+        return None
+    return with_validators(app.response_class(status=304), etag)
+
+
+def with_validators(response, etag):
+    """Attach the ETag and make clients revalidate before reuse"""
+    response.set_etag(etag)
+    response.headers['Cache-Control'] = 'private, no-cache'
+    return response
+
+
+def row_etag(name, row_id, version, stamp, *parts):
+    return make_etag(name, row_id, version, stamp.isoformat() if stamp else None, *parts)
+
+
+def conditional_get(model, row_id, stamp_column, not_found_message):
+    """GET handler for a single row keyed by id, answering 304 from its row_version and timestamp"""
+    row = db.session.query(model.row_version, stamp_column).filter(model.id == row_id).first()
+    if not row:
+        return jsonify({"error": not_found_message}), 404
+    etag = row_etag(model.__tablename__, row_id, row[0], row[1])
+    cached = not_modified(etag)
+    if cached:
+        return cached
+
+    obj = model.query.get(row_id)
+    return with_validators(jsonify(obj.to_dict()), etag)
+
+
+# ============================================================================
+# KEYSET PAGINATION
+# List endpoints return newest-first pages ordered by (timestamp, id) instead
+# of the whole filtered table. ?limit= sets the page size (PAGE_SIZE_DEFAULT,
+# capped at PAGE_SIZE_MAX), ?cursor= continues after the last row of the
+# previous page and ?count=true adds the filtered total. The next cursor and
+# the total travel in X-Next-Cursor / X-Total-Count so list bodies keep their
+# shape. Seeking on the index means every page costs the same.
+# ============================================================================
+PAGE_SIZE_DEFAULT = int(os.getenv('PAGE_SIZE_DEFAULT', '100'))
+PAGE_SIZE_MAX = int(os.getenv('PAGE_SIZE_MAX', '500'))
+
+Page = namedtuple('Page', ['rows', 'next_cursor', 'total'])
+
+
+def encode_cursor(stamp, row_id):
+    raw = json.dumps([stamp.isoformat() if stamp else None, row_id], separators=(',', ':'))
+    return base64.urlsafe_b64encode(raw.encode('utf-8')).decode('ascii').rstrip('=')
+
+
+def decode_cursor(token, stamp_column):
+    """(stamp, id) from a cursor token; raises ValueError if it was not issued by encode_cursor"""
+    raw = base64.urlsafe_b64decode(token + '=' * (-len(token) % 4))
+    stamp, row_id = json.loads(raw)
+    if not isinstance(row_id, int):
+        raise ValueError('bad cursor id')
+    if stamp is not None:
+        parse = date.fromisoformat if stamp_column.type.python_type is date else datetime.fromisoformat
+        stamp = parse(stamp)
+    return stamp, row_id
+
+
+def keyset_page(query, stamp_column, id_column):
+    """Apply ?cursor=/?limit=/?count= to a filtered query.
+    Returns (Page, None) or (None, error response)."""
+    limit = request.args.get('limit', PAGE_SIZE_DEFAULT, type=int)
+    limit = max(1, min(limit or PAGE_SIZE_DEFAULT, PAGE_SIZE_MAX))
+    want_total = request.args.get('count', '').lower() in ('1', 'true', 'yes')
+    total = query.order_by(None).count() if want_total else None
+
+    token = request.args.get('cursor')
+    if token:
+        try:
+            stamp, last_id = decode_cursor(token, stamp_column)
+        except (ValueError, TypeError):
+            return None, (jsonify({"error": "Invalid cursor"}), 400)
+        # NULL stamps sort last in descending order, after every dated row
+        if stamp is None:
+            query = query.filter(stamp_column.is_(None), id_column < last_id)
+        else:
+            query = query.filter(
+                (stamp_column < stamp)
+                | ((stamp_column == stamp) & (id_column < last_id))
+                | stamp_column.is_(None)
+            )
+
+    rows = query.order_by(stamp_column.desc(), id_column.desc()).limit(limit + 1).all()
+    next_cursor = None
+    if len(rows) > limit:
+        rows = rows[:limit]
+        last = rows[-1]
+        next_cursor = encode_cursor(getattr(last, stamp_column.key), getattr(last, id_column.key))
+    return Page(rows, next_cursor, total), None
+
+
+def with_page_headers(response, page):
+    if page.next_cursor:
+        response.headers['X-Next-Cursor'] = page.next_cursor
+    if page.total is not None:
+        response.headers['X-Total-Count'] = str(page.total)
+    return response
+
+
+# ============================================================================
+# CATALOG SNAPSHOT
+# Roles, departments, program mappings, activities (and the classes among
+# them), sub-activities and activity leads change rarely but are read on
+# every page load. They are served from one immutable snapshot that is
+# rebuilt as a whole and swapped in atomically after any committed write to
+# those tables (tracked by the session events below). The snapshot version is
+# a digest of its contents, so it is the same on every worker and doubles as
+# the /api/catalog ETag. CATALOG_TTL bounds staleness for writes made by other
+# workers or by the import scripts.
+# Sub-activity slot counts change on every approval, so they are not part of
+# what invalidates the snapshot: writes touching only SUB_ACTIVITY_SLOT_FIELDS
+# (including the _shift_slots UPDATE) leave it alone, and readers overlay the
+# live values from one narrow query over sub_activities (Catalog.slots).
+# ============================================================================
+CATALOG_TTL = float(os.getenv('CATALOG_TTL', '60'))
+
+# Department codes -> the department label used in activity data
+# (DSAI classes are filed under "AI and Data Science")
+DEPT_CODE_TO_ACTIVITY_DEPT = {
+    'BA': 'B.A.',
+    'BCom': 'B.Com.',
+    'BBA': 'B.B.A.',
+    'BCA': 'B.C.A.',
+    'BSc': 'B.Sc.',
+    'DSAI': 'AI and Data Science'
+}
+
+CATALOG_MODELS = (Role, Department, ProgramDepartmentMapping, Activity, SubActivity)
+# User columns that feed the activity lead listing
+CATALOG_USER_FIELDS = ('assigned_activity_name', 'is_active', 'full_name', 'email', 'phone')
+# SubActivity columns overlaid live by Catalog.slots instead of invalidating the snapshot
+SUB_ACTIVITY_SLOT_FIELDS = ('filled_slots', 'is_active', 'updated_at')
+
+class ProgramIndex:
+    """Exact and prefix lookups over activity names, program codes and short names"""
+
+    def __init__(self, activities):
+        self._by_code, self._by_short, self._by_name = {}, {}, {}
+        for activity, item in activities:
+            # setdefault keeps the lowest id, matching the old .first() queries
+            code, short = activity.program_keys()
+            if code:
+                self._by_code.setdefault(code, item)
+            if short:
+                self._by_short.setdefault(short.lower(), item)
+            self._by_name.setdefault((activity.name or '').lower(), item)
+        self._code_keys = sorted(self._by_code)
+        self._short_keys = sorted(self._by_short)
+
+    def by_code(self, code):
+        return self._by_code.get(str(code).strip())
+
+    def by_name(self, name):
+        """Activity by exact name, falling back to its program short name (case-insensitive)"""
+        key = name.strip().lower()
+        return self._by_name.get(key) or self._by_short.get(key)
+
+    def prefix(self, text, limit=20):
+        """Activities whose program code or short name starts with text"""
+        found = {}
+        for keys, index, needle in ((self._code_keys, self._by_code, text.strip()),
+                                    (self._short_keys, self._by_short, text.strip().lower())):
+            position = bisect.bisect_left(keys, needle)
+            while position < len(keys) and keys[position].startswith(needle) and len(found) < limit:
+                item = index[keys[position]]
+                found.setdefault(item['id'], item)
+                position += 1
+        return sorted(found.values(), key=lambda item: item['id'])
+
+
+CatalogSnapshot = namedtuple('CatalogSnapshot', [
+    'version', 'built_at', 'roles', 'departments', 'program_mappings', 'activities',
+    'sub_activities', 'coordinator_activities', 'main_leads', 'sub_leads',
+    'classes', 'classes_by_label', 'programs', 'sub_activities_by_id'
+])
+
+
+def slot_entry(total, filled, is_active, updated_at):
+    """Slot fields of a sub-activity, computed as in SubActivity.to_dict"""
+    total = total if total is not None else 0
+    available = total - (filled if filled is not None else 0)
+    return {
+        'totalSlots': total,
+        'filledSlots': filled if filled is not None else 0,
+        'availableSlots': available,
+        'isFull': available <= 0,
+        'isActive': is_active if is_active is not None else True,
+        'updatedAt': updated_at.isoformat() if updated_at else None
+    }
+
+
+def class_entry(activity):
+    """Class view of an activity as listed under a department"""
+    data = activity.data or {}
+    return {
+        'id': activity.id,
+        'name': activity.name,
+        'description': data.get('description', ''),
+        'programName': data.get('programName', ''),
+        'programCode': data.get('programCode', ''),
+        'batch': data.get('batch', ''),
+        'status': data.get('status', 'Running')
+    }
+
+
+class Catalog:
+    """Holder for the current CatalogSnapshot; readers never see a half-built one"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._snapshot = None
+        self._stale = True
+        self._expires_at = 0.0
+        self.rebuilds = 0
+
+    def invalidate(self):
+        self._stale = True
+
+    def current(self):
+        snapshot = self._snapshot
+        if snapshot is not None and not self._stale and time.monotonic() < self._expires_at:
+            return snapshot
+        with self._lock:
+            if self._snapshot is None or self._stale or time.monotonic() >= self._expires_at:
+                # Clear the flag first so a write committed mid-build marks it stale again
+                self._stale = False
+                self._snapshot = self._build()
+                self._expires_at = time.monotonic() + CATALOG_TTL
+                self.rebuilds += 1
+            return self._snapshot
+
+    def _build(self):
+        roles = tuple(r.to_dict() for r in Role.query.order_by(Role.id).all())
+        departments = tuple(d.to_dict() for d in Department.query.order_by(Department.id).all())
+        program_mappings = tuple(
+            m.to_dict() for m in ProgramDepartmentMapping.query.order_by(ProgramDepartmentMapping.id).all()
+        )
+
+        activities, classes, classes_by_label, program_rows = [], [], {}, []
+        for position, activity in enumerate(Activity.query.order_by(Activity.id).all()):
+            activities.append(activity.to_dict())
+            program_rows.append((activity, activities[-1]))
+            data = activity.data or {}
+            entry = class_entry(activity)
+            classes.append({**entry, 'department': data.get('department', '')})
+            if data.get('department') is not None:
+                classes_by_label.setdefault(data['department'], []).append((position, entry))
+
+        subs = SubActivity.query.order_by(SubActivity.id).all()
+        sub_activities, coordinator_activities, sub_leads = [], {}, {}
+        for sub in subs:
+            sub_activities.append(sub.to_dict())
+            if sub.activity_name not in coordinator_activities:
+                coordinator_activities[sub.activity_name] = {
+                    'name': sub.activity_name,
+                    'activityHeadName': sub.activity_head_name or 'Not Assigned',
+                    'activityHeadPhone': sub.activity_head_phone or '',
+                    'subActivityCount': 0
+                }
+            coordinator_activities[sub.activity_name]['subActivityCount'] += 1
+            # Every lead is kept; live_sub_leads drops closed sub-activities at read time
+            if sub.sub_activity_lead_name:
+                sub_leads.setdefault((sub.activity_name or '').lower(), []).append({
+                    'subActivityId': sub.id,
+                    'subActivityName': sub.sub_activity_name,
+                    'leadName': sub.sub_activity_lead_name,
+                    'leadPhone': sub.sub_activity_lead_phone,
+                    'activityHeadName': sub.activity_head_name,
+                    'activityHeadPhone': sub.activity_head_phone
+                })
+
+        main_leads = {}
+        leads = User.query.filter(
+            User.assigned_activity_name.isnot(None),
+            User.is_active == True
+        ).order_by(User.id).all()
+        for lead in leads:
+            main_leads.setdefault(lead.assigned_activity_name.lower(), {
+                'name': lead.full_name,
+                'email': lead.email,
+                'phone': lead.phone,
+                'role': 'Main Activity Lead',
+                'activity': lead.assigned_activity_name,
+                'available': True
+            })
+
+        content = {
+            'roles': roles,
+            'departments': departments,
+            'programMappings': program_mappings,
+            'activities': activities,
+            'subActivities': sub_activities,
+            'mainLeads': main_leads,
+        }
+        version = make_etag(json.dumps(content, sort_keys=True, default=str))
+        return CatalogSnapshot(
+            version=version,
+            built_at=datetime.utcnow(),
+            roles=roles,
+            departments=departments,
+            program_mappings=program_mappings,
+            activities=tuple(activities),
+            sub_activities=tuple(sub_activities),
+            coordinator_activities=tuple(coordinator_activities.values()),
+            main_leads=main_leads,
+            sub_leads={name: tuple(items) for name, items in sub_leads.items()},
+            classes=tuple(classes),
+            classes_by_label={label: tuple(items) for label, items in classes_by_label.items()},
+            programs=ProgramIndex(program_rows),
+            sub_activities_by_id={item['id']: item for item in sub_activities}
+        )
+
+    def slots(self, sub_ids=None):
+        """Live slot fields by sub-activity id; one narrow query, never cached"""
+        query = db.session.query(
+            SubActivity.id, SubActivity.total_slots, SubActivity.filled_slots,
+            SubActivity.is_active, SubActivity.updated_at
+        )
+        if sub_ids is not None:
+            query = query.filter(SubActivity.id.in_(list(sub_ids)))
+        return {row[0]: slot_entry(*row[1:]) for row in query.all()}
+
+    def live_sub_activities(self, snapshot, slots=None):
+        """Snapshot sub-activities with the live slot fields overlaid"""
+        slots = self.slots() if slots is None else slots
+        return [{**item, **slots[item['id']]} for item in snapshot.sub_activities if item['id'] in slots]
+
+    def live_sub_leads(self, leads, slots=None):
+        """Sub-activity leads of open sub-activities, with live slot counts"""
+        if slots is None:
+            slots = self.slots(lead['subActivityId'] for lead in leads)
+        live = []
+        for lead in leads:
+            slot = slots.get(lead['subActivityId'])
+            if slot and slot['isActive']:
+                live.append({**lead, 'totalSlots': slot['totalSlots'], 'availableSlots': slot['availableSlots']})
+        return live
+
+    def classes_for(self, snapshot, dept):
+        """Classes filed under the department's code or its mapped activity label"""
+        labels = {dept['code'], DEPT_CODE_TO_ACTIVITY_DEPT.get(dept['code'])} - {None}
+        matched = [item for label in labels for item in snapshot.classes_by_label.get(label, ())]
+        return [entry for _, entry in sorted(matched, key=lambda item: item[0])]
+
+    def stats(self):
+        snapshot = self._snapshot
+        return {
+            'version': snapshot.version if snapshot else None,
+            'builtAt': snapshot.built_at.isoformat() if snapshot else None,
+            'rebuilds': self.rebuilds,
+            'stale': self._stale
+        }
+
+
+catalog = Catalog()
+
+
+def _touches_catalog(session):
+    for obj in list(session.new) + list(session.deleted):
+        if isinstance(obj, CATALOG_MODELS) or (isinstance(obj, User) and obj.assigned_activity_name):
+            return True
+    for obj in session.dirty:
+        if isinstance(obj, SubActivity):
+            state = sa_inspect(obj)
+            if any(attr.history.has_changes() for attr in state.attrs if attr.key not in SUB_ACTIVITY_SLOT_FIELDS):
+                return True
+        elif isinstance(obj, CATALOG_MODELS):
+            return True
+        if isinstance(obj, User):
+            state = sa_inspect(obj)
+            if any(state.attrs[field].history.has_changes() for field in CATALOG_USER_FIELDS):
+                return True
+    return False
+
+
+@event.listens_for(db.session, 'after_flush')
+def _mark_catalog_writes(session, flush_context):
+    if _touches_catalog(session):
+        session.info['catalog_dirty'] = True
+
+
+@event.listens_for(db.session, 'do_orm_execute')
+def _mark_catalog_bulk_writes(orm_execute_state):
+    if orm_execute_state.is_update or orm_execute_state.is_delete:
+        if orm_execute_state.execution_options.get('slots_only'):
+            return
+        mapper = orm_execute_state.bind_mapper
+        if mapper is not None and issubclass(mapper.class_, CATALOG_MODELS + (User,)):
+            orm_execute_state.session.info['catalog_dirty'] = True
+
+
+@event.listens_for(db.session, 'after_commit')
+def _rebuild_catalog_after_commit(session):
+    if session.info.pop('catalog_dirty', False):
+        catalog.invalidate()
+        static_catalog.schedule()
+
+
+@event.listens_for(db.session, 'after_rollback')
+def _discard_catalog_writes(session):
+    session.info.pop('catalog_dirty', None)
+
+
+@app.route('/api/catalog', methods=['GET'])
+def get_catalog():
+    """Roles, departments, program mappings, activities, sub-activities and leads in one bundle"""
+    snapshot = catalog.current()
+    slots = catalog.slots()
+    version = make_etag(snapshot.version, json.dumps(slots, sort_keys=True))
+    cached = not_modified(version)
+    if cached:
+        return cached
+    return with_validators(jsonify({
+        'version': snapshot.version,
+        'builtAt': snapshot.built_at.isoformat(),
+        'roles': snapshot.roles,
+        'departments': snapshot.departments,
+        'programMappings': snapshot.program_mappings,
+        'activities': snapshot.activities,
+        'classes': snapshot.classes,
+        'subActivities': catalog.live_sub_activities(snapshot, slots),
+        'coordinatorActivities': snapshot.coordinator_activities,
+        'activityLeads': {
+            'mainLeads': snapshot.main_leads,
+            'subLeads': {
+                name: live
+                for name, leads in snapshot.sub_leads.items()
+                for live in [catalog.live_sub_leads(leads, slots)] if live
+            }
+        }
+    }), version)
+
+
+# ============================================================================
+# STATIC CATALOG EXPORT
+# Writes the public catalogs guest pages read (activities, sub-activities,
+# departments, approved event calendar) as content-hashed JSON files plus a
+# gzip copy of each into CATALOG_EXPORT_DIR (web/catalog by default), and a
+# small manifest.json naming the current files. Hashed files never change, so
+# a CDN or the static server (nginx gzip_static) can cache them forever; only
+# the manifest needs a short TTL. When CATALOG_EXPORT is on, a background
+# thread re-exports CATALOG_EXPORT_DEBOUNCE seconds after a commit touches
+# the catalog tables or events. utils/export_static_catalog.py runs it once.
+# A file the manifest stops naming is kept for CATALOG_EXPORT_MAX_AGE seconds
+# (the manifest's max-age at the static server / CDN), so a manifest cached
+# downstream never points at a deleted file. Slot counts change on every
+# approval and are left out; pages read them from /api/sub-activities.
+# ============================================================================
+CATALOG_EXPORT_ENABLED = os.getenv('CATALOG_EXPORT', 'off').lower() in ('1', 'true', 'on', 'yes')
+CATALOG_EXPORT_DIR = os.getenv('CATALOG_EXPORT_DIR', os.path.join(WEB_DIR, 'catalog'))
+CATALOG_EXPORT_URL = os.getenv('CATALOG_EXPORT_URL', '/catalog').rstrip('/')
+CATALOG_EXPORT_DEBOUNCE = float(os.getenv('CATALOG_EXPORT_DEBOUNCE', '2'))
+CATALOG_EXPORT_MAX_AGE = int(os.getenv('CATALOG_EXPORT_MAX_AGE', '300'))  # manifest.json max-age downstream
+
+# Sub-activity fields that move with approvals (see Catalog.slots); not exported
+LIVE_SLOT_FIELDS = ('filledSlots', 'availableSlots', 'isFull', 'isActive', 'updatedAt')
+EXPORT_FILE_PATTERN = re.compile(r'^([a-z-]+\.[0-9a-f]{16}\.json)(\.gz)?$')
+
+# Event fields safe to publish (assigned students are left out)
+PUBLIC_EVENT_FIELDS = (
+    'id', 'eventName', 'activityName', 'subActivityId', 'eventDate', 'eventEndDate', 'eventTime',
+    'location', 'description', 'eventType', 'eventStatus', 'requiredStudents'
+)
+
+
+def public_event_calendar():
+    events = Event.query.filter(
+        (Event.event_status == 'approved') | Event.event_status.is_(None),
+        Event.is_active.isnot(False)
+    ).order_by(Event.event_date.asc(), Event.id.asc()).all()
+    calendar_rows = []
+    for e in events:
+        data = e.to_dict()
+        calendar_rows.append({field: data[field] for field in PUBLIC_EVENT_FIELDS})
+    return calendar_rows
+
+
+def _write_atomic(path, content):
+    """Write through a uniquely named temp file in the same directory, so concurrent
+    writers (workers, the export script) never share or clobber a half-written file"""
+    fd, tmp = tempfile.mkstemp(dir=os.path.dirname(path), prefix=f".{os.path.basename(path)}.", suffix='.tmp')
+    try:
+        with os.fdopen(fd, 'wb') as f:
+            f.write(content)
+        os.chmod(tmp, 0o644)  # mkstemp creates 0600; the static server must be able to read it
+        os.replace(tmp, path)
+    except BaseException:
+        try:
+            os.remove(tmp)
+        except OSError:
+            pass
+        raise
+
+
+class StaticCatalogExporter:
+    """Content-hashed, precompressed JSON snapshots of the public catalogs"""
+
+    def __init__(self, directory, url_prefix, max_age):
+        self.directory = directory
+        self.url_prefix = url_prefix
+        self.max_age = max(0, max_age)
+        self.version = None
+        self._lock = threading.Lock()
+        self._wake = threading.Event()
+        self._worker = None
+        self._stats = {'exports': 0, 'unchanged': 0, 'errors': 0}
+
+    def _payloads(self):
+        snapshot = catalog.current()
+        return {
+            'activities': list(snapshot.activities),
+            'sub-activities': [
+                {k: v for k, v in item.items() if k not in LIVE_SLOT_FIELDS} for item in snapshot.sub_activities
+            ],
+            'departments': list(snapshot.departments),
+            'events': public_event_calendar(),
+        }
+
+    def export(self):
+        """Write any changed catalog files and the manifest; returns the manifest"""
+        with self._lock:
+            os.makedirs(self.directory, exist_ok=True)
+            files = {}
+            for name, payload in self._payloads().items():
+                body = json.dumps(payload, sort_keys=True, separators=(',', ':'), default=str).encode('utf-8')
+                digest = hashlib.sha256(body).hexdigest()
+                filename = f"{name}.{digest[:16]}.json"
+                path = os.path.join(self.directory, filename)
+                if not os.path.exists(path):
+                    # mtime=0 keeps the gzip bytes identical for identical content
+                    _write_atomic(path + '.gz', gzip.compress(body, compresslevel=9, mtime=0))
+                    _write_atomic(path, body)
+                files[name] = {
+                    'url': f"{self.url_prefix}/{filename}",
+                    'gzipUrl': f"{self.url_prefix}/{filename}.gz",
+                    'sha256': digest,
+                    'bytes': len(body),
+                    'count': len(payload)
+                }
+
+            version = make_etag(json.dumps({n: f['sha256'] for n, f in files.items()}, sort_keys=True))
+            manifest = {'version': version, 'generatedAt': datetime.utcnow().isoformat(), 'files': files}
+            manifest_path = os.path.join(self.directory, 'manifest.json')
+            current = {entry['url'].rsplit('/', 1)[-1] for entry in files.values()}
+            if version == self.version and os.path.exists(manifest_path):
+                self._stats['unchanged'] += 1
+                self._prune(current)
+                return manifest
+            self._retire(manifest_path, current)
+            _write_atomic(manifest_path, json.dumps(manifest, indent=2).encode('utf-8'))
+            self.version = version
+            self._stats['exports'] += 1
+            self._prune(current)
+            logger.info(f"Static catalog exported: version {version}")
+            return manifest
+
+    def _retire(self, manifest_path, current):
+        """Stamp the files the outgoing manifest names but the new one does not with
+        the time they were dropped; _prune measures their age from that mtime"""
+        try:
+            with open(manifest_path, 'rb') as f:
+                previous = json.load(f).get('files', {})
+        except (OSError, ValueError, AttributeError):
+            return
+        now = time.time()
+        for entry in previous.values():
+            filename = str(entry.get('url', '')).rsplit('/', 1)[-1]
+            if filename in current or not EXPORT_FILE_PATTERN.match(filename):
+                continue
+            for name in (filename, filename + '.gz'):
+                try:
+                    os.utime(os.path.join(self.directory, name), (now, now))
+                except OSError:
+                    pass
+
+    def _prune(self, current):
+        """Delete catalog files that are not in the current manifest and were
+        dropped from it more than max_age seconds ago"""
+        cutoff = time.time() - self.max_age
+        for filename in os.listdir(self.directory):
+            match = EXPORT_FILE_PATTERN.match(filename)
+            if not match or match.group(1) in current:
+                continue
+            path = os.path.join(self.directory, filename)
+            try:
+                if os.path.getmtime(path) < cutoff:
+                    os.remove(path)
+            except OSError:
+                pass
+
+    def schedule(self):
+        """Ask the background exporter (if running) for a new export"""
+        if self._worker is not None:
+            self._wake.set()
+
+    def _run(self):
+        while True:
+            self._wake.wait()
+            # Let a burst of commits settle into one export
+            time.sleep(CATALOG_EXPORT_DEBOUNCE)
+            self._wake.clear()
+            with app.app_context():
+                try:
+                    self.export()
+                except Exception as e:
+                    self._stats['errors'] += 1
+                    logger.error(f"Static catalog export failed: {e}\n{traceback.format_exc()}")
+                finally:
+                    db.session.remove()
+
+    def start(self):
+        if self._worker is None:
+            self._worker = threading.Thread(target=self._run, name='catalog-exporter', daemon=True)
+            self._worker.start()
+            self._wake.set()
+
+    def metrics(self):
+        return {**self._stats, 'version': self.version, 'directory': self.directory}
+
+
+static_catalog = StaticCatalogExporter(CATALOG_EXPORT_DIR, CATALOG_EXPORT_URL, CATALOG_EXPORT_MAX_AGE)
+
+
+@event.listens_for(db.session, 'after_flush')
+def _mark_event_writes(session, flush_context):
+    for obj in list(session.new) + list(session.dirty) + list(session.deleted):
+        if isinstance(obj, Event):
+            session.info['events_dirty'] = True
+            return
+
+
+@event.listens_for(db.session, 'do_orm_execute')
+def _mark_event_bulk_writes(orm_execute_state):
+    if orm_execute_state.is_update or orm_execute_state.is_delete:
+        mapper = orm_execute_state.bind_mapper
+        if mapper is not None and mapper.class_ is Event:
+            orm_execute_state.session.info['events_dirty'] = True
+
+
+@event.listens_for(db.session, 'after_commit')
+def _export_events_after_commit(session):
+    if session.info.pop('events_dirty', False):
+        static_catalog.schedule()
+
+
+@event.listens_for(db.session, 'after_rollback')
+def _discard_event_writes(session):
+    session.info.pop('events_dirty', None)
+
+
 # Authentication Endpoints
 @app.route('/api/auth/student', methods=['POST'])
+@rate_limit('student_auth', ip='600/60', account='10/60', account_key=_json_field('rollNumber', 'email'))
 def auth_student():
     """Student authentication endpoint - fetch from students table using roll number"""
     payload = request.get_json(silent=True) or {}
@@ -706,8 +2824,12 @@ def auth_student():
     if not roll_number:
         return jsonify({"error": "Roll number is required"}), 400
     
-    # Check in students table (where we imported CSV data)
-    student = Student.query.filter_by(lookup_key=roll_number).first()
+    entry = roll_index.lookup(roll_number)
+    if entry is None:
+        return jsonify({"error": "Student not found with this roll number"}), 404
+
+    # Students table (where we imported CSV data): one primary-key read for the profile
+    student = Student.query.get(entry.student_id) if isinstance(entry, RollEntry) else None
     if student:
         # Extract student name from profile or use roll number
         profile = student.profile or {}
@@ -725,37 +2847,45 @@ def auth_student():
             }
         })
     
-    # Second check: Look in unified users table (case-insensitive for employee_id/roll_no)
-    user = User.query.filter(
-        (func.lower(User.employee_id) == func.lower(roll_number)),
-        User.is_active == True
-    ).first()
-    
-    if user:
-        role = Role.query.get(user.role_id)
-        if role and role.name == 'STUDENT':
-            return jsonify({
-                "success": True,
-                "student": {
-                    "name": user.full_name,
-                    "rollNo": user.employee_id,
-                    "email": user.email,
-                    "role": "STUDENT"
-                }
-            })
+    # Second check: active STUDENT users from the unified users table (case-insensitive employee_id)
+    if isinstance(entry, StudentUserEntry):
+        return jsonify({
+            "success": True,
+            "student": {
+                "name": entry.name,
+                "rollNo": entry.roll_no,
+                "email": entry.email,
+                "role": "STUDENT"
+            }
+        })
     
     return jsonify({"error": "Student not found with this roll number"}), 404
 
 
 @app.route('/api/student/profile/<string:roll_number>', methods=['GET'])
+@rate_limit('student_profile', ip='300/60', account='20/60', account_key=_view_arg('roll_number'))
 def get_student_profile(roll_number):
     """Get complete student profile by roll number for auto-fill"""
     roll_number = roll_number.strip().lower()
     
-    student = Student.query.filter_by(lookup_key=roll_number).first()
-    if not student:
+    stamp = db.session.query(
+        Student.id, Student.row_version, Student.updated_at
+    ).filter_by(lookup_key=roll_number).first()
+    if not stamp:
         return jsonify({"error": "Student not found", "rollNumber": roll_number}), 404
     
+    # The response also carries HOD details, so the directory version is part of the validator
+    etag = row_etag('student-profile', stamp.id, stamp.row_version, stamp.updated_at, hod_directory.version)
+    cached = not_modified(etag)
+    if cached:
+        return cached
+    
+    student = Student.query.get(stamp.id)
+    return with_validators(jsonify(build_student_profile(student, roll_number)), etag)
+
+
+def build_student_profile(student, roll_number):
+    """Profile payload for one student: profile fields, resolved department and HOD"""
     profile = student.profile or {}
     
     # Get department info - first try profile, then fall back to student.department column
@@ -772,90 +2902,29 @@ def get_student_profile(roll_number):
     if not dept_name:
         dept_name = program
     
-    # If no departmentCode but we have department name, try to find the department
-    if not dept_code and dept_name:
-        # First try the mapped department name
-        dept = Department.query.filter_by(name=dept_name).first()
-        if not dept:
-            # Try using program-to-department mapping
-            mapped_dept = get_program_to_department_mapping(dept_name)
-            dept = Department.query.filter_by(name=mapped_dept).first()
-        if not dept:
-            # Try matching by program name
-            dept = Department.query.filter(func.lower(Department.name).like(func.lower(f'%{dept_name}%'))).first()
-        if dept:
-            dept_code = dept.code
-            dept_id = dept.id
-            # Update dept_name to the actual department name
-            dept_name = dept.name
-    
-    # Get HOD info for student's department - check both User table AND hods table
-    hod_info = None
-    
-    # DSAI umbrella variants for matching
-    dsai_variants = ['data science & ai', 'data science and ai', 'ds & ai', 'ds&ai', 'dsai', 
-                     'artificial intelligence', 'b.sc.-honours(ai)', 'ai']
-    def is_dsai(name):
-        name_lower = (name or '').lower()
-        return any(v in name_lower or name_lower in v for v in dsai_variants)
-    
-    # First try direct lookup in hods table by department name
-    hod = HOD.query.filter(
-        (func.lower(HOD.department) == func.lower(dept_name)) |
-        (func.lower(HOD.department) == func.lower(dept_code if dept_code else ''))
-    ).first()
-    
-    # If not found and this looks like DSAI, try DSAI variants
-    if not hod and is_dsai(dept_name):
-        hod = HOD.query.filter(
-            (func.lower(HOD.department) == 'dsai') |
-            (func.lower(HOD.department).like('%data science%'))
-        ).first()
+    # One lookup in the HOD directory resolves the department and its HOD
+    dept, hod = hod_directory.resolve(dept_name, dept_code, profile.get('pcode'))
+    if dept and not dept_code:
+        dept_code = dept.code
+        dept_id = dept.id
+        # Update dept_name to the actual department name
+        dept_name = dept.name
     
+    hod_info = None
     if hod:
         hod_info = {
             'name': hod.name,
             'email': hod.email,
             'phone': hod.phone,
-            'departmentId': dept_id,
+            'departmentId': dept_id or (dept.id if dept else None),
             'department': hod.department,
             'available': True
         }
     
-    # Fallback: check User table for HOD
-    if not hod_info:
-        # If dept_id is null, try to find it by department name first
-        lookup_dept_id = dept_id
-        if not lookup_dept_id and dept_name:
-            # Try direct match
-            dept_lookup = Department.query.filter(
-                (func.lower(Department.name) == func.lower(dept_name)) |
-                (func.lower(Department.code) == func.lower(dept_name))
-            ).first()
-            # If DSAI variant, try broader match
-            if not dept_lookup and is_dsai(dept_name):
-                dept_lookup = Department.query.filter(
-                    (func.lower(Department.name).like('%data science%')) |
-                    (func.lower(Department.code) == 'dsai')
-                ).first()
-            if dept_lookup:
-                lookup_dept_id = dept_lookup.id
-        
-        if lookup_dept_id:
-            hod_user = User.query.filter_by(assigned_department_id=lookup_dept_id).first()
-            if hod_user:
-                hod_info = {
-                    'name': hod_user.full_name,
-                    'email': hod_user.email,
-                    'phone': hod_user.phone,
-                    'departmentId': lookup_dept_id,
-                    'available': True
-                }
-    
     if not hod_info:
         hod_info = {'available': False, 'message': 'HOD not assigned for this department'}
     
-    return jsonify({
+    return {
         "success": True,
         "student": {
             "rollNo": roll_number.upper(),
@@ -883,9 +2952,88 @@ def get_student_profile(roll_number):
         },
         "hod": hod_info,
         "fieldsFromDb": list(profile.keys())
+    }
+
+
+# ============================================================================
+# MULTI-GET ENDPOINTS
+# Batch variants of the detail endpoints for screens that would otherwise
+# fetch rows one at a time. Each resolves the whole list with one IN query
+# and answers {"items": {<id>: row | null}, "notFound": [...]}.
+# ============================================================================
+MULTI_GET_MAX_BATCH = int(os.getenv('MULTI_GET_MAX_BATCH', '100'))
+
+
+def parse_batch_ids(param, cast=int):
+    """Read a comma-separated ?<param>= list (deduplicated, order kept).
+    Returns (ids, None) or (None, error response)."""
+    raw = request.args.get(param, '')
+    ids = []
+    seen = set()
+    for part in raw.split(','):
+        part = part.strip()
+        if not part:
+            continue
+        try:
+            value = cast(part)
+        except ValueError:
+            return None, (jsonify({"error": f"Invalid value in '{param}': {part}"}), 400)
+        if value not in seen:
+            seen.add(value)
+            ids.append(value)
+    if not ids:
+        return None, (jsonify({"error": f"Query parameter '{param}' is required"}), 400)
+    if len(ids) > MULTI_GET_MAX_BATCH:
+        return None, (jsonify({"error": f"At most {MULTI_GET_MAX_BATCH} values per request", "maxBatch": MULTI_GET_MAX_BATCH}), 400)
+    return ids, None
+
+
+def batch_response(ids, found):
+    """Keyed map of the requested ids, with null and a notFound entry for missing ones"""
+    return jsonify({
+        "items": {str(i): found.get(i) for i in ids},
+        "notFound": [str(i) for i in ids if i not in found]
     })
 
 
+def multi_get(model):
+    ids, error = parse_batch_ids('ids')
+    if error:
+        return error
+    rows = model.query.filter(model.id.in_(ids)).all()
+    return batch_response(ids, {row.id: row.to_dict() for row in rows})
+
+
+@app.route('/api/student/profiles', methods=['GET'])
+@rate_limit('student_profile', ip='300/60', account='20/60', account_key=_query_list('rolls'))
+def get_student_profiles_batch():
+    """Profiles for ?rolls=<roll>,<roll>,... in one query; each roll is charged
+    against the same rate limit buckets as the single-profile endpoint"""
+    rolls, error = parse_batch_ids('rolls', cast=lambda r: r.lower())
+    if error:
+        return error
+    students = Student.query.filter(Student.lookup_key.in_(rolls)).all()
+    return batch_response(rolls, {s.lookup_key: build_student_profile(s, s.lookup_key) for s in students})
+
+
+@app.route('/api/sub-activities/batch', methods=['GET'])
+def get_sub_activities_batch():
+    """Sub-activities for ?ids=1,2,3"""
+    return multi_get(SubActivity)
+
+
+@app.route('/api/events/batch', methods=['GET'])
+def get_events_batch():
+    """Events for ?ids=1,2,3"""
+    return multi_get(Event)
+
+
+@app.route('/api/course-registrations/batch', methods=['GET'])
+def get_course_registrations_batch():
+    """Course registrations for ?ids=1,2,3"""
+    return multi_get(CourseRegistration)
+
+
 @app.route('/api/student/profile/<string:roll_number>', methods=['PUT'])
 def update_student_profile(roll_number):
     """Update student profile with new/modified data"""
@@ -916,6 +3064,7 @@ def update_student_profile(roll_number):
     student.profile = current_profile
     student.updated_at = datetime.utcnow()
     db.session.commit()
+    roll_index.note_students([student])
     
     return jsonify({
         "success": True,
@@ -928,47 +3077,13 @@ def update_student_profile(roll_number):
 def get_activity_lead(activity_name):
     """Get main activity lead and sub-lead for an activity"""
     activity_name = activity_name.strip()
+    snapshot = catalog.current()
     
-    # Find main activity coordinator
-    main_lead = User.query.filter(
-        func.lower(User.assigned_activity_name) == func.lower(activity_name),
-        User.is_active == True
-    ).first()
-    
-    main_lead_info = None
-    if main_lead:
-        main_lead_info = {
-            'name': main_lead.full_name,
-            'email': main_lead.email,
-            'phone': main_lead.phone,
-            'role': 'Main Activity Lead',
-            'activity': main_lead.assigned_activity_name,
-            'available': True
-        }
-    else:
+    # Main activity coordinator and active sub-activity leads, from the catalog snapshot
+    main_lead_info = snapshot.main_leads.get(activity_name.lower())
+    if main_lead_info is None:
         main_lead_info = {'available': False, 'message': f'Activity lead not assigned for {activity_name}'}
-    
-    # Find sub-activity leads from SubActivity table
-    sub_leads = []
-    sub_activities = SubActivity.query.filter(
-        func.lower(SubActivity.activity_name) == func.lower(activity_name),
-        SubActivity.is_active == True
-    ).all()
-    
-    for sub in sub_activities:
-        if sub.sub_activity_lead_name:
-            total_slots = sub.total_slots if sub.total_slots is not None else 0
-            filled_slots = sub.filled_slots if sub.filled_slots is not None else 0
-            sub_leads.append({
-                'subActivityId': sub.id,
-                'subActivityName': sub.sub_activity_name,
-                'leadName': sub.sub_activity_lead_name,
-                'leadPhone': sub.sub_activity_lead_phone,
-                'activityHeadName': sub.activity_head_name,
-                'activityHeadPhone': sub.activity_head_phone,
-                'totalSlots': total_slots,
-                'availableSlots': total_slots - filled_slots
-            })
+    sub_leads = catalog.live_sub_leads(snapshot.sub_leads.get(activity_name.lower(), ()))
     
     return jsonify({
         "success": True,
@@ -981,7 +3096,7 @@ def get_activity_lead(activity_name):
 @app.route('/api/hod/by-department/<string:dept_code>', methods=['GET'])
 def get_hod_by_department_code(dept_code):
     """Get HOD details by department code"""
-    dept = Department.query.filter(func.lower(Department.code) == func.lower(dept_code)).first()
+    dept, hod = hod_directory.by_code(dept_code)
     
     if not dept:
         return jsonify({
@@ -990,9 +3105,7 @@ def get_hod_by_department_code(dept_code):
             "departmentCode": dept_code
         }), 404
     
-    hod_user = User.query.filter_by(assigned_department_id=dept.id).first()
-    
-    if not hod_user:
+    if not hod:
         return jsonify({
             "available": False,
             "departmentId": dept.id,
@@ -1004,10 +3117,10 @@ def get_hod_by_department_code(dept_code):
     return jsonify({
         "available": True,
         "hod": {
-            "name": hod_user.full_name,
-            "email": hod_user.email,
-            "phone": hod_user.phone,
-            "employeeId": hod_user.employee_id
+            "name": hod.name,
+            "email": hod.email,
+            "phone": hod.phone,
+            "employeeId": hod.employee_id
         },
         "department": {
             "id": dept.id,
@@ -1177,6 +3290,7 @@ def upload_profile_photo():
 
 
 @app.route('/api/auth/login', methods=['POST'])
+@rate_limit('login', ip='300/60', account='5/60', account_key=_json_field('email'))
 def unified_login():
     """Unified login endpoint for all users (Creator, HOD, Coordinator)"""
     try:
@@ -1197,13 +3311,19 @@ def unified_login():
             print(f"DEBUG: User '{email}' not found")
             return jsonify({"error": "Invalid email or password"}), 401
         
-        # Verify password
-        if not verify_password(password, user.password_hash):
+        # Verify password (off the request thread, bounded by the password pool)
+        try:
+            password_ok = password_pool.verify(password, user.password_hash)
+        except PasswordPoolBusy:
+            return too_many_requests({"error": "Too many login attempts in progress. Please retry shortly."}, PASSWORD_RETRY_AFTER)
+        if not password_ok:
             print(f"DEBUG: Password verification failed for user '{email}'")
             return jsonify({"error": "Invalid email or password"}), 401
         
         print(f"DEBUG: Login successful for user '{email}' (Role ID: {user.role_id})")
         
+        rehash_password_if_needed(user, password)
+        
         # Update last login
         user.last_login = datetime.utcnow()
         db.session.commit()
@@ -1262,15 +3382,24 @@ def get_current_user():
     if not user_id:
         return jsonify({"error": "Not authenticated"}), 401
     
-    user = User.query.get(user_id)
-    if not user or not user.is_active:
+    stamp = db.session.query(
+        User.row_version, User.updated_at, User.is_active, User.role_id, User.assigned_department_id
+    ).filter(User.id == user_id).first()
+    if not stamp or not stamp.is_active:
         session.clear()
         return jsonify({"error": "User not found"}), 401
     
-    return jsonify({
+    # Role and department names are part of the payload, so their ids are part of the validator
+    etag = row_etag('me', user_id, stamp.row_version, stamp.updated_at, stamp.role_id, stamp.assigned_department_id)
+    cached = not_modified(etag)
+    if cached:
+        return cached
+    
+    user = User.query.get(user_id)
+    return with_validators(jsonify({
         "success": True,
         "user": user.to_dict()
-    })
+    }), etag)
 
 
 @app.route('/api/profile/update', methods=['PUT'])
@@ -1320,6 +3449,8 @@ def update_profile():
     
     try:
         db.session.commit()
+        invalidate_principal(user.id)
+        hod_directory.invalidate()
         return jsonify({
             "success": True,
             "message": "Profile updated successfully",
@@ -1397,6 +3528,7 @@ def create_hod_user():
         )
         db.session.add(legacy_hod)
         db.session.commit()
+        hod_directory.invalidate()
         
         return jsonify({
             "success": True,
@@ -1496,8 +3628,7 @@ def list_hod_users():
         ).all()
         
         result = []
-        for user, dept in hods:
-            d = user.to_dict()
+        for (user, dept), d in zip(hods, serialize_users([user for user, _ in hods])):
             d['departmentName'] = dept.name
             d['departmentCode'] = dept.code
             result.append(d)
@@ -1528,6 +3659,8 @@ def update_hod_user(user_id):
     
     try:
         db.session.commit()
+        invalidate_principal(user.id)
+        hod_directory.invalidate()
         
         # Sync with legacy table if exists
         legacy_hod = HOD.query.filter_by(email=user.email).first() or HOD.query.filter_by(employee_id=user.employee_id).first()
@@ -1539,6 +3672,7 @@ def update_hod_user(user_id):
                 dept = Department.query.get(department_id)
                 if dept: legacy_hod.department = dept.name
             db.session.commit()
+            hod_directory.invalidate()
             
         return jsonify({"success": True, "message": "HOD updated successfully", "user": user.to_dict()})
     except Exception as e:
@@ -1563,6 +3697,8 @@ def delete_hod_user(user_id):
         # Deactivate instead of hard delete for history
         user.is_active = False 
         db.session.commit()
+        invalidate_principal(user.id)
+        hod_directory.invalidate()
         return jsonify({"success": True, "message": "HOD deactivated successfully"})
     except Exception as e:
         db.session.rollback()
@@ -1571,29 +3707,34 @@ def delete_hod_user(user_id):
 
 @app.route('/api/activities/search', methods=['GET'])
 def search_activities():
-    """Search activities by name or pcode"""
+    """Search activities by name or pcode (exact), or by pcode/short-name prefix"""
     name = request.args.get('name')
     pcode = request.args.get('pcode')
+    prefix = request.args.get('prefix')
+    programs = catalog.current().programs
     
     if pcode:
-        # Search in the JSON data field for programCode
-        activity = Activity.query.filter(Activity.data['programCode'] == str(pcode)).first()
+        # programCode lookup through the in-memory program index
+        activity = programs.by_code(pcode)
         if activity:
-            return jsonify(activity.to_dict())
+            return jsonify(activity)
+    
+    if prefix:
+        # Typeahead for the registration form
+        limit = min(request.args.get('limit', 20, type=int) or 20, 100)
+        matches = programs.prefix(prefix, limit)
+        return jsonify({'data': matches, 'total': len(matches)})
             
     if not name:
         return jsonify({"error": "Name or pcode parameter required"}), 400
     
-    # Fuzzy search or exact Match
-    activity = Activity.query.filter(func.lower(Activity.name) == func.lower(name)).first()
-    if not activity:
-        # Try searching by pshort in data
-        activity = Activity.query.filter(func.lower(Activity.data['pshort']) == func.lower(name)).first()
+    # Exact match on the activity name, then on its program short name
+    activity = programs.by_name(name)
         
     if not activity:
         return jsonify({"error": "Activity not found"}), 404
         
-    return jsonify(activity.to_dict())
+    return jsonify(activity)
 
 
 @app.route('/api/creator/faculty', methods=['GET'])
@@ -1602,7 +3743,7 @@ def list_faculty_users():
     """List all Faculty Coordinators"""
     try:
         coordinators = User.query.join(Role).filter(Role.name == 'FACULTY_COORDINATOR', User.is_active == True).all()
-        return jsonify([c.to_dict() for c in coordinators]), 200
+        return jsonify(serialize_users(coordinators)), 200
     except Exception as e:
         return jsonify({"error": str(e)}), 500
 
@@ -1628,6 +3769,7 @@ def update_faculty_user(user_id):
     
     try:
         db.session.commit()
+        invalidate_principal(user.id)
         
         # Sync legacy
         legacy_coord = Coordinator.query.filter_by(email=user.email).first() or Coordinator.query.filter_by(coordinator_id=user.employee_id).first()
@@ -1659,6 +3801,7 @@ def delete_faculty_user(user_id):
             
         user.is_active = False
         db.session.commit()
+        invalidate_principal(user.id)
         return jsonify({"success": True, "message": "Coordinator deactivated successfully"})
     except Exception as e:
         db.session.rollback()
@@ -1674,15 +3817,19 @@ def creator_get_all_registrations():
     Shows activity name, student details, and status (pending/accepted/rejected)
     """
     try:
-        # Get all course registrations with full details
-        registrations = CourseRegistration.query.order_by(
-            CourseRegistration.created_at.desc()
-        ).all()
+        # One page of course registrations, newest first
+        page, error = keyset_page(CourseRegistration.query, CourseRegistration.created_at, CourseRegistration.id)
+        if error:
+            return error
+        
+        # Sub-activity names for the whole page in one query
+        sub_ids = {reg.sub_activity_id for reg in page.rows if reg.sub_activity_id}
+        sub_names = dict(
+            db.session.query(SubActivity.id, SubActivity.sub_activity_name).filter(SubActivity.id.in_(sub_ids)).all()
+        ) if sub_ids else {}
         
         result = []
-        for reg in registrations:
-            # Get sub-activity details
-            sub_activity = SubActivity.query.get(reg.sub_activity_id) if reg.sub_activity_id else None
+        for reg in page.rows:
             
             registration_data = {
                 'id': reg.id,
@@ -1692,7 +3839,7 @@ def creator_get_all_registrations():
                 'course': reg.course,
                 'activityName': reg.activity_name,
                 'activityCategory': reg.activity_category,
-                'subActivity': sub_activity.sub_activity_name if sub_activity else None,
+                'subActivity': sub_names.get(reg.sub_activity_id),
                 'status': reg.status,
                 'statusLabel': get_status_label(reg.status),
                 'statusColor': get_status_color(reg.status),
@@ -1705,18 +3852,26 @@ def creator_get_all_registrations():
             }
             result.append(registration_data)
         
-        # Summary stats
-        summary = {
-            'total': len(result),
-            'pending': len([r for r in result if 'Pending' in r['status']]),
-            'accepted': len([r for r in result if r['status'] in ['Accepted', 'Approved', 'hod_approved']]),
-            'rejected': len([r for r in result if r['status'] in ['Rejected', 'rejected']]),
-        }
-        
-        return jsonify({
+        # Summary stats over every registration (not just this page), from one GROUP BY
+        status_counts = db.session.query(
+            CourseRegistration.status, func.count(CourseRegistration.id)
+        ).group_by(CourseRegistration.status).all()
+        summary = {'total': 0, 'pending': 0, 'accepted': 0, 'rejected': 0}
+        for status, count in status_counts:
+            status = status or ''
+            summary['total'] += count
+            if 'Pending' in status:
+                summary['pending'] += count
+            elif status in ['Accepted', 'Approved', 'hod_approved']:
+                summary['accepted'] += count
+            elif status in ['Rejected', 'rejected']:
+                summary['rejected'] += count
+        
+        return with_page_headers(jsonify({
             'registrations': result,
-            'summary': summary
-        })
+            'summary': summary,
+            'nextCursor': page.next_cursor
+        }), page)
         
     except Exception as e:
         return jsonify({"error": str(e)}), 500
@@ -1761,15 +3916,13 @@ def get_status_color(status):
 @app.route('/api/roles', methods=['GET'])
 def get_roles():
     """Get all roles"""
-    roles = Role.query.all()
-    return jsonify([role.to_dict() for role in roles])
+    return jsonify(catalog.current().roles)
 
 
 @app.route('/api/departments', methods=['GET'])
 def get_departments():
     """Get all departments"""
-    departments = Department.query.all()
-    return jsonify([dept.to_dict() for dept in departments])
+    return jsonify(catalog.current().departments)
 
 
 @app.route('/api/departments/by-code/<string:code>', methods=['GET'])
@@ -1785,43 +3938,11 @@ def get_department_by_code(code):
 def get_department_hod(dept_id):
     """Get HOD information for a specific department"""
     try:
-        dept = Department.query.get(dept_id)
+        dept, hod = hod_directory.by_id(dept_id)
         if not dept:
             return jsonify({"error": "Department not found"}), 404
         
-        # Find HOD assigned to this department (must have HOD role)
-        hod_role = Role.query.filter_by(name='HOD').first()
-        hod_user = None
-        
-        if hod_role:
-            hod_user = User.query.filter_by(
-                assigned_department_id=dept_id,
-                role_id=hod_role.id,
-                is_active=True
-            ).first()
-        
-        # Also try to get phone from legacy HOD table
-        hod_phone = None
-        legacy_hod = HOD.query.filter(
-            db.func.lower(HOD.department) == db.func.lower(dept.name)
-        ).first()
-        if legacy_hod:
-            # Check if there's a phone in the data field (if applicable)
-            pass
-        
-        if not hod_user:
-            # If no User-based HOD, try legacy HOD table
-            if legacy_hod:
-                return jsonify({
-                    "id": legacy_hod.id,
-                    "full_name": legacy_hod.name,
-                    "phone": getattr(legacy_hod, 'phone', None) or "Not Available",
-                    "email": legacy_hod.email,
-                    "employee_id": legacy_hod.employee_id,
-                    "department_id": dept_id,
-                    "department_name": dept.name,
-                    "is_active": True
-                })
+        if not hod:
             # No HOD found at all
             return jsonify({
                 "id": None,
@@ -1833,14 +3954,14 @@ def get_department_hod(dept_id):
             })
         
         return jsonify({
-            "id": hod_user.id,
-            "full_name": hod_user.full_name,
-            "phone": hod_user.phone or (getattr(legacy_hod, 'phone', None) if legacy_hod else None) or "Not Available",
-            "email": hod_user.email,
-            "employee_id": hod_user.employee_id,
+            "id": hod.user_id if hod.user_id else hod.legacy_id,
+            "full_name": hod.name,
+            "phone": hod.phone or "Not Available",
+            "email": hod.email,
+            "employee_id": hod.employee_id,
             "department_id": dept_id,
             "department_name": dept.name,
-            "is_active": hod_user.is_active
+            "is_active": True
         })
     
     except Exception as e:
@@ -1848,11 +3969,8 @@ def get_department_hod(dept_id):
 
 
 def get_program_to_department_mapping(program_name):
-    """Get department name for a program from database"""
-    mapping = ProgramDepartmentMapping.query.filter(
-        func.lower(ProgramDepartmentMapping.program_name) == func.lower(program_name)
-    ).first()
-    return mapping.department_name if mapping else program_name
+    """Get department name for a program from the program-department mappings"""
+    return hod_directory.program_department(program_name) or program_name
 
 
 @app.route('/api/departments/<path:dept_name>/hod', methods=['GET'])
@@ -1861,82 +3979,31 @@ def get_department_hod_by_name(dept_name):
     try:
         # If dept_name is numeric, look up department by ID
         if dept_name.isdigit():
-            dept_id = int(dept_name)
-            dept = Department.query.get(dept_id)
-            if dept:
-                dept_name = dept.name  # Use actual department name
-            else:
+            dept, hod = hod_directory.by_id(int(dept_name))
+            if not dept:
                 return jsonify({"error": "Department not found"}), 404
-        
-        # First check if this is a program name that needs mapping (from database)
-        mapped_dept = get_program_to_department_mapping(dept_name)
-        
-        # DSAI umbrella variants for flexible matching
-        dsai_variants = ['data science & ai', 'data science and ai', 'ds & ai', 'ds&ai', 'dsai', 
-                         'artificial intelligence', 'b.sc.-honours(ai)', 'ai']
-        
-        def is_dsai(name):
-            name_lower = name.lower()
-            return any(v in name_lower or name_lower in v for v in dsai_variants)
-        
-        # Try to find HOD directly in hods table by department name
-        hod = HOD.query.filter(
-            (func.lower(HOD.department) == func.lower(mapped_dept)) | 
-            (func.lower(HOD.department) == func.lower(dept_name))
-        ).first()
-        
-        # If not found and this looks like DSAI, try DSAI code
-        if not hod and is_dsai(dept_name):
-            hod = HOD.query.filter(
-                (func.lower(HOD.department) == 'dsai') |
-                (func.lower(HOD.department).like('%data science%')) |
-                (func.lower(HOD.department).like('%ai%'))
-            ).first()
+        else:
+            # Department names, codes, mapped program names and DSAI aliases
+            dept, hod = hod_directory.resolve(dept_name)
         
         if hod:
             return jsonify({
-                "id": hod.id,
+                "id": hod.user_id if hod.user_id else hod.legacy_id,
                 "full_name": hod.name,
-                "phone": getattr(hod, 'phone', None) or "Not Available",
+                "phone": hod.phone or "Not Available",
                 "email": hod.email,
                 "employee_id": hod.employee_id,
-                "department_name": hod.department
+                "department_id": dept.id if dept else None,
+                "department_name": dept.name if dept else hod.department
             })
         
-        # If not found, try to find department first then look for HOD user
-        dept = Department.query.filter(
-            (func.lower(Department.name) == func.lower(mapped_dept)) | 
-            (func.lower(Department.name) == func.lower(dept_name)) |
-            (func.lower(Department.code) == func.lower(dept_name))
-        ).first()
-        
-        if dept:
-            # Find HOD assigned to this department
-            hod_role = Role.query.filter_by(name='HOD').first()
-            if hod_role:
-                hod_user = User.query.filter_by(
-                    assigned_department_id=dept.id,
-                    role_id=hod_role.id,
-                    is_active=True
-                ).first()
-                if hod_user:
-                    return jsonify({
-                        "id": hod_user.id,
-                        "full_name": hod_user.full_name,
-                        "phone": hod_user.phone or "Not Available",
-                        "email": hod_user.email,
-                        "employee_id": hod_user.employee_id,
-                        "department_id": dept.id,
-                        "department_name": dept.name
-                    })
-        
         # Return not found message
         return jsonify({
             "id": None,
             "full_name": "Not Assigned",
             "phone": "Not Assigned",
             "email": "Not Assigned",
-            "department_name": dept_name
+            "department_name": dept.name if dept else dept_name
         })
         
     except Exception as e:
@@ -1976,6 +4043,7 @@ def create_program_mapping():
     )
     db.session.add(mapping)
     db.session.commit()
+    hod_directory.invalidate()
     
     return jsonify({"success": True, "mapping": mapping.to_dict()}), 201
 
@@ -1995,6 +4063,7 @@ def update_program_mapping(mapping_id):
     
     mapping.updated_at = datetime.utcnow()
     db.session.commit()
+    hod_directory.invalidate()
     
     return jsonify({"success": True, "mapping": mapping.to_dict()})
 
@@ -2008,6 +4077,7 @@ def delete_program_mapping(mapping_id):
     
     db.session.delete(mapping)
     db.session.commit()
+    hod_directory.invalidate()
     
     return jsonify({"success": True, "message": "Mapping deleted"})
 
@@ -2040,6 +4110,7 @@ def create_hod():
     hod = HOD(name=name, email=email, employee_id=employee_id, department=department)
     db.session.add(hod)
     db.session.commit()
+    hod_directory.invalidate()
     
     return jsonify({"success": True, "hod": hod.to_dict()}), 201
 
@@ -2063,6 +4134,7 @@ def update_hod(hod_id):
     
     hod.updated_at = datetime.utcnow()
     db.session.commit()
+    hod_directory.invalidate()
     
     return jsonify({"success": True, "hod": hod.to_dict()})
 
@@ -2076,6 +4148,7 @@ def delete_hod(hod_id):
     
     db.session.delete(hod)
     db.session.commit()
+    hod_directory.invalidate()
     
     return jsonify({"success": True, "message": "HOD deleted"})
 
@@ -2107,6 +4180,7 @@ def create_department():
     dept = Department(name=name, code=code, description=description)
     db.session.add(dept)
     db.session.commit()
+    hod_directory.invalidate()
     
     return jsonify({"success": True, "department": dept.to_dict()}), 201
 
@@ -2127,6 +4201,7 @@ def update_department(dept_id):
         dept.description = payload['description'].strip()
     
     db.session.commit()
+    hod_directory.invalidate()
     
     return jsonify({"success": True, "department": dept.to_dict()})
 
@@ -2140,6 +4215,7 @@ def delete_department(dept_id):
     
     db.session.delete(dept)
     db.session.commit()
+    hod_directory.invalidate()
     
     return jsonify({"success": True, "message": "Department deleted"})
 
@@ -2184,44 +4260,15 @@ def get_activity_coordinator_by_name(activity_name):
 def get_department_classes(dept_id):
     """Get all classes for a specific department"""
     try:
-        dept = Department.query.get(dept_id)
+        snapshot = catalog.current()
+        dept = next((d for d in snapshot.departments if d['id'] == dept_id), None)
         if not dept:
             return jsonify({"error": "Department not found"}), 404
         
-        # Create mapping of department codes to activity department names
-        # Updated mapping to use DSAI (AI and Data Science)
-        dept_code_map = {
-            'BA': 'B.A.',
-            'BCom': 'B.Com.',
-            'BBA': 'B.B.A.',
-            'BCA': 'B.C.A.',
-            'BSc': 'B.Sc.',
-            'DSAI': 'AI and Data Science'
-        }
-        
-        # Get the activity department name for this code
-        activity_dept_name = dept_code_map.get(dept.code)
-        
-        # Get activities related to this department
-        activities = Activity.query.all()
-        department_classes = []
-        
-        for activity in activities:
-            activity_dept = activity.data.get('department') if activity.data else None
-            # Match by either code or activity department name
-            if activity_dept == activity_dept_name or activity_dept == dept.code:
-                department_classes.append({
-                    'id': activity.id,
-                    'name': activity.name,
-                    'description': activity.data.get('description', ''),
-                    'programName': activity.data.get('programName', ''),
-                    'programCode': activity.data.get('programCode', ''),
-                    'batch': activity.data.get('batch', ''),
-                    'status': activity.data.get('status', 'Running')
-                })
+        department_classes = catalog.classes_for(snapshot, dept)
         
         return jsonify({
-            'department': dept.to_dict(),
+            'department': dept,
             'classes': department_classes,
             'total': len(department_classes)
         })
@@ -2234,44 +4281,13 @@ def get_department_classes(dept_id):
 def get_all_departments_with_classes():
     """Get all departments with their classes in a single response"""
     try:
-        # Create mapping of department codes to activity department names
-        # Updated mapping to use DSAI (AI and Data Science)
-        dept_code_map = {
-            'BA': 'B.A.',
-            'BCom': 'B.Com.',
-            'BBA': 'B.B.A.',
-            'BCA': 'B.C.A.',
-            'BSc': 'B.Sc.',
-            'DSAI': 'AI and Data Science'
-        }
-        
-        departments = Department.query.all()
+        snapshot = catalog.current()
         result = []
         
-        for dept in departments:
-            # Get the activity department name for this code
-            activity_dept_name = dept_code_map.get(dept.code)
-            
-            # Get activities related to this department
-            activities = Activity.query.all()
-            classes = []
-            
-            for activity in activities:
-                activity_dept = activity.data.get('department') if activity.data else None
-                # Match by either code or activity department name
-                if activity_dept == activity_dept_name or activity_dept == dept.code:
-                    classes.append({
-                        'id': activity.id,
-                        'name': activity.name,
-                        'description': activity.data.get('description', ''),
-                        'programName': activity.data.get('programName', ''),
-                        'programCode': activity.data.get('programCode', ''),
-                        'batch': activity.data.get('batch', ''),
-                        'status': activity.data.get('status', 'Running')
-                    })
-            
+        for dept in snapshot.departments:
+            classes = catalog.classes_for(snapshot, dept)
             result.append({
-                'department': dept.to_dict(),
+                'department': dept,
                 'classes': classes,
                 'totalClasses': len(classes)
             })
@@ -2290,21 +4306,7 @@ def get_all_departments_with_classes():
 def get_all_classes():
     """Get all classes with their details"""
     try:
-        activities = Activity.query.all()
-        classes = []
-        
-        for activity in activities:
-            classes.append({
-                'id': activity.id,
-                'name': activity.name,
-                'description': activity.data.get('description', '') if activity.data else '',
-                'programName': activity.data.get('programName', '') if activity.data else '',
-                'programCode': activity.data.get('programCode', '') if activity.data else '',
-                'department': activity.data.get('department', '') if activity.data else '',
-                'batch': activity.data.get('batch', '') if activity.data else '',
-                'status': activity.data.get('status', 'Running') if activity.data else 'Running'
-            })
-        
+        classes = catalog.current().classes
         return jsonify({
             'data': classes,
             'total': len(classes)
@@ -2344,6 +4346,7 @@ def register_student():
         )
         db.session.add(new_student)
         db.session.commit()
+        roll_index.note_students([new_student])
         
         return jsonify({
             "success": True,
@@ -2370,7 +4373,7 @@ def check_application_status():
         student_email=email,
         admission_id=admission_id
     ).filter(
-        Registration.status.in_(['pending', 'coordinator_approved', 'hod_approved'])
+        Registration.status.in_(ACTIVE_REGISTRATION_STATUSES)
     ).first()
     
     if existing_app:
@@ -2388,7 +4391,22 @@ def check_application_status():
 
 @app.route('/api/student-profiles', methods=['GET'])
 def get_students():
-    students = Student.query.all()
+    """All student profiles, optionally narrowed to a roster with
+    ?department=&departmentCode=&program=&pcode=&joiningYear=&section="""
+    query = Student.query
+    roster_filters = {
+        'department': Student.department,
+        'departmentCode': Student.department_code,
+        'program': Student.program,
+        'pcode': Student.pcode,
+        'joiningYear': Student.joining_year,
+        'section': Student.section,
+    }
+    for param, column in roster_filters.items():
+        value = request.args.get(param)
+        if value:
+            query = query.filter(column == value.strip())
+    students = query.all()
     return jsonify([s.to_dict() for s in students])
 
 
@@ -2423,10 +4441,353 @@ def import_students():
             db.session.add(new_student)
             added += 1
 
-    db.session.commit()
-    
-    total = Student.query.count()
-    return jsonify({"added": added, "updated": updated, "total": total})
+    db.session.commit()
+    roll_index.refresh()
+    
+    total = Student.query.count()
+    return jsonify({"added": added, "updated": updated, "total": total})
+
+
+# ============================================================================
+# ADMISSION QUEUE
+# Optional write-behind mode for registration bursts (ADMISSION_QUEUE=on).
+# POST /api/registrations and /api/course-registrations only run cheap checks
+# (required fields, sub-activity state from the catalog snapshot, an open
+# ticket for the same student), append the submission to a durable local
+# SQLite queue and answer 202 with a ticket. A background writer claims
+# queued tickets in batches, re-validates them against the database with one
+# query per batch and inserts the accepted ones in a single commit. Clients
+# poll GET /api/admissions/<ticket> for the final status.
+# ============================================================================
+ADMISSION_QUEUE_ENABLED = os.getenv('ADMISSION_QUEUE', 'off').lower() in ('1', 'true', 'on', 'yes')
+ADMISSION_QUEUE_PATH = os.getenv('ADMISSION_QUEUE_PATH', os.path.join(APP_DIR, 'admissions.sqlite3'))
+ADMISSION_BATCH_SIZE = int(os.getenv('ADMISSION_BATCH_SIZE', '200'))
+ADMISSION_FLUSH_INTERVAL = float(os.getenv('ADMISSION_FLUSH_INTERVAL', '0.5'))
+ADMISSION_CLAIM_TIMEOUT = float(os.getenv('ADMISSION_CLAIM_TIMEOUT', '120'))
+
+ACTIVE_REGISTRATION_STATUSES = ['pending', 'coordinator_approved', 'hod_approved']
+
+AdmissionTicket = namedtuple('AdmissionTicket', ['ticket', 'kind', 'payload', 'attempts'])
+
+
+class AdmissionQueue:
+    """Durable queue of registration submissions in a local SQLite file, shared by all workers on the host"""
+
+    def __init__(self, path, batch_size, interval):
+        self.path = path
+        self.batch_size = max(1, batch_size)
+        self.interval = interval
+        self._local = threading.local()
+        self._wake = threading.Event()
+        self._writer = None
+        self._writer_lock = threading.Lock()
+        self._stats = {'queued': 0, 'written': 0, 'rejected': 0, 'failed': 0, 'batches': 0}
+        self._stats_lock = threading.Lock()
+        conn = self._connect()
+        with conn:
+            conn.execute(
+                'CREATE TABLE IF NOT EXISTS admissions ('
+                'ticket TEXT PRIMARY KEY, kind TEXT NOT NULL, applicant TEXT, payload TEXT NOT NULL, '
+                'status TEXT NOT NULL, result TEXT, attempts INTEGER NOT NULL DEFAULT 0, '
+                'created_at REAL NOT NULL, claimed_at REAL, processed_at REAL)'
+            )
+            conn.execute('CREATE INDEX IF NOT EXISTS ix_admissions_status ON admissions (status, created_at)')
+            conn.execute('CREATE INDEX IF NOT EXISTS ix_admissions_applicant ON admissions (applicant, status)')
+
+    def _connect(self):
+        conn = getattr(self._local, 'conn', None)
+        if conn is None:
+            conn = sqlite3.connect(self.path, timeout=10)
+            conn.execute('PRAGMA journal_mode=WAL')
+            conn.execute('PRAGMA synchronous=NORMAL')
+            self._local.conn = conn
+        return conn
+
+    def _count(self, key, n=1):
+        with self._stats_lock:
+            self._stats[key] += n
+
+    def submit(self, kind, payload, applicant=None):
+        """Append a submission and return its ticket id"""
+        ticket = secrets.token_urlsafe(12)
+        conn = self._connect()
+        with conn:
+            conn.execute(
+                'INSERT INTO admissions (ticket, kind, applicant, payload, status, created_at) '
+                'VALUES (?, ?, ?, ?, ?, ?)',
+                (ticket, kind, applicant, json.dumps(payload), 'queued', time.time())
+            )
+        self._count('queued')
+        self.start()
+        self._wake.set()
+        return ticket
+
+    def has_open(self, applicant):
+        """True if the applicant already has a ticket waiting to be written"""
+        row = self._connect().execute(
+            "SELECT 1 FROM admissions WHERE applicant = ? AND status IN ('queued', 'claimed') LIMIT 1",
+            (applicant,)
+        ).fetchone()
+        return row is not None
+
+    def status(self, ticket):
+        conn = self._connect()
+        row = conn.execute(
+            'SELECT kind, status, result, created_at, processed_at FROM admissions WHERE ticket = ?', (ticket,)
+        ).fetchone()
+        if not row:
+            return None
+        kind, status, result, created_at, processed_at = row
+        info = {
+            'ticket': ticket,
+            'kind': kind,
+            'status': 'queued' if status == 'claimed' else status,
+            'submittedAt': datetime.utcfromtimestamp(created_at).isoformat(),
+            'processedAt': datetime.utcfromtimestamp(processed_at).isoformat() if processed_at else None
+        }
+        if status in ('queued', 'claimed'):
+            info['position'] = conn.execute(
+                "SELECT COUNT(*) FROM admissions WHERE status IN ('queued', 'claimed') AND created_at < ?",
+                (created_at,)
+            ).fetchone()[0] + 1
+        if result:
+            info.update(json.loads(result))
+        return info
+
+    def _claim(self):
+        """Claim the next batch (re-queueing claims abandoned by a crashed writer)"""
+        conn = self._connect()
+        now = time.time()
+        conn.execute('BEGIN IMMEDIATE')
+        try:
+            conn.execute(
+                "UPDATE admissions SET status = 'queued' WHERE status = 'claimed' AND claimed_at < ?",
+                (now - ADMISSION_CLAIM_TIMEOUT,)
+            )
+            rows = conn.execute(
+                "SELECT ticket, kind, payload, attempts FROM admissions WHERE status = 'queued' "
+                'ORDER BY created_at LIMIT ?',
+                (self.batch_size,)
+            ).fetchall()
+            conn.executemany(
+                "UPDATE admissions SET status = 'claimed', claimed_at = ?, attempts = attempts + 1 WHERE ticket = ?",
+                [(now, row[0]) for row in rows]
+            )
+            conn.execute('COMMIT')
+        except Exception:
+            conn.execute('ROLLBACK')
+            raise
+        return [AdmissionTicket(ticket, kind, json.loads(payload), attempts + 1)
+                for ticket, kind, payload, attempts in rows]
+
+    def _finish(self, outcomes):
+        conn = self._connect()
+        now = time.time()
+        with conn:
+            conn.executemany(
+                'UPDATE admissions SET status = ?, result = ?, processed_at = ? WHERE ticket = ?',
+                [(status, json.dumps(result), now, ticket) for ticket, (status, result) in outcomes.items()]
+            )
+        for status, _ in outcomes.values():
+            self._count(status)
+
+    def drain(self):
+        """Write every queued ticket; returns the number processed"""
+        processed = 0
+        while True:
+            batch = self._claim()
+            if not batch:
+                return processed
+            with app.app_context():
+                try:
+                    outcomes = write_admission_batch(batch)
+                finally:
+                    db.session.remove()
+            self._finish(outcomes)
+            self._count('batches')
+            processed += len(batch)
+
+    def _run(self):
+        while True:
+            self._wake.wait(self.interval)
+            self._wake.clear()
+            try:
+                self.drain()
+            except Exception as e:
+                logger.error(f"Admission writer error: {e}\n{traceback.format_exc()}")
+                time.sleep(self.interval)
+
+    def start(self):
+        if self._writer is not None:
+            return
+        with self._writer_lock:
+            if self._writer is None:
+                self._writer = threading.Thread(target=self._run, name='admission-writer', daemon=True)
+                self._writer.start()
+
+    def metrics(self):
+        with self._stats_lock:
+            stats = dict(self._stats)
+        stats['backlog'] = self._connect().execute(
+            "SELECT COUNT(*) FROM admissions WHERE status IN ('queued', 'claimed')"
+        ).fetchone()[0]
+        return stats
+
+
+admission_queue = AdmissionQueue(
+    ADMISSION_QUEUE_PATH, ADMISSION_BATCH_SIZE, ADMISSION_FLUSH_INTERVAL
+) if ADMISSION_QUEUE_ENABLED else None
+
+
+def check_sub_activity_open(sub_activity_id, snapshot=None):
+    """Error response if the sub-activity is missing, full or closed, judged from the
+    catalog snapshot and the live slot counts"""
+    try:
+        sub_id = int(sub_activity_id)
+    except (TypeError, ValueError):
+        return jsonify({"error": "Sub-activity not found"}), 404
+    sub = (snapshot or catalog.current()).sub_activities_by_id.get(sub_id)
+    sub = sub and catalog.slots([sub_id]).get(sub_id)
+    if not sub:
+        return jsonify({"error": "Sub-activity not found"}), 404
+    if sub['availableSlots'] <= 0:
+        return jsonify({"error": SLOTS_FULL_ERROR}), 400
+    if not sub['isActive']:
+        return jsonify({"error": "This sub-activity is not accepting applications."}), 400
+    return None
+
+
+def admission_accepted(ticket):
+    return jsonify({
+        "success": True,
+        "queued": True,
+        "ticket": ticket,
+        "status": "queued",
+        "statusUrl": f"/api/admissions/{ticket}"
+    }), 202
+
+
+def _written_by_earlier_attempt(model, ticket):
+    """Row inserted by a writer that crashed before marking its ticket written"""
+    return model.query.filter(model.data['admissionTicket'].as_string() == ticket).first()
+
+
+def write_admission_batch(batch):
+    """Validate and insert a claimed batch; returns {ticket: (status, result)}"""
+    outcomes = {}
+    staged = []  # (ticket, row)
+
+    registrations = [t for t in batch if t.kind == 'registration']
+    if registrations:
+        emails = {t.payload['email'] for t in registrations}
+        active = {
+            (r.student_email, r.admission_id): r
+            for r in Registration.query.filter(
+                Registration.student_email.in_(emails),
+                Registration.status.in_(ACTIVE_REGISTRATION_STATUSES)
+            ).all()
+        }
+        sub_ids = {int(t.payload['subActivityId']) for t in registrations if t.payload.get('subActivityId')}
+        subs = {s.id: s for s in SubActivity.query.filter(SubActivity.id.in_(sub_ids)).all()} if sub_ids else {}
+        for t in registrations:
+            p = t.payload
+            if t.attempts > 1:
+                existing = _written_by_earlier_attempt(Registration, t.ticket)
+                if existing:
+                    outcomes[t.ticket] = ('written', {'registrationId': existing.id})
+                    continue
+            key = (p['email'], p['admissionId'])
+            sub = subs.get(int(p['subActivityId'])) if p.get('subActivityId') else None
+            if p.get('subActivityId') and not sub:
+                outcomes[t.ticket] = ('rejected', {'error': "Sub-activity not found"})
+            elif sub and (sub.total_slots or 0) - (sub.filled_slots or 0) <= 0:
+                outcomes[t.ticket] = ('rejected', {'error': SLOTS_FULL_ERROR})
+            elif sub and not sub.is_active:
+                outcomes[t.ticket] = ('rejected', {'error': "This sub-activity is not accepting applications."})
+            elif key in active:
+                existing = active[key]
+                outcomes[t.ticket] = ('rejected', {
+                    'error': f"You already have a {existing.status} application for {existing.activity_name}. "
+                             f"You can only apply for one activity at a time."
+                })
+            else:
+                row = Registration(
+                    student_email=p['email'],
+                    admission_id=p['admissionId'],
+                    student_name=p.get('studentName', ''),
+                    department=p.get('department', ''),
+                    activity_name=p['activityName'],
+                    sub_activity_id=p.get('subActivityId'),
+                    status='pending',
+                    coordinator_status='pending',
+                    hod_status='pending',
+                    data={**p['data'], 'admissionTicket': t.ticket}
+                )
+                active[key] = row  # a second ticket for the same student in this batch is a duplicate
+                staged.append((t.ticket, row))
+
+    course_tickets = [t for t in batch if t.kind == 'course_registration']
+    active_applicants = active_course_applicants(t.payload.get('admissionId') for t in course_tickets)
+    for t in course_tickets:
+        if t.attempts > 1:
+            existing = _written_by_earlier_attempt(CourseRegistration, t.ticket)
+            if existing:
+                outcomes[t.ticket] = ('written', {'registrationId': existing.id})
+                continue
+        p = t.payload
+        key = application_key(p.get('admissionId'))
+        if key in active_applicants:
+            outcomes[t.ticket] = ('rejected', {'error': ACTIVE_APPLICATION_ERROR})
+            continue
+        if key:
+            active_applicants.add(key)  # a second ticket for the same student in this batch is a duplicate
+        staged.append((t.ticket, CourseRegistration(
+            student_name=p.get('studentName', ''),
+            admission_id=p.get('admissionId', ''),
+            course=p.get('course', ''),
+            department=p.get('department', ''),
+            activity_name=p.get('activityName', ''),
+            activity_category=p.get('activityCategory', ''),
+            sub_activity_id=p.get('subActivityId'),
+            status=p.get('status', 'Pending Coordinator'),
+            data={**p, 'admissionTicket': t.ticket}
+        )))
+
+    if not staged:
+        return outcomes
+    try:
+        db.session.add_all([row for _, row in staged])
+        db.session.commit()
+        for ticket, row in staged:
+            outcomes[ticket] = ('written', {'registrationId': row.id})
+    except Exception as e:
+        # Isolate the offending rows so one bad submission does not sink the batch
+        db.session.rollback()
+        logger.warning(f"Admission batch insert failed, retrying row by row: {e}")
+        for ticket, row in staged:
+            try:
+                db.session.add(row)
+                db.session.commit()
+                outcomes[ticket] = ('written', {'registrationId': row.id})
+            except Exception as row_error:
+                db.session.rollback()
+                outcomes[ticket] = ('failed', {'error': f"Database error: {str(row_error)}"})
+    return outcomes
+
+
+@app.route('/api/admissions/<string:ticket>', methods=['GET'])
+def admission_status(ticket):
+    """Poll a queued registration: queued, written (with the registration), rejected or failed"""
+    if admission_queue is None:
+        return jsonify({"error": "Admission queue is not enabled"}), 404
+    info = admission_queue.status(ticket)
+    if not info:
+        return jsonify({"error": "Ticket not found"}), 404
+    if info['status'] == 'written':
+        model = Registration if info['kind'] == 'registration' else CourseRegistration
+        row = model.query.get(info['registrationId'])
+        info['registration'] = row.to_dict() if row else None
+    return jsonify(info)
 
 
 @app.route('/api/registrations', methods=['GET', 'POST'])
@@ -2454,8 +4815,10 @@ def registrations():
             if coordinator:
                 query = query.filter(db.func.lower(Registration.activity_name) == coordinator.role.lower())
         
-        regs = query.order_by(Registration.timestamp.desc()).all()
-        return jsonify([r.to_dict() for r in regs])
+        page, error = keyset_page(query, Registration.timestamp, Registration.id)
+        if error:
+            return error
+        return with_page_headers(jsonify([r.to_dict() for r in page.rows]), page)
     
     elif request.method == 'POST':
         payload = request.get_json(silent=True) or {}
@@ -2469,6 +4832,27 @@ def registrations():
         if not email or not admission_id or not activity_name:
             return jsonify({"error": "Email, admission ID, and activity name are required"}), 400
         
+        if admission_queue is not None:
+            # Write-behind mode: cheap checks now, the admission writer re-validates and inserts
+            if sub_activity_id:
+                error = check_sub_activity_open(sub_activity_id)
+                if error:
+                    return error
+            applicant = f"{email}|{admission_id}"
+            if admission_queue.has_open(applicant):
+                return jsonify({
+                    "error": "You already have an application being processed. You can only apply for one activity at a time."
+                }), 409
+            return admission_accepted(admission_queue.submit('registration', {
+                'email': email,
+                'admissionId': admission_id,
+                'studentName': student_name,
+                'department': department,
+                'activityName': activity_name,
+                'subActivityId': sub_activity_id,
+                'data': payload
+            }, applicant))
+        
         # Check if sub-activity exists and has available slots
         if sub_activity_id:
             sub_activity = SubActivity.query.get(sub_activity_id)
@@ -2489,7 +4873,7 @@ def registrations():
             student_email=email,
             admission_id=admission_id
         ).filter(
-            Registration.status.in_(['pending', 'coordinator_approved', 'hod_approved'])
+            Registration.status.in_(ACTIVE_REGISTRATION_STATUSES)
         ).first()
         
         if existing:
@@ -2629,6 +5013,7 @@ def hods():
             new_hod = HOD(name=name, email=email, employee_id=employee_id, department=department)
             db.session.add(new_hod)
             db.session.commit()
+            hod_directory.invalidate()
             return jsonify(new_hod.to_dict()), 201
         except Exception as e:
             db.session.rollback()
@@ -2665,6 +5050,7 @@ def hod_detail(hod_id):
         
         try:
             db.session.commit()
+            hod_directory.invalidate()
             return jsonify(hod.to_dict())
         except Exception as e:
             db.session.rollback()
@@ -2674,6 +5060,7 @@ def hod_detail(hod_id):
         try:
             db.session.delete(hod)
             db.session.commit()
+            hod_directory.invalidate()
             return jsonify({"success": True, "message": f"HOD '{hod.name}' deleted successfully"})
         except Exception as e:
             db.session.rollback()
@@ -2684,8 +5071,7 @@ def hod_detail(hod_id):
 @app.route('/api/activities', methods=['GET', 'POST'])
 def activities():
     if request.method == 'GET':
-        all_activities = Activity.query.all()
-        return jsonify([a.to_dict() for a in all_activities])
+        return jsonify(catalog.current().activities)
     
     elif request.method == 'POST':
         payload = request.get_json(silent=True) or {}
@@ -2765,92 +5151,56 @@ def get_activity_members():
         sub_activity_id = request.args.get('sub_activity_id')
         department = request.args.get('department')
         
-        # Query CourseRegistrations with accepted status (primary source)
-        accepted_statuses = ['Accepted', 'hod_approved']
-        
-        query = CourseRegistration.query.filter(
-            CourseRegistration.status.in_(accepted_statuses)
-        )
-        
+        # One query over the enrollments read model; course registrations sort first
+        query = Enrollment.query.filter(Enrollment.state == 'accepted')
         if activity:
-            # Filter by activity_category (main activity like NCC) OR activity_name
+            # Filter by main activity (category like NCC) OR the registered activity name
             query = query.filter(
-                (CourseRegistration.activity_category == activity) |
-                (CourseRegistration.activity_name == activity)
+                (Enrollment.activity == activity) | (Enrollment.activity_name == activity)
             )
         if sub_activity_id:
-            query = query.filter(CourseRegistration.sub_activity_id == int(sub_activity_id))
+            query = query.filter(Enrollment.sub_activity_id == int(sub_activity_id))
         if department:
-            query = query.filter(CourseRegistration.department == department)
+            query = query.filter(Enrollment.department == department)
         
-        registrations = query.order_by(CourseRegistration.student_name.asc()).all()
+        enrollments = query.order_by(Enrollment.source.asc(), Enrollment.student_name.asc()).all()
+        sub_activities = catalog.current().sub_activities_by_id
         
-        # Format response with student details
         members = []
-        for reg in registrations:
-            # Get sub-activity details if available
-            sub_activity = None
-            if reg.sub_activity_id:
-                sub_activity = SubActivity.query.get(reg.sub_activity_id)
-            
-            member = {
-                'id': reg.admission_id,
-                'name': reg.student_name,
-                'email': reg.data.get('email') if reg.data else None,
-                'department': reg.department,
-                'activity': reg.activity_category or reg.activity_name,
-                'activityName': reg.activity_name,
-                'activityCategory': reg.activity_category,
-                'subActivity': sub_activity.sub_activity_name if sub_activity else (reg.activity_name if reg.activity_category else None),
-                'subActivityId': reg.sub_activity_id,
-                'status': reg.status,
-                'acceptedAt': reg.last_updated.isoformat() if reg.last_updated else None,
-                'registrationId': reg.id,
-                # Include additional data from registration
-                'course': reg.course,
-                'year': reg.data.get('year') if reg.data else None,
-                'phone': reg.data.get('phone') if reg.data else None,
-            }
-            members.append(member)
-        
-        # Also check old Registration table as fallback
-        old_query = Registration.query.filter(
-            Registration.status.in_(accepted_statuses)
-        )
-        
-        if activity:
-            old_query = old_query.filter(db.func.lower(Registration.activity_name) == activity.lower())
-        if sub_activity_id:
-            old_query = old_query.filter(Registration.sub_activity_id == int(sub_activity_id))
-        if department:
-            old_query = old_query.filter(Registration.department == department)
-            
-        old_registrations = old_query.order_by(Registration.student_name.asc()).all()
-        
-        existing_ids = {m['id'] for m in members}
-        for reg in old_registrations:
-            if reg.admission_id in existing_ids:
+        seen_ids = set()
+        for row in enrollments:
+            if row.source == 'course':
+                seen_ids.add(row.admission_id)
+            elif row.admission_id in seen_ids:
+                # Legacy row for a student already listed from course registrations
                 continue
-                
-            sub_activity = None
-            if reg.sub_activity_id:
-                sub_activity = SubActivity.query.get(reg.sub_activity_id)
+            
+            sub = sub_activities.get(row.sub_activity_id) if row.sub_activity_id else None
+            if sub:
+                sub_name = sub['subActivityName']
+            elif row.source == 'course' and row.activity_category:
+                sub_name = row.activity_name
+            else:
+                sub_name = None
             
             member = {
-                'id': reg.admission_id,
-                'name': reg.student_name,
-                'email': reg.student_email,
-                'department': reg.department,
-                'activity': reg.activity_name,
-                'subActivity': sub_activity.sub_activity_name if sub_activity else None,
-                'subActivityId': reg.sub_activity_id,
-                'status': reg.status,
-                'acceptedAt': reg.updated_at.isoformat() if reg.updated_at else None,
-                'registrationId': reg.id,
-                'course': reg.data.get('course') if reg.data else None,
-                'year': reg.data.get('year') if reg.data else None,
-                'phone': reg.data.get('phone') if reg.data else None,
+                'id': row.admission_id,
+                'name': row.student_name,
+                'email': row.student_email,
+                'department': row.department,
+                'activity': row.activity,
+                'subActivity': sub_name,
+                'subActivityId': row.sub_activity_id,
+                'status': row.status,
+                'acceptedAt': row.accepted_at.isoformat() if row.accepted_at else None,
+                'registrationId': row.source_id,
+                'course': row.course,
+                'year': row.year,
+                'phone': row.phone,
             }
+            if row.source == 'course':
+                member['activityName'] = row.activity_name
+                member['activityCategory'] = row.activity_category
             members.append(member)
         
         return jsonify(members)
@@ -2869,75 +5219,44 @@ def get_activity_summary():
     try:
         coordinator_email = request.args.get('coordinator_email')
         
-        # Get all activities with accepted registrations
-        activities_data = {}
-        
-        accepted_statuses = ['Accepted', 'hod_approved']
-        
-        # Query CourseRegistrations (primary source)
-        course_regs = CourseRegistration.query.filter(
-            CourseRegistration.status.in_(accepted_statuses)
-        ).all()
-        
-        for reg in course_regs:
-            # Use activity_category as the main activity name
-            activity_name = reg.activity_category or reg.activity_name
-            if not activity_name:
-                continue
-                
-            if activity_name not in activities_data:
-                activities_data[activity_name] = {
-                    'name': activity_name,
-                    'totalMembers': 0,
-                    'subActivities': {}
-                }
-            
-            activities_data[activity_name]['totalMembers'] += 1
-            
-            # Track sub-activity breakdown
-            sub_activity_name = reg.activity_name if reg.activity_category else None
-            if sub_activity_name and sub_activity_name != reg.activity_category:
-                if sub_activity_name not in activities_data[activity_name]['subActivities']:
-                    activities_data[activity_name]['subActivities'][sub_activity_name] = {
-                        'id': reg.sub_activity_id,
-                        'name': sub_activity_name,
-                        'count': 0,
-                        'coordinatorEmail': None
-                    }
-                activities_data[activity_name]['subActivities'][sub_activity_name]['count'] += 1
-        
-        # Also check old Registration table as fallback
-        old_registrations = Registration.query.filter(
-            Registration.status.in_(accepted_statuses)
+        # Accepted enrollments counted per activity / sub-activity in the database
+        rows = db.session.query(
+            Enrollment.source, Enrollment.activity, Enrollment.activity_name,
+            Enrollment.activity_category, Enrollment.sub_activity_id, func.count(Enrollment.id)
+        ).filter(
+            Enrollment.state == 'accepted',
+            Enrollment.activity.isnot(None),
+            Enrollment.activity != ''
+        ).group_by(
+            Enrollment.source, Enrollment.activity, Enrollment.activity_name,
+            Enrollment.activity_category, Enrollment.sub_activity_id
         ).all()
+        sub_activities = catalog.current().sub_activities_by_id
         
-        for reg in old_registrations:
-            activity_name = reg.activity_name
-            if not activity_name:
-                continue
-                
+        activities_data = {}
+        for source, activity_name, registered_name, category, sub_id, count in rows:
             if activity_name not in activities_data:
                 activities_data[activity_name] = {
                     'name': activity_name,
                     'totalMembers': 0,
                     'subActivities': {}
                 }
-            
-            activities_data[activity_name]['totalMembers'] += 1
+            activities_data[activity_name]['totalMembers'] += count
             
             # Track sub-activity breakdown
-            if reg.sub_activity_id:
-                sub = SubActivity.query.get(reg.sub_activity_id)
-                if sub:
-                    sub_name = sub.sub_activity_name
-                    if sub_name not in activities_data[activity_name]['subActivities']:
-                        activities_data[activity_name]['subActivities'][sub_name] = {
-                            'id': sub.id,
-                            'name': sub_name,
-                            'count': 0,
-                            'coordinatorEmail': sub.coordinator_email
-                        }
-                    activities_data[activity_name]['subActivities'][sub_name]['count'] += 1
+            if source == 'course':
+                if not category or registered_name == category:
+                    continue
+                entry = {'id': sub_id, 'name': registered_name, 'coordinatorEmail': None}
+            else:
+                sub = sub_activities.get(sub_id) if sub_id else None
+                if not sub:
+                    continue
+                entry = {'id': sub['id'], 'name': sub['subActivityName'], 'coordinatorEmail': sub['coordinatorEmail']}
+            breakdown = activities_data[activity_name]['subActivities']
+            if entry['name'] not in breakdown:
+                breakdown[entry['name']] = {**entry, 'count': 0}
+            breakdown[entry['name']]['count'] += count
         
         # Convert to list and filter by coordinator if specified
         result = []
@@ -2968,27 +5287,14 @@ def coordinator_activities():
     """Returns unique coordinator activities (NCC, Sports, Yoga, Gym, etc.) from sub-activities table.
     These are the REAL activities, not academic programs."""
     try:
-        # Get distinct activity names from sub-activities table
-        subs = SubActivity.query.all()
-        
-        # Build unique activities map with head info
-        activity_map = {}
-        for sub in subs:
-            if sub.activity_name not in activity_map:
-                activity_map[sub.activity_name] = {
-                    'name': sub.activity_name,
-                    'activityHeadName': sub.activity_head_name or 'Not Assigned',
-                    'activityHeadPhone': sub.activity_head_phone or '',
-                    'subActivityCount': 0
-                }
-            activity_map[sub.activity_name]['subActivityCount'] += 1
-        
-        activities = list(activity_map.values())
+        # Distinct activity names (with head info) grouped from the sub-activities table
+        snapshot = catalog.current()
+        activities = snapshot.coordinator_activities
         return jsonify({
             'activities': activities,
             'total': len(activities),
             'statistics': {
-                'totalSubActivities': len(subs),
+                'totalSubActivities': len(snapshot.sub_activities),
                 'activitiesBreakdown': {a['name']: a['subActivityCount'] for a in activities}
             }
         })
@@ -3002,28 +5308,18 @@ def sub_activities():
         coordinator_email = request.args.get('coordinatorEmail')
         show_available_only = request.args.get('availableOnly', '').lower() == 'true'
         
-        query = SubActivity.query
+        subs = catalog.live_sub_activities(catalog.current())
         
         if activity_name:
             # Case-insensitive activity name filtering
-            query = query.filter(db.func.lower(SubActivity.activity_name) == activity_name.lower())
+            subs = [s for s in subs if s['activityName'].lower() == activity_name.lower()]
         if coordinator_email:
-            query = query.filter_by(coordinator_email=coordinator_email)
+            subs = [s for s in subs if s['coordinatorEmail'] == coordinator_email]
         if show_available_only:
             # Only show active sub-activities with available slots
-            query = query.filter(SubActivity.is_active == True)
-        
-        subs = query.all()
-        
-        # Filter out full activities if showing available only
-        if show_available_only:
-            def get_available(s):
-                total = s.total_slots if s.total_slots is not None else 0
-                filled = s.filled_slots if s.filled_slots is not None else 0
-                return (total - filled) > 0
-            subs = [s for s in subs if get_available(s)]
+            subs = [s for s in subs if s['isActive'] and s['availableSlots'] > 0]
         
-        return jsonify([s.to_dict() for s in subs])
+        return jsonify(subs)
     
     elif request.method == 'POST':
         payload = request.get_json(silent=True) or {}
@@ -3067,14 +5363,14 @@ def sub_activities():
 
 @app.route('/api/sub-activities/<int:sub_id>', methods=['GET', 'PUT', 'DELETE'])
 def sub_activity_detail(sub_id):
+    if request.method == 'GET':
+        return conditional_get(SubActivity, sub_id, SubActivity.updated_at, "Sub-activity not found")
+    
     sub = SubActivity.query.get(sub_id)
     if not sub:
         return jsonify({"error": "Sub-activity not found"}), 404
     
-    if request.method == 'GET':
-        return jsonify(sub.to_dict())
-    
-    elif request.method == 'PUT':
+    if request.method == 'PUT':
         payload = request.get_json(silent=True) or {}
         
         if 'activityName' in payload:
@@ -3138,6 +5434,45 @@ def resolve_sub_activity():
         return jsonify({"error": str(e)}), 500
 
 
+# ============================================================================
+# ACTIVE APPLICATIONS
+# One active course application per student. The checks below run against
+# the database on ix_course_registrations_admission_created (admission_id
+# leads the index), so every worker sees other workers' commits immediately;
+# the course registration POST and the admission writer enforce the rule.
+# ============================================================================
+# CourseRegistration statuses that block a new application (Queued* are not counted, as before)
+COURSE_ACTIVE_STATUSES = ['Pending Coordinator', 'Pending HOD', 'Accepted', 'Approved', 'coordinator_approved', 'hod_approved']
+ACTIVE_APPLICATION_ERROR = "You already have an active application pending or approved."
+
+
+def application_key(admission_id):
+    return (admission_id or '').strip().upper() or None
+
+
+def course_active_count(admission_id):
+    """Active course registrations for an admission id"""
+    key = application_key(admission_id)
+    if key is None:
+        return 0
+    return CourseRegistration.query.filter(
+        CourseRegistration.admission_id == key,
+        CourseRegistration.status.in_(COURSE_ACTIVE_STATUSES)
+    ).count()
+
+
+def active_course_applicants(admission_ids):
+    """Admission keys among admission_ids holding an active course registration (one query)"""
+    keys = {application_key(a) for a in admission_ids} - {None}
+    if not keys:
+        return set()
+    rows = db.session.query(CourseRegistration.admission_id).filter(
+        CourseRegistration.admission_id.in_(keys),
+        CourseRegistration.status.in_(COURSE_ACTIVE_STATUSES)
+    ).all()
+    return {application_key(admission_id) for (admission_id,) in rows}
+
+
 # ============ STUDENT APPLICATION STATUS & VALIDATION APIs ============
 
 @app.route('/api/student/<string:admission_id>/application-status', methods=['GET'])
@@ -3161,10 +5496,9 @@ def get_student_application_status(admission_id):
             })
         
         # Check for active (non-rejected) applications
-        active_statuses = ['Pending Coordinator', 'Pending HOD', 'Accepted', 'Approved', 'coordinator_approved', 'hod_approved']
         rejected_statuses = ['Rejected', 'rejected']
         
-        active_apps = [r for r in registrations if r.status in active_statuses]
+        active_apps = [r for r in registrations if r.status in COURSE_ACTIVE_STATUSES]
         rejected_apps = [r for r in registrations if r.status in rejected_statuses]
         
         if active_apps:
@@ -3230,17 +5564,12 @@ def check_student_can_apply(admission_id):
     """
     try:
         # Check for any non-rejected applications
-        active_statuses = ['Pending Coordinator', 'Pending HOD', 'Accepted', 'Approved', 'coordinator_approved', 'hod_approved']
-        
-        active_count = CourseRegistration.query.filter(
-            CourseRegistration.admission_id == admission_id.upper(),
-            CourseRegistration.status.in_(active_statuses)
-        ).count()
+        active_count = course_active_count(admission_id)
         
         if active_count > 0:
             return jsonify({
                 "canApply": False,
-                "reason": "You already have an active application pending or approved.",
+                "reason": ACTIVE_APPLICATION_ERROR,
                 "activeCount": active_count
             })
         
@@ -3254,6 +5583,153 @@ def check_student_can_apply(admission_id):
         return jsonify({"error": str(e)}), 500
 
 
+# ============================================================================
+# SLOT RESERVATION
+# SubActivity.filled_slots is only changed through single conditional UPDATE
+# statements, so the capacity check and the increment happen atomically in
+# the database and two concurrent approvals can never both take the last
+# slot. is_active is flipped in the same statement; it is assigned first
+# because MySQL evaluates SET assignments left to right, so it still sees the
+# pre-update count there as it does on other databases. Transactions that hit
+# a deadlock or lock wait timeout are rolled back and replayed with backoff.
+# ============================================================================
+SLOT_RETRY_ATTEMPTS = int(os.getenv('SLOT_RETRY_ATTEMPTS', '5'))
+SLOT_RETRY_BACKOFF = float(os.getenv('SLOT_RETRY_BACKOFF', '0.02'))
+# MySQL error codes: 1213 deadlock found, 1205 lock wait timeout exceeded
+RETRYABLE_DB_ERRORS = (1213, 1205)
+
+_slot_lock = threading.Lock()
+_slot_counters = {'reserved': 0, 'released': 0, 'full': 0, 'retries': 0}
+
+
+class SlotUnavailable(Exception):
+    """Raised when a sub-activity has no free slot left"""
+
+
+def _count_slot(key, n=1):
+    with _slot_lock:
+        _slot_counters[key] += n
+
+
+def _expire_sub_activity(sub_id):
+    """Drop a stale in-session copy after a statement-level update"""
+    cached = db.session.identity_map.get(db.session.identity_key(SubActivity, sub_id))
+    if cached is not None:
+        db.session.expire(cached)
+
+
+def _shift_slots(sub_id, delta):
+    """One conditional UPDATE moving filled_slots by delta within [0, total_slots]; True if applied"""
+    filled = func.coalesce(SubActivity.filled_slots, 0)
+    total = func.coalesce(SubActivity.total_slots, 0)
+    if delta > 0:
+        guard = filled + delta <= total
+        active = case((filled + delta >= total, False), else_=SubActivity.is_active)
+    else:
+        guard = filled + delta >= 0
+        active = case((filled + delta < total, True), else_=SubActivity.is_active)
+    result = db.session.execute(
+        update(SubActivity)
+        .execution_options(slots_only=True)
+        .where(SubActivity.id == sub_id, guard)
+        .ordered_values(
+            (SubActivity.is_active, active),
+            (SubActivity.filled_slots, filled + delta),
+            (SubActivity.updated_at, datetime.utcnow()),
+            (SubActivity.row_version, SubActivity.row_version + 1)
+        )
+        .execution_options(synchronize_session=False)
+    )
+    _expire_sub_activity(sub_id)
+    return result.rowcount == 1
+
+
+def reserve_slot(sub_id):
+    """Take one slot on the sub-activity; False if it does not exist, SlotUnavailable if full"""
+    if _shift_slots(sub_id, 1):
+        _count_slot('reserved')
+        logger.info(f"Reserved slot on sub-activity {sub_id}")
+        return True
+    if db.session.query(SubActivity.id).filter(SubActivity.id == sub_id).first() is None:
+        return False
+    _count_slot('full')
+    raise SlotUnavailable(sub_id)
+
+
+def release_slot(sub_id):
+    """Give back one slot (reactivating the sub-activity); False if there was none to release"""
+    if _shift_slots(sub_id, -1):
+        _count_slot('released')
+        logger.info(f"Released slot on sub-activity {sub_id}")
+        return True
+    return False
+
+
+def _lock_slot_counts(sub_id):
+    """(filled, total) with the row locked until commit, or None if the sub-activity does not exist"""
+    row = db.session.query(SubActivity.filled_slots, SubActivity.total_slots).filter(
+        SubActivity.id == sub_id
+    ).with_for_update().first()
+    return (row[0] or 0, row[1] or 0) if row else None
+
+
+def reserve_slots(sub_id, count):
+    """Take up to count slots in one UPDATE; returns how many were granted (None if the sub-activity does not exist)"""
+    counts = _lock_slot_counts(sub_id)
+    if counts is None:
+        return None
+    granted = max(0, min(count, counts[1] - counts[0]))
+    if granted:
+        _shift_slots(sub_id, granted)
+        _count_slot('reserved', granted)
+        logger.info(f"Reserved {granted} slot(s) on sub-activity {sub_id}")
+    if granted < count:
+        _count_slot('full', count - granted)
+    return granted
+
+
+def release_slots(sub_id, count):
+    """Give back up to count slots in one UPDATE; returns how many were released"""
+    counts = _lock_slot_counts(sub_id)
+    released = max(0, min(count, counts[0])) if counts else 0
+    if released:
+        _shift_slots(sub_id, -released)
+        _count_slot('released', released)
+        logger.info(f"Released {released} slot(s) on sub-activity {sub_id}")
+    return released
+
+
+def is_retryable_db_error(exc):
+    orig = getattr(exc, 'orig', None)
+    code = getattr(orig, 'errno', None)
+    if code is None and getattr(orig, 'args', None):
+        code = orig.args[0]
+    return code in RETRYABLE_DB_ERRORS
+
+
+def run_transaction(apply):
+    """Run apply() and commit as one unit, replaying it after a deadlock or lock wait timeout"""
+    for attempt in range(1, SLOT_RETRY_ATTEMPTS + 1):
+        try:
+            result = apply()
+            db.session.commit()
+            return result
+        except DBAPIError as e:
+            db.session.rollback()
+            if attempt >= SLOT_RETRY_ATTEMPTS or not is_retryable_db_error(e):
+                raise
+            _count_slot('retries')
+            time.sleep(SLOT_RETRY_BACKOFF * (2 ** (attempt - 1)) * random.uniform(0.5, 1.5))
+
+
+def slot_metrics():
+    with _slot_lock:
+        return dict(_slot_counters)
+
+
+SLOTS_FULL_ERROR = "This sub-activity is full. No slots available."
+
+
 @app.route('/api/course-registrations/<int:reg_id>/approve', methods=['POST'])
 def approve_course_registration(reg_id):
     """
@@ -3273,10 +5749,10 @@ def approve_course_registration(reg_id):
     if action not in ['approve', 'reject']:
         return jsonify({"error": "Action must be 'approve' or 'reject'"}), 400
     
-    # Store old status to check if we need to decrement slots
-    old_status = reg.status
-    
-    try:
+    def apply():
+        # Store old status to check if we need to release a slot
+        old_status = reg.status
+        
         if action == 'approve':
             if reg.status in ['Pending Coordinator', 'Queued Coordinator', 'pending']:
                 # Coordinator approval
@@ -3291,26 +5767,15 @@ def approve_course_registration(reg_id):
                     reg.data['hodApprovedAt'] = datetime.utcnow().isoformat()
                     reg.data['hodApprovedBy'] = approver_email
                 
-                # Update sub-activity slot count
+                # Take a sub-activity slot (fails if the last one is gone)
                 if reg.sub_activity_id:
-                    sub = SubActivity.query.get(reg.sub_activity_id)
-                    if sub:
-                        sub.filled_slots = (sub.filled_slots or 0) + 1
-                        print(f"[INFO] Incremented slot count for sub-activity {sub.id}. New filled: {sub.filled_slots}/{sub.total_slots}")
-                        if sub.filled_slots >= sub.total_slots:
-                            sub.is_active = False
+                    reserve_slot(reg.sub_activity_id)
             else:
                 return jsonify({"error": f"Cannot approve registration with status: {reg.status}"}), 400
         else:
-            # Reject - if was previously Accepted, decrement slot count
+            # Reject - if was previously Accepted, give the slot back
             if old_status == 'Accepted' and reg.sub_activity_id:
-                sub = SubActivity.query.get(reg.sub_activity_id)
-                if sub and sub.filled_slots > 0:
-                    sub.filled_slots -= 1
-                    print(f"[INFO] Decremented slot count for sub-activity {sub.id}. New filled: {sub.filled_slots}/{sub.total_slots}")
-                    # Reactivate if it was full and now has space
-                    if sub.filled_slots < sub.total_slots:
-                        sub.is_active = True
+                release_slot(reg.sub_activity_id)
             
             reg.status = 'Rejected'
             if reg.data:
@@ -3319,7 +5784,12 @@ def approve_course_registration(reg_id):
                 reg.data['rejectionReason'] = reason
         
         reg.last_updated = datetime.utcnow()
-        db.session.commit()
+        return None
+    
+    try:
+        error = run_transaction(apply)
+        if error:
+            return error
         
         return jsonify({
             "success": True,
@@ -3327,6 +5797,9 @@ def approve_course_registration(reg_id):
             "registration": reg.to_dict()
         })
         
+    except SlotUnavailable:
+        db.session.rollback()
+        return jsonify({"error": SLOTS_FULL_ERROR}), 409
     except Exception as e:
         db.session.rollback()
         return jsonify({"error": f"Database error: {str(e)}"}), 500
@@ -3342,6 +5815,8 @@ def course_registrations():
         coordinator_email = request.args.get('coordinatorEmail')
         department = request.args.get('department')
         branch = request.args.get('branch')
+        year = request.args.get('year')
+        section = request.args.get('section')
         course = request.args.get('course')
         
         query = CourseRegistration.query
@@ -3357,7 +5832,11 @@ def course_registrations():
         if department:
             query = query.filter_by(department=department)
         if branch:
-            query = query.filter(CourseRegistration.data['branch'] == branch)
+            query = query.filter(CourseRegistration.branch == branch)
+        if year:
+            query = query.filter(CourseRegistration.year == year)
+        if section:
+            query = query.filter(CourseRegistration.section == section)
         if course:
             query = query.filter(CourseRegistration.course == course)
         
@@ -3370,12 +5849,22 @@ def course_registrations():
                     (CourseRegistration.activity_name.contains(coordinator.role))
                 )
         
-        regs = query.order_by(CourseRegistration.created_at.desc()).all()
-        return jsonify([r.to_dict() for r in regs])
+        page, error = keyset_page(query, CourseRegistration.created_at, CourseRegistration.id)
+        if error:
+            return error
+        return with_page_headers(jsonify([r.to_dict() for r in page.rows]), page)
     
     elif request.method == 'POST':
         payload = request.get_json(silent=True) or {}
         
+        # One active application per student; the admission writer re-checks queued ones
+        if course_active_count(payload.get('admissionId')):
+            return jsonify({"error": ACTIVE_APPLICATION_ERROR}), 409
+        
+        if admission_queue is not None:
+            # Write-behind mode: the admission writer inserts it with the next batch
+            return admission_accepted(admission_queue.submit('course_registration', payload))
+        
         try:
             new_reg = CourseRegistration(
                 student_name=payload.get('studentName', ''),
@@ -3443,39 +5932,32 @@ def hod_approve_registration(reg_id):
     if action not in ['approve', 'reject']:
         return jsonify({"error": "Action must be 'approve' or 'reject'"}), 400
     
-    # Store old status to check if we need to decrement slots
-    old_status = reg.status
-    
-    try:
+    def apply():
+        # Store old status to check if we need to release a slot
+        old_status = reg.status
+        
         if action == 'approve':
             reg.hod_status = 'approved'
             reg.status = 'hod_approved'  # Fully approved
             
-            # Update sub-activity slot count if linked
+            # Take a sub-activity slot if linked (fails if the last one is gone)
             if reg.sub_activity_id:
-                sub_activity = SubActivity.query.get(reg.sub_activity_id)
-                if sub_activity:
-                    sub_activity.filled_slots = (sub_activity.filled_slots or 0) + 1
-                    print(f"[INFO] Incremented slot count for sub-activity {sub_activity.id}. New filled: {sub_activity.filled_slots}/{sub_activity.total_slots}")
-                    # Deactivate if full
-                    if sub_activity.filled_slots >= sub_activity.total_slots:
-                        sub_activity.is_active = False
+                reserve_slot(reg.sub_activity_id)
         else:
-            # If registration was previously approved, decrement slot count
+            # If registration was previously approved, give the slot back
             if old_status == 'hod_approved' and reg.sub_activity_id:
-                sub_activity = SubActivity.query.get(reg.sub_activity_id)
-                if sub_activity and sub_activity.filled_slots > 0:
-                    sub_activity.filled_slots -= 1
-                    print(f"[INFO] Decremented slot count for sub-activity {sub_activity.id}. New filled: {sub_activity.filled_slots}/{sub_activity.total_slots}")
-                    if sub_activity.filled_slots < sub_activity.total_slots:
-                        sub_activity.is_active = True
+                release_slot(reg.sub_activity_id)
             
             reg.hod_status = 'rejected'
             reg.status = 'rejected'
             reg.rejection_reason = reason or 'Rejected by HOD'
-        
-        db.session.commit()
+    
+    try:
+        run_transaction(apply)
         return jsonify({"success": True, "registration": reg.to_dict()})
+    except SlotUnavailable:
+        db.session.rollback()
+        return jsonify({"error": SLOTS_FULL_ERROR}), 409
     except Exception as e:
         db.session.rollback()
         return jsonify({"error": f"Database error: {str(e)}"}), 500
@@ -3483,90 +5965,246 @@ def hod_approve_registration(reg_id):
 
 @app.route('/api/course-registrations/<int:reg_id>', methods=['GET', 'PUT', 'DELETE'])
 def course_registration_detail(reg_id):
+    if request.method == 'GET':
+        return conditional_get(CourseRegistration, reg_id, CourseRegistration.last_updated, "Registration not found")
+    
     reg = CourseRegistration.query.get(reg_id)
     if not reg:
         return jsonify({"error": "Registration not found"}), 404
     
-    if request.method == 'GET':
-        return jsonify(reg.to_dict())
-    
-    elif request.method == 'PUT':
+    if request.method == 'PUT':
         payload = request.get_json(silent=True) or {}
         
-        # Store old status to handle slot count updates
-        old_status = reg.status
-        new_status = payload.get('status')
-        
-        if 'status' in payload:
-            reg.status = payload['status']
-        if 'studentName' in payload:
-            reg.student_name = payload['studentName']
-        if 'admissionId' in payload:
-            reg.admission_id = payload['admissionId']
-        if 'course' in payload:
-            reg.course = payload['course']
-        if 'activityName' in payload:
-            reg.activity_name = payload['activityName']
-        if 'activityCategory' in payload:
-            reg.activity_category = payload['activityCategory']
-        
-        # Handle slot count changes based on status transitions
-        accepted_statuses = ['Accepted', 'hod_approved', 'Approved']
-        
-        # If transitioning TO accepted status (and wasn't already accepted)
-        if new_status in accepted_statuses and old_status not in accepted_statuses:
-            if reg.sub_activity_id:
-                sub = SubActivity.query.get(reg.sub_activity_id)
-                if sub:
-                    sub.filled_slots = (sub.filled_slots or 0) + 1
-                    print(f"[INFO] Status changed to {new_status}. Incremented slot for sub-activity {sub.id}. New filled: {sub.filled_slots}/{sub.total_slots}")
-                    # Deactivate if full
-                    if sub.filled_slots >= sub.total_slots:
-                        sub.is_active = False
-                        print(f"[INFO] Sub-activity {sub.id} is now FULL")
-        
-        # If transitioning FROM accepted status (to rejected or other)
-        elif old_status in accepted_statuses and new_status not in accepted_statuses:
+        def apply():
+            # Store old status to handle slot count updates
+            old_status = reg.status
+            new_status = payload.get('status')
+            
+            if 'status' in payload:
+                reg.status = payload['status']
+            if 'studentName' in payload:
+                reg.student_name = payload['studentName']
+            if 'admissionId' in payload:
+                reg.admission_id = payload['admissionId']
+            if 'course' in payload:
+                reg.course = payload['course']
+            if 'activityName' in payload:
+                reg.activity_name = payload['activityName']
+            if 'activityCategory' in payload:
+                reg.activity_category = payload['activityCategory']
+            
+            # Handle slot count changes based on status transitions
+            accepted_statuses = ['Accepted', 'hod_approved', 'Approved']
+            
             if reg.sub_activity_id:
-                sub = SubActivity.query.get(reg.sub_activity_id)
-                if sub and sub.filled_slots > 0:
-                    sub.filled_slots -= 1
-                    print(f"[INFO] Status changed from {old_status} to {new_status}. Decremented slot for sub-activity {sub.id}. New filled: {sub.filled_slots}/{sub.total_slots}")
-                    # Reactivate if was full and now has space
-                    if sub.filled_slots < sub.total_slots:
-                        sub.is_active = True
-        
-        # Update the data JSON field with full payload
-        reg.data = {**reg.data, **payload} if reg.data else payload
-        reg.last_updated = datetime.utcnow()
+                # If transitioning TO accepted status (and wasn't already accepted)
+                if new_status in accepted_statuses and old_status not in accepted_statuses:
+                    reserve_slot(reg.sub_activity_id)
+                # If transitioning FROM accepted status (to rejected or other)
+                elif old_status in accepted_statuses and new_status not in accepted_statuses:
+                    release_slot(reg.sub_activity_id)
+            
+            # Update the data JSON field with full payload
+            reg.data = {**reg.data, **payload} if reg.data else payload
+            reg.last_updated = datetime.utcnow()
         
         try:
-            db.session.commit()
+            run_transaction(apply)
             return jsonify(reg.to_dict())
+        except SlotUnavailable:
+            db.session.rollback()
+            return jsonify({"error": SLOTS_FULL_ERROR}), 409
         except Exception as e:
             db.session.rollback()
             return jsonify({"error": f"Database error: {str(e)}"}), 500
     
     elif request.method == 'DELETE':
-        try:
-            # If registration was accepted, decrement the slot count
+        def apply():
+            # If registration was accepted, give its slot back
             if reg.status == 'Accepted' and reg.sub_activity_id:
-                sub = SubActivity.query.get(reg.sub_activity_id)
-                if sub and sub.filled_slots > 0:
-                    sub.filled_slots -= 1
-                    # Reactivate if it was full and now has space
-                    if sub.filled_slots < sub.total_slots:
-                        sub.is_active = True
-                    print(f"[INFO] Decremented slot count for sub-activity {sub.id}. New filled: {sub.filled_slots}")
+                release_slot(reg.sub_activity_id)
             
             db.session.delete(reg)
-            db.session.commit()
+        
+        try:
+            run_transaction(apply)
             return jsonify({"success": True, "message": "Registration deleted successfully"})
         except Exception as e:
             db.session.rollback()
             return jsonify({"error": f"Database error: {str(e)}"}), 500
 
 
+# ============================================================================
+# BULK APPROVALS
+# Approve or reject a list of registrations in one request and one
+# transaction. Slot changes are summed per sub-activity and applied with one
+# UPDATE each; when a sub-activity has fewer free slots than approvals, the
+# earliest ids in the request get them and the rest are reported as full.
+# Every id gets its own entry in "results" so partial failures are visible.
+# ============================================================================
+BULK_MAX_ITEMS = int(os.getenv('BULK_MAX_ITEMS', '200'))
+
+
+def parse_bulk_ids(payload, key='ids'):
+    """Integer ids from a JSON list (deduplicated, order kept).
+    Returns (ids, None) or (None, error response)."""
+    raw = payload.get(key)
+    if not isinstance(raw, list) or not raw:
+        return None, (jsonify({"error": f"'{key}' must be a non-empty list"}), 400)
+    ids = []
+    for value in raw:
+        try:
+            value = int(value)
+        except (TypeError, ValueError):
+            return None, (jsonify({"error": f"Invalid id in '{key}': {value}"}), 400)
+        if value not in ids:
+            ids.append(value)
+    if len(ids) > BULK_MAX_ITEMS:
+        return None, (jsonify({"error": f"At most {BULK_MAX_ITEMS} ids per request", "maxItems": BULK_MAX_ITEMS}), 400)
+    return ids, None
+
+
+def apply_slot_changes(reservations, releases):
+    """Apply per-sub-activity slot changes; reservations map sub id -> [row, ...] in request order.
+    Returns the rows that did not get a slot."""
+    denied = []
+    # Fixed lock order across requests keeps concurrent bulk calls from deadlocking each other
+    for sub_id in sorted(releases):
+        release_slots(sub_id, releases[sub_id])
+    for sub_id in sorted(reservations):
+        rows = reservations[sub_id]
+        granted = reserve_slots(sub_id, len(rows))
+        if granted is not None:
+            denied.extend(rows[granted:])
+    return denied
+
+
+def bulk_response(ids, results):
+    ordered = [results[i] for i in ids]
+    succeeded = sum(1 for r in ordered if r['success'])
+    return jsonify({
+        "success": succeeded == len(ordered),
+        "results": ordered,
+        "summary": {"requested": len(ordered), "succeeded": succeeded, "failed": len(ordered) - succeeded}
+    })
+
+
+@app.route('/api/course-registrations/bulk-approve', methods=['POST'])
+def bulk_approve_course_registrations():
+    """Bulk version of /api/course-registrations/<id>/approve: {ids, action, reason, approverEmail}"""
+    payload = request.get_json(silent=True) or {}
+    action = payload.get('action', '').lower()  # 'approve' or 'reject'
+    reason = payload.get('reason', '')
+    approver_email = payload.get('approverEmail', '')
+    
+    if action not in ['approve', 'reject']:
+        return jsonify({"error": "Action must be 'approve' or 'reject'"}), 400
+    ids, error = parse_bulk_ids(payload)
+    if error:
+        return error
+    
+    def apply():
+        regs = {r.id: r for r in CourseRegistration.query.filter(CourseRegistration.id.in_(ids)).all()}
+        results = {}
+        changes = {}  # reg id -> callable applying the new status once its slot is settled
+        reservations, releases = {}, {}
+        now = datetime.utcnow().isoformat()
+        
+        for reg_id in ids:
+            reg = regs.get(reg_id)
+            if not reg:
+                results[reg_id] = {"id": reg_id, "success": False, "error": "Registration not found"}
+                continue
+            if action == 'approve':
+                if reg.status in ['Pending Coordinator', 'Queued Coordinator', 'pending']:
+                    changes[reg_id] = ('Pending HOD', {'coordinatorApprovedAt': now, 'coordinatorApprovedBy': approver_email})
+                elif reg.status in ['Pending HOD', 'Queued HOD', 'coordinator_approved']:
+                    changes[reg_id] = ('Accepted', {'hodApprovedAt': now, 'hodApprovedBy': approver_email})
+                    if reg.sub_activity_id:
+                        reservations.setdefault(reg.sub_activity_id, []).append(reg)
+                else:
+                    results[reg_id] = {"id": reg_id, "success": False,
+                                       "error": f"Cannot approve registration with status: {reg.status}"}
+            else:
+                if reg.status == 'Accepted' and reg.sub_activity_id:
+                    releases[reg.sub_activity_id] = releases.get(reg.sub_activity_id, 0) + 1
+                changes[reg_id] = ('Rejected', {'rejectedAt': now, 'rejectedBy': approver_email, 'rejectionReason': reason})
+        
+        for reg in apply_slot_changes(reservations, releases):
+            del changes[reg.id]
+            results[reg.id] = {"id": reg.id, "success": False, "error": SLOTS_FULL_ERROR}
+        
+        for reg_id, (status, stamps) in changes.items():
+            reg = regs[reg_id]
+            reg.status = status
+            if reg.data:
+                reg.data = {**reg.data, **stamps}
+            reg.last_updated = datetime.utcnow()
+            results[reg_id] = {"id": reg_id, "success": True, "status": status}
+        return results
+    
+    try:
+        return bulk_response(ids, run_transaction(apply))
+    except Exception as e:
+        db.session.rollback()
+        return jsonify({"error": f"Database error: {str(e)}"}), 500
+
+
+@app.route('/api/registrations/bulk-hod-approve', methods=['POST'])
+def bulk_hod_approve_registrations():
+    """Bulk version of /api/registrations/<id>/hod-approve: {ids, action, reason}"""
+    payload = request.get_json(silent=True) or {}
+    action = payload.get('action', '').lower()  # 'approve' or 'reject'
+    reason = payload.get('reason', '')
+    
+    if action not in ['approve', 'reject']:
+        return jsonify({"error": "Action must be 'approve' or 'reject'"}), 400
+    ids, error = parse_bulk_ids(payload)
+    if error:
+        return error
+    
+    def apply():
+        regs = {r.id: r for r in Registration.query.filter(Registration.id.in_(ids)).all()}
+        results = {}
+        ready = []
+        reservations, releases = {}, {}
+        
+        for reg_id in ids:
+            reg = regs.get(reg_id)
+            if not reg:
+                results[reg_id] = {"id": reg_id, "success": False, "error": "Registration not found"}
+            elif reg.coordinator_status != 'approved':
+                results[reg_id] = {"id": reg_id, "success": False,
+                                   "error": "Registration must be approved by coordinator first"}
+            else:
+                ready.append(reg)
+                if action == 'approve' and reg.sub_activity_id:
+                    reservations.setdefault(reg.sub_activity_id, []).append(reg)
+                elif action == 'reject' and reg.status == 'hod_approved' and reg.sub_activity_id:
+                    releases[reg.sub_activity_id] = releases.get(reg.sub_activity_id, 0) + 1
+        
+        denied = {reg.id for reg in apply_slot_changes(reservations, releases)}
+        for reg in ready:
+            if reg.id in denied:
+                results[reg.id] = {"id": reg.id, "success": False, "error": SLOTS_FULL_ERROR}
+                continue
+            if action == 'approve':
+                reg.hod_status = 'approved'
+                reg.status = 'hod_approved'
+            else:
+                reg.hod_status = 'rejected'
+                reg.status = 'rejected'
+                reg.rejection_reason = reason or 'Rejected by HOD'
+            results[reg.id] = {"id": reg.id, "success": True, "status": reg.status}
+        return results
+    
+    try:
+        return bulk_response(ids, run_transaction(apply))
+    except Exception as e:
+        db.session.rollback()
+        return jsonify({"error": f"Database error: {str(e)}"}), 500
+
+
 # Event Management Endpoints
 @app.route('/api/events', methods=['GET', 'POST'])
 def events():
@@ -3587,8 +6225,10 @@ def events():
         if is_active is not None:
             query = query.filter_by(is_active=is_active.lower() == 'true')
         
-        events = query.order_by(Event.event_date.desc()).all()
-        return jsonify([e.to_dict() for e in events])
+        page, error = keyset_page(query, Event.event_date, Event.id)
+        if error:
+            return error
+        return with_page_headers(jsonify([e.to_dict() for e in page.rows]), page)
     
     elif request.method == 'POST':
         payload = request.get_json(silent=True) or {}
@@ -3664,14 +6304,14 @@ def events():
 
 @app.route('/api/events/<int:event_id>', methods=['GET', 'PUT', 'DELETE'])
 def event_detail(event_id):
+    if request.method == 'GET':
+        return conditional_get(Event, event_id, Event.updated_at, "Event not found")
+    
     event = Event.query.get(event_id)
     if not event:
         return jsonify({"error": "Event not found"}), 404
     
-    if request.method == 'GET':
-        return jsonify(event.to_dict())
-    
-    elif request.method == 'PUT':
+    if request.method == 'PUT':
         payload = request.get_json(silent=True) or {}
         
         if 'eventName' in payload:
@@ -4152,8 +6792,10 @@ def attendance():
             except:
                 pass
         
-        records = query.order_by(Attendance.attendance_date.desc()).all()
-        return jsonify([a.to_dict() for a in records])
+        page, error = keyset_page(query, Attendance.attendance_date, Attendance.id)
+        if error:
+            return error
+        return with_page_headers(jsonify([a.to_dict() for a in page.rows]), page)
     
     elif request.method == 'POST':
         payload = request.get_json(silent=True) or {}
@@ -4274,45 +6916,43 @@ def student_analytics(admission_id):
 @app.route('/api/analytics/activity/<activity_name>', methods=['GET'])
 def activity_analytics(activity_name):
     """Get analytics for a specific activity"""
-    # Get all approved registrations for this activity from CourseRegistration
-    course_regs = CourseRegistration.query.filter(
-        CourseRegistration.status.in_(['Accepted', 'hod_approved']),
-        (CourseRegistration.activity_category == activity_name) |
-        (CourseRegistration.activity_name == activity_name)
+    # Accepted enrollments for this activity, grouped once by department and sub-activity
+    rows = db.session.query(
+        Enrollment.source, Enrollment.department, Enrollment.activity_name,
+        Enrollment.activity_category, func.count(Enrollment.id)
+    ).filter(
+        Enrollment.state == 'accepted',
+        (Enrollment.source == 'course') | (Enrollment.status == LEGACY_ANALYTICS_ACCEPTED),
+        (Enrollment.activity == activity_name) | (Enrollment.activity_name == activity_name)
+    ).group_by(
+        Enrollment.source, Enrollment.department, Enrollment.activity_name, Enrollment.activity_category
     ).all()
     
-    # Also check old Registration table
-    old_regs = Registration.query.filter_by(activity_name=activity_name, status='hod_approved').all()
-    
-    total_enrolled = len(course_regs) + len(old_regs)
+    total_enrolled = 0
+    dept_distribution = {}
+    sub_activity_distribution = {}
+    for source, department, registered_name, category, count in rows:
+        total_enrolled += count
+        dept = department or 'Unknown'
+        dept_distribution[dept] = dept_distribution.get(dept, 0) + count
+        if source == 'course':
+            sub_name = registered_name if category else 'Unassigned'
+            sub_activity_distribution[sub_name] = sub_activity_distribution.get(sub_name, 0) + count
     
     # Get sub-activities
-    sub_activities = SubActivity.query.filter_by(activity_name=activity_name).all()
+    sub_activities = [s for s in catalog.live_sub_activities(catalog.current()) if s['activityName'] == (activity_name or '').upper()]
     
     # Get attendance stats
-    attendance_records = Attendance.query.filter_by(activity_name=activity_name).all()
-    total_attendance_days = len(attendance_records)
-    present_count = len([a for a in attendance_records if a.status == 'present'])
-    
-    # Count by department
-    dept_distribution = {}
-    for reg in course_regs:
-        dept = reg.department or 'Unknown'
-        dept_distribution[dept] = dept_distribution.get(dept, 0) + 1
-    for reg in old_regs:
-        dept = reg.department or 'Unknown'
-        dept_distribution[dept] = dept_distribution.get(dept, 0) + 1
-    
-    # Count by sub-activity
-    sub_activity_distribution = {}
-    for reg in course_regs:
-        sub_name = reg.activity_name if reg.activity_category else 'Unassigned'
-        sub_activity_distribution[sub_name] = sub_activity_distribution.get(sub_name, 0) + 1
+    total_attendance_days, present_count = db.session.query(
+        func.count(Attendance.id),
+        func.coalesce(func.sum(case((Attendance.status == 'present', 1), else_=0)), 0)
+    ).filter(Attendance.activity_name == activity_name).one()
+    present_count = int(present_count)
     
     return jsonify({
         "activityName": activity_name,
         "totalEnrolled": total_enrolled,
-        "subActivities": [s.to_dict() for s in sub_activities],
+        "subActivities": sub_activities,
         "totalAttendanceDays": total_attendance_days,
         "presentCount": present_count,
         "overallAttendanceRate": round((present_count / total_attendance_days * 100) if total_attendance_days > 0 else 0, 2),
@@ -4324,47 +6964,53 @@ def activity_analytics(activity_name):
 @app.route('/api/analytics/department/<department>', methods=['GET'])
 def department_analytics(department):
     """Get analytics for a specific department (HOD view)"""
-    # Get all students from this department
-    students = Student.query.filter_by(department=department).all()
-    
-    # Get registrations from CourseRegistration table (primary source)
-    course_regs = CourseRegistration.query.filter_by(department=department).all()
-    course_approved = [r for r in course_regs if r.status in ['Accepted', 'hod_approved']]
-    course_pending = [r for r in course_regs if r.status in ['Pending Coordinator', 'coordinator_approved', 'Pending HOD']]
-    
-    # Also get from old Registration table
-    registrations = Registration.query.filter_by(department=department).all()
-    reg_approved = [r for r in registrations if r.status == 'hod_approved']
-    reg_pending = [r for r in registrations if r.status in ['pending', 'coordinator_approved']]
-    
-    total_approved = len(course_approved) + len(reg_approved)
-    total_pending = len(course_pending) + len(reg_pending)
+    # Count students from this department without loading their profiles
+    student_count = Student.query.filter_by(department=department).count()
+    
+    # Enrollment counts by state, activity and course in one grouped query
+    rows = db.session.query(
+        Enrollment.source, Enrollment.state, Enrollment.status, Enrollment.activity, Enrollment.course,
+        func.count(Enrollment.id)
+    ).filter(Enrollment.department == department).group_by(
+        Enrollment.source, Enrollment.state, Enrollment.status, Enrollment.activity, Enrollment.course
+    ).all()
     
-    # Count by activity
+    total_registrations = 0
+    total_approved = 0
+    total_pending = 0
     activity_distribution = {}
-    for reg in course_approved:
-        activity_name = reg.activity_category or reg.activity_name
-        activity_distribution[activity_name] = activity_distribution.get(activity_name, 0) + 1
-    for reg in reg_approved:
-        activity_distribution[reg.activity_name] = activity_distribution.get(reg.activity_name, 0) + 1
-    
-    # Count by course/class
     course_distribution = {}
-    for reg in course_approved:
-        course_name = reg.course or 'Unknown'
-        course_distribution[course_name] = course_distribution.get(course_name, 0) + 1
-    
-    # Get attendance stats for this department
-    attendance_records = Attendance.query.filter(
-        Attendance.student_admission_id.in_([r.admission_id for r in course_approved + reg_approved if r.admission_id])
-    ).all()
-    total_attendance = len(attendance_records)
-    present_count = len([a for a in attendance_records if a.status == 'present'])
+    for source, state, status, activity_name, course_name, count in rows:
+        total_registrations += count
+        if source == 'legacy' and status != LEGACY_ANALYTICS_ACCEPTED and state == 'accepted':
+            state = 'other'
+        if state == 'pending':
+            total_pending += count
+        if state != 'accepted':
+            continue
+        total_approved += count
+        activity_distribution[activity_name] = activity_distribution.get(activity_name, 0) + count
+        if source == 'course':
+            course_name = course_name or 'Unknown'
+            course_distribution[course_name] = course_distribution.get(course_name, 0) + count
+    
+    # Get attendance stats for students accepted from this department
+    accepted_ids = db.session.query(Enrollment.admission_id).filter(
+        Enrollment.department == department,
+        Enrollment.state == 'accepted',
+        (Enrollment.source == 'course') | (Enrollment.status == LEGACY_ANALYTICS_ACCEPTED),
+        Enrollment.admission_id.isnot(None)
+    )
+    total_attendance, present_count = db.session.query(
+        func.count(Attendance.id),
+        func.coalesce(func.sum(case((Attendance.status == 'present', 1), else_=0)), 0)
+    ).filter(Attendance.student_admission_id.in_(accepted_ids)).one()
+    present_count = int(present_count)
     
     return jsonify({
         "department": department,
-        "totalStudents": len(students),
-        "totalRegistrations": len(course_regs) + len(registrations),
+        "totalStudents": student_count,
+        "totalRegistrations": total_registrations,
         "approvedRegistrations": total_approved,
         "pendingRegistrations": total_pending,
         "activityDistribution": activity_distribution,
@@ -4399,22 +7045,19 @@ def students_by_activity():
     
     if sub_activity_id:
         query = query.filter_by(sub_activity_id=int(sub_activity_id))
+    # Roster filters on the columns copied from the registration data
+    if year:
+        query = query.filter(Registration.year == year)
+    if branch:
+        query = query.filter(Registration.branch == branch)
+    if section:
+        query = query.filter(Registration.section == section)
     
     registrations = query.all()
     
-    # Filter by student details from data JSON
     students_data = []
     for reg in registrations:
         data = reg.data or {}
-        
-        # Apply filters
-        if year and data.get('year') != year:
-            continue
-        if branch and data.get('branch') != branch:
-            continue
-        if section and data.get('section') != section:
-            continue
-        
         students_data.append({
             **data,
             "registrationId": reg.id,
@@ -4458,6 +7101,7 @@ def get_hod_departments():
 
 
 @app.route('/api/hod/login', methods=['POST'])
+@rate_limit('hod_login', ip='120/60', account='5/60', account_key=_json_field('hod_id'))
 def hod_login():
     """HOD Login with department selection using Database"""
     try:
@@ -4484,9 +7128,16 @@ def hod_login():
              return jsonify({'status': 'error', 'message': 'User is not an HOD'}), 403
 
         # Verify Password
-        if not verify_password(password, user.password_hash):
+        try:
+            password_ok = password_pool.verify(password, user.password_hash)
+        except PasswordPoolBusy:
+            return too_many_requests({'status': 'error', 'message': 'Too many login attempts in progress. Please retry shortly.'}, PASSWORD_RETRY_AFTER)
+        if not password_ok:
              return jsonify({'status': 'error', 'message': 'Invalid credentials'}), 401
 
+        if rehash_password_if_needed(user, password):
+            db.session.commit()
+
         # Verify Department
         dept = Department.query.get(user.assigned_department_id)
         if not dept or dept.code != dept_code:
@@ -4642,7 +7293,7 @@ def hod_profile():
             
             return jsonify({
                 'status': 'success',
-                'profile': user.to_dict()
+                'profile': serialize_users([user])[0]
             }), 200
         
         elif request.method == 'PUT':
@@ -4674,11 +7325,13 @@ def hod_profile():
             user.updated_at = datetime.utcnow()
             
             db.session.commit()
+            invalidate_principal(user.id)
+            hod_directory.invalidate()
             
             return jsonify({
                 'status': 'success',
                 'message': 'Profile updated successfully',
-                'profile': user.to_dict()
+                'profile': serialize_users([user])[0]
             }), 200
             
     except Exception as e:
@@ -4774,7 +7427,7 @@ def get_pending_students():
         
         return jsonify({
             'status': 'success',
-            'students': [s.to_dict() for s in students]
+            'students': serialize_users(students)
         }), 200
     except Exception as e:
         return jsonify({'status': 'error', 'message': str(e)}), 500
@@ -4809,6 +7462,39 @@ def approve_student():
         return jsonify({'status': 'error', 'message': str(e)}), 500
 
 
+@app.route('/api/hod/bulk-approve-students', methods=['POST'])
+def bulk_approve_students():
+    """HOD approves or rejects several student registrations in one UPDATE: {studentIds, action}"""
+    if 'hod_session' not in session:
+        return jsonify({'status': 'error', 'message': 'Unauthorized'}), 401
+    
+    data = request.get_json(silent=True) or {}
+    action = data.get('action', 'APPROVE')  # APPROVE or REJECT
+    if action not in ('APPROVE', 'REJECT'):
+        return jsonify({'status': 'error', 'message': "Action must be 'APPROVE' or 'REJECT'"}), 400
+    ids, error = parse_bulk_ids(data, 'studentIds')
+    if error:
+        return error
+    
+    try:
+        found = {row[0] for row in db.session.query(User.id).filter(User.id.in_(ids)).all()}
+        if found:
+            User.query.filter(User.id.in_(found)).update(
+                {User.registration_status: 'APPROVED' if action == 'APPROVE' else 'REJECTED'},
+                synchronize_session=False
+            )
+        db.session.commit()
+        results = {
+            student_id: {"id": student_id, "success": True, "status": f"{action}D"} if student_id in found
+            else {"id": student_id, "success": False, "error": "Student not found"}
+            for student_id in ids
+        }
+        return bulk_response(ids, results)
+    except Exception as e:
+        db.session.rollback()
+        return jsonify({'status': 'error', 'message': str(e)}), 500
+
+
 # ==================== COORDINATOR ATTENDANCE ROUTES ====================
 
 @app.route('/api/coordinator/sub-activity/<int:sub_activity_id>/students', methods=['GET'])
@@ -5846,6 +8532,8 @@ def log_response_errors(response):
 
 
 if __name__ == '__main__':
+    rounds = calibrate_bcrypt_rounds()
+    print(f"[OK] bcrypt work factor set to {rounds} (target {BCRYPT_TARGET_MS:.0f}ms per verification).")
     with app.app_context():
         try:
             db.create_all() # Creates tables if they don't exist
@@ -5944,6 +8632,19 @@ if __name__ == '__main__':
             print("HOD:             hod@pbsiddhartha.ac.in / hod123")
             print("Coordinator:     ruhi@pbsiddhartha.ac.in / ruhi123")
             print("=" * 80)
+
+            roll_index.ensure_fresh()
+            print(f"[OK] Roll number index ready: {roll_index.size()}")
+
+            if admission_queue is not None:
+                # Drain anything left queued by a previous run
+                admission_queue.start()
+                print(f"[OK] Admission queue enabled: {ADMISSION_QUEUE_PATH}")
+
+            if CATALOG_EXPORT_ENABLED:
+                # Exports once now, then again after catalog/event writes
+                static_catalog.start()
+                print(f"[OK] Static catalog export enabled: {CATALOG_EXPORT_DIR}")
             
         except Exception as e:
             print(f"[ERROR] Database Error: {e}")
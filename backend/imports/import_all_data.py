@@ -13,39 +13,7 @@ from dotenv import load_dotenv
 load_dotenv()
 
 # Import after loading env
-from app import app, db, Student, Department, User, Role, hash_password
-
-# Program code to department code mapping based on CSV data
-PCODE_TO_DEPT = {
-    '11': 'ECO',  # B.A.-Honours(ECO)
-    '21': 'COM',  # B.Com.-Honours(General)
-    '22': 'COM',  # B.Com.-Honours(Computer Applications)-A
-    '23': 'COM',  # B.Com.-Honours(Computer Applications)-B
-    '24': 'COM',  # B.Com.-Honours(Computer Applications)-C
-    '25': 'COM',  # B.Com.-Honours(Tax Procedures)
-    '26': 'COM',  # B.Com.-Honours(Finance)
-    '27': 'COM',  # B.Com.-Honours(BPM)
-    '28': 'COM',  # B.Com.-Honours(Banking)
-    '31': 'BBA',  # B.B.A.-Honours-A
-    '32': 'BBA',  # B.B.A.-Honours-B
-    '33': 'BBA',  # B.B.A.-Honours(Business Analytics)
-    '41': 'CSC',  # B.C.A.-Honours-A
-    '42': 'CSC',  # B.C.A.-Honours-B
-    '51': 'BOT',  # B.Sc.-Honours(Botany)
-    '52': 'ZOO',  # B.Sc.-Honours(Zoology)
-    '61': 'MAT',  # B.Sc.-Honours(Mathematics)
-    '62': 'CHE',  # B.Sc.-Honours(Chemistry)
-    '63': 'PHY',  # B.Sc.-Honours(Physics)
-    '64': 'ELE',  # B.Sc.-Honours(Electronics)
-    '65': 'STA',  # B.Sc.-Honours(Statistics)
-    '71': 'CSC',  # B.Sc.-Honours(Computer Science)-A
-    '72': 'CSC',  # B.Sc.-Honours(Computer Science)-B
-    '73': 'CSC',  # B.Sc.-Honours(Computer Science)-C
-    '74': 'DSAI', # B.Sc.-Honours(Data Science)
-    '75': 'DSAI', # B.Sc.-Honours(Data Analytics)
-    '76': 'CSC',  # B.Sc.-Honours(CS and Cognitive Systems)
-    '77': 'DSAI', # B.Sc.-Honours(Artificial Intelligence)
-}
+from app import app, db, Student, Department, User, Role, hash_password, PCODE_TO_DEPT
 
 def get_file_path(filename):
     """Get full path to file in project directories."""
@@ -60,18 +60,30 @@ try:
             import json
             profile_json = json.dumps(profile_data)
             
+            # Indexed copies of hot profile fields (see STUDENT_PROFILE_COLUMNS in app.py)
+            columns = (
+                profile_data['studentName'][:255] or None,
+                profile_data['program'][:255] or None,
+                profile_data['pcode'][:20] or None,
+                profile_data['joiningYear'][:10] or None,
+                profile_data['section'][:20] or None,
+            )
+            
             if existing:
                 cursor.execute('''
                     UPDATE students 
-                    SET profile = %s, department = %s
+                    SET profile = %s, department = %s, updated_at = UTC_TIMESTAMP(),
+                        student_name = %s, program = %s, pcode = %s, joining_year = %s, section = %s,
+                        department_code = NULL
                     WHERE lookup_key = %s
-                ''', (profile_json, (row.get('pshort') or '').strip(), roll_no))
+                ''', (profile_json, (row.get('pshort') or '').strip(), *columns, roll_no))
                 count_updated += 1
             else:
                 cursor.execute('''
-                    INSERT INTO students (lookup_key, department, profile)
-                    VALUES (%s, %s, %s)
-                ''', (roll_no, (row.get('pshort') or '').strip(), profile_json))
+                    INSERT INTO students (lookup_key, department, profile, created_at, updated_at,
+                                          student_name, program, pcode, joining_year, section)
+                    VALUES (%s, %s, %s, UTC_TIMESTAMP(), UTC_TIMESTAMP(), %s, %s, %s, %s, %s)
+                ''', (roll_no, (row.get('pshort') or '').strip(), profile_json, *columns))
                 count_created += 1
             
             if (count_created + count_updated) % 100 == 0:
@@ -0,0 +1,172 @@
+#!/usr/bin/env python3
+"""
+Migration Script: Promote hot Student.profile fields to indexed columns
+Adds student_name, program, pcode, department_code, joining_year and section
+to the students table, indexes them, and backfills them from the profile JSON
+in chunks. New writes keep them in sync through the Student model.
+"""
+
+import os
+import sys
+import json
+from dotenv import load_dotenv
+import mysql.connector
+from mysql.connector import Error as MySQLError
+
+load_dotenv()
+
+# Database configuration
+db_user = os.getenv('DB_USER', 'root')
+db_password = os.getenv('DB_PASSWORD', '1234')
+db_host = os.getenv('DB_HOST', 'localhost')
+db_port = int(os.getenv('DB_PORT', '3306'))
+db_name = os.getenv('DB_NAME', 'school_db')
+
+BACKFILL_CHUNK = int(os.getenv('MIGRATION_CHUNK_SIZE', '1000'))
+
+# Column -> (profile key, max length); mirrors STUDENT_PROFILE_COLUMNS in app.py
+PROFILE_COLUMNS = {
+    'student_name': ('studentName', 255),
+    'program': ('program', 255),
+    'pcode': ('pcode', 20),
+    'department_code': ('departmentCode', 50),
+    'joining_year': ('joiningYear', 10),
+    'section': ('section', 20),
+}
+
+INDEXES = {
+    'ix_students_student_name': '(student_name)',
+    'ix_students_program': '(program)',
+    'ix_students_pcode': '(pcode)',
+    'ix_students_department_code': '(department_code)',
+    'ix_students_joining_year': '(joining_year)',
+    'ix_students_dept_year_section': '(department_code, joining_year, section)',
+    'ix_students_updated_at': '(updated_at)',
+}
+
+
+def column_exists(cursor, column):
+    cursor.execute("""
+        SELECT COUNT(*)
+        FROM information_schema.COLUMNS
+        WHERE TABLE_SCHEMA = DATABASE()
+        AND TABLE_NAME = 'students'
+        AND COLUMN_NAME = %s
+    """, (column,))
+    return cursor.fetchone()[0] > 0
+
+
+def index_exists(cursor, index):
+    cursor.execute("""
+        SELECT COUNT(*)
+        FROM information_schema.STATISTICS
+        WHERE TABLE_SCHEMA = DATABASE()
+        AND TABLE_NAME = 'students'
+        AND INDEX_NAME = %s
+    """, (index,))
+    return cursor.fetchone()[0] > 0
+
+
+def column_values(profile):
+    values = []
+    for key, length in PROFILE_COLUMNS.values():
+        value = profile.get(key)
+        value = str(value).strip()[:length] if value not in (None, '') else None
+        values.append(value or None)
+    return values
+
+
+def backfill(conn, cursor):
+    """Copy profile fields into the new columns, BACKFILL_CHUNK rows per transaction"""
+    assignments = ', '.join(f"{column} = %s" for column in PROFILE_COLUMNS)
+    last_id = 0
+    total = 0
+    while True:
+        cursor.execute(
+            'SELECT id, profile FROM students WHERE id > %s ORDER BY id LIMIT %s',
+            (last_id, BACKFILL_CHUNK)
+        )
+        rows = cursor.fetchall()
+        if not rows:
+            break
+        params = []
+        for row_id, profile in rows:
+            try:
+                data = json.loads(profile) if isinstance(profile, (str, bytes, bytearray)) else (profile or {})
+            except ValueError:
+                data = {}
+            params.append(column_values(data if isinstance(data, dict) else {}) + [row_id])
+        # updated_at is left as is so the backfill does not look like a profile edit
+        cursor.executemany(
+            f'UPDATE students SET {assignments} WHERE id = %s',
+            params
+        )
+        conn.commit()
+        last_id = rows[-1][0]
+        total += len(rows)
+        print(f"  Progress: {total} students backfilled...")
+    return total
+
+
+def run_migration():
+    """Run the migration"""
+    try:
+        print(f"🔄 Connecting to database: {db_name} on {db_host}:{db_port}")
+        conn = mysql.connector.connect(
+            user=db_user,
+            password=db_password,
+            host=db_host,
+            port=db_port,
+            database=db_name
+        )
+        cursor = conn.cursor()
+
+        print("📝 Running migration: Adding profile columns to students...")
+
+        missing = [c for c in PROFILE_COLUMNS if not column_exists(cursor, c)]
+        if missing:
+            print(f"  Adding columns: {', '.join(missing)}")
+            cursor.execute('ALTER TABLE students ' + ', '.join(
+                f'ADD COLUMN {c} VARCHAR({PROFILE_COLUMNS[c][1]})' for c in missing
+            ))
+        else:
+            print("  ✓ Columns already exist, skipping...")
+
+        print("  Backfilling from profile JSON...")
+        total = backfill(conn, cursor)
+
+        for index, columns in INDEXES.items():
+            if not index_exists(cursor, index):
+                print(f"  Creating index {index}...")
+                cursor.execute(f'CREATE INDEX {index} ON students {columns}')
+
+        # Create migration log table if it doesn't exist
+        cursor.execute("""
+            CREATE TABLE IF NOT EXISTS migration_log (
+                id INT AUTO_INCREMENT PRIMARY KEY,
+                migration_name VARCHAR(255) UNIQUE,
+                executed_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+            );
+        """)
+
+        # Log the migration using ON DUPLICATE KEY UPDATE
+        cursor.execute("""
+        INSERT INTO migration_log (migration_name, executed_at)
+        VALUES ('006_add_student_profile_columns', NOW())
+        ON DUPLICATE KEY UPDATE executed_at=NOW();
+        """)
+        conn.commit()
+
+        print("✅ Migration completed successfully!")
+        print(f"   - Backfilled: {total} students")
+        print(f"   - Indexes: {', '.join(INDEXES)}")
+
+        cursor.close()
+        conn.close()
+
+    except MySQLError as e:
+        print(f"❌ Migration failed: {e}")
+        sys.exit(1)
+
+if __name__ == '__main__':
+    run_migration()
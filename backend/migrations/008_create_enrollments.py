@@ -0,0 +1,192 @@
+#!/usr/bin/env python3
+"""
+Migration Script: Create the enrollments read model
+Creates the enrollments table (one row per course registration or legacy
+registration, with a normalized state) and backfills it from both tables in
+chunks. New writes keep it in sync through mapper events in app.py.
+"""
+
+import os
+import sys
+import json
+from datetime import datetime
+from dotenv import load_dotenv
+import mysql.connector
+from mysql.connector import Error as MySQLError
+
+load_dotenv()
+
+# Database configuration
+db_user = os.getenv('DB_USER', 'root')
+db_password = os.getenv('DB_PASSWORD', '1234')
+db_host = os.getenv('DB_HOST', 'localhost')
+db_port = int(os.getenv('DB_PORT', '3306'))
+db_name = os.getenv('DB_NAME', 'school_db')
+
+BACKFILL_CHUNK = int(os.getenv('MIGRATION_CHUNK_SIZE', '1000'))
+
+# Mirrors ENROLLMENT_STATES in app.py
+ENROLLMENT_STATES = {
+    'course': {
+        'Accepted': 'accepted', 'hod_approved': 'accepted',
+        'Pending Coordinator': 'pending', 'coordinator_approved': 'pending', 'Pending HOD': 'pending',
+        'Rejected': 'rejected',
+    },
+    'legacy': {
+        'Accepted': 'accepted', 'hod_approved': 'accepted',
+        'pending': 'pending', 'coordinator_approved': 'pending',
+        'rejected': 'rejected',
+    },
+}
+
+ENROLLMENT_COLUMNS = [
+    'source', 'source_id', 'admission_id', 'student_name', 'student_email', 'department',
+    'course', 'activity', 'activity_name', 'activity_category', 'sub_activity_id',
+    'status', 'state', 'year', 'phone', 'accepted_at', 'updated_at'
+]
+
+# source -> SELECT returning rows in the column order used by enrollment_row()
+SOURCES = {
+    'course': """
+        SELECT id, admission_id, student_name, department, course, activity_name,
+               activity_category, sub_activity_id, status, data, last_updated
+        FROM course_registrations WHERE id > %s ORDER BY id LIMIT %s
+    """,
+    'legacy': """
+        SELECT id, admission_id, student_name, department, student_email, activity_name,
+               NULL, sub_activity_id, status, data, updated_at
+        FROM registrations WHERE id > %s ORDER BY id LIMIT %s
+    """,
+}
+
+
+def clip(value, length):
+    return str(value)[:length] if value not in (None, '') else None
+
+
+def enrollment_row(source, row):
+    """Enrollment values for one source row; mirrors enrollment_values() in app.py"""
+    row_id, admission_id, name, department, extra, activity_name, category, sub_id, status, data, stamp = row
+    try:
+        data = json.loads(data) if isinstance(data, (str, bytes, bytearray)) else (data or {})
+    except ValueError:
+        data = {}
+    if not isinstance(data, dict):
+        data = {}
+    if source == 'course':
+        email, course = clip(data.get('email'), 255), extra
+        activity = category or activity_name
+    else:
+        email, course = extra, clip(data.get('course'), 255)
+        activity = activity_name
+    state = ENROLLMENT_STATES[source].get(status, 'other')
+    return (
+        source, row_id, admission_id, name, email, department, course, activity,
+        activity_name, category, sub_id, status, state,
+        clip(data.get('year'), 20), clip(data.get('phone'), 20),
+        (stamp or datetime.utcnow()) if state == 'accepted' else None,
+        datetime.utcnow()
+    )
+
+
+def backfill(conn, cursor, source):
+    """Copy one source table into enrollments, BACKFILL_CHUNK rows per transaction"""
+    placeholders = ', '.join(['%s'] * len(ENROLLMENT_COLUMNS))
+    updates = ', '.join(f"{c} = VALUES({c})" for c in ENROLLMENT_COLUMNS[2:])
+    insert = (
+        f"INSERT INTO enrollments ({', '.join(ENROLLMENT_COLUMNS)}) VALUES ({placeholders}) "
+        f"ON DUPLICATE KEY UPDATE {updates}"
+    )
+    last_id = 0
+    total = 0
+    while True:
+        cursor.execute(SOURCES[source], (last_id, BACKFILL_CHUNK))
+        rows = cursor.fetchall()
+        if not rows:
+            break
+        cursor.executemany(insert, [enrollment_row(source, row) for row in rows])
+        conn.commit()
+        last_id = rows[-1][0]
+        total += len(rows)
+        print(f"  Progress: {total} {source} registrations backfilled...")
+    return total
+
+
+def run_migration():
+    """Run the migration"""
+    try:
+        print(f"🔄 Connecting to database: {db_name} on {db_host}:{db_port}")
+        conn = mysql.connector.connect(
+            user=db_user,
+            password=db_password,
+            host=db_host,
+            port=db_port,
+            database=db_name
+        )
+        cursor = conn.cursor()
+
+        print("📝 Running migration: Creating enrollments table...")
+
+        cursor.execute("""
+            CREATE TABLE IF NOT EXISTS enrollments (
+                id INT AUTO_INCREMENT PRIMARY KEY,
+                source VARCHAR(20) NOT NULL,
+                source_id INT NOT NULL,
+                admission_id VARCHAR(255),
+                student_name VARCHAR(255),
+                student_email VARCHAR(255),
+                department VARCHAR(255),
+                course VARCHAR(255),
+                activity VARCHAR(255),
+                activity_name VARCHAR(255),
+                activity_category VARCHAR(255),
+                sub_activity_id INT,
+                status VARCHAR(100),
+                state VARCHAR(20) NOT NULL DEFAULT 'other',
+                year VARCHAR(20),
+                phone VARCHAR(20),
+                accepted_at DATETIME,
+                updated_at DATETIME,
+                UNIQUE KEY uq_enrollments_source (source, source_id),
+                INDEX ix_enrollments_admission_id (admission_id),
+                INDEX ix_enrollments_state_activity (state, activity),
+                INDEX ix_enrollments_state_department (state, department),
+                INDEX ix_enrollments_state_sub_activity (state, sub_activity_id)
+            );
+        """)
+
+        print("  Backfilling from course_registrations...")
+        course_total = backfill(conn, cursor, 'course')
+        print("  Backfilling from registrations...")
+        legacy_total = backfill(conn, cursor, 'legacy')
+
+        # Create migration log table if it doesn't exist
+        cursor.execute("""
+            CREATE TABLE IF NOT EXISTS migration_log (
+                id INT AUTO_INCREMENT PRIMARY KEY,
+                migration_name VARCHAR(255) UNIQUE,
+                executed_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+            );
+        """)
+
+        # Log the migration using ON DUPLICATE KEY UPDATE
+        cursor.execute("""
+        INSERT INTO migration_log (migration_name, executed_at)
+        VALUES ('008_create_enrollments', NOW())
+        ON DUPLICATE KEY UPDATE executed_at=NOW();
+        """)
+        conn.commit()
+
+        print("✅ Migration completed successfully!")
+        print(f"   - Course registrations: {course_total}")
+        print(f"   - Legacy registrations: {legacy_total}")
+
+        cursor.close()
+        conn.close()
+
+    except MySQLError as e:
+        print(f"❌ Migration failed: {e}")
+        sys.exit(1)
+
+if __name__ == '__main__':
+    run_migration()
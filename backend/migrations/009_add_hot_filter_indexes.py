@@ -0,0 +1,201 @@
+#!/usr/bin/env python3
+"""
+Migration Script: Composite indexes for course registration, event and attendance filters
+Adds indexes matching the filters and sort orders used by the list, approval
+and attendance endpoints, then runs EXPLAIN on those queries and fails if any
+of them still has to scan a whole table.
+
+    python migrations/009_add_hot_filter_indexes.py           # create indexes + check
+    python migrations/009_add_hot_filter_indexes.py --check   # only run the EXPLAIN check
+"""
+
+import os
+import sys
+from dotenv import load_dotenv
+import mysql.connector
+from mysql.connector import Error as MySQLError
+
+load_dotenv()
+
+# Database configuration
+db_user = os.getenv('DB_USER', 'root')
+db_password = os.getenv('DB_PASSWORD', '1234')
+db_host = os.getenv('DB_HOST', 'localhost')
+db_port = int(os.getenv('DB_PORT', '3306'))
+db_name = os.getenv('DB_NAME', 'school_db')
+
+# table -> {index name: columns}; mirrors __table_args__ on the models in app.py
+INDEXES = {
+    'course_registrations': {
+        'ix_course_registrations_created': '(created_at, id)',
+        'ix_course_registrations_status_created': '(status, created_at, id)',
+        'ix_course_registrations_category_status': '(activity_category, status)',
+        'ix_course_registrations_activity_status': '(activity_name, status)',
+        'ix_course_registrations_sub_activity_status': '(sub_activity_id, status)',
+        'ix_course_registrations_department_status': '(department, status)',
+        'ix_course_registrations_course': '(course)',
+        'ix_course_registrations_admission_created': '(admission_id, created_at)',
+    },
+    'events': {
+        'ix_events_date': '(event_date, id)',
+        'ix_events_activity_date': '(activity_name, event_date, id)',
+        'ix_events_coordinator_date': '(coordinator_email, event_date, id)',
+        'ix_events_sub_activity_date': '(sub_activity_id, event_date, id)',
+        'ix_events_status_activity_created': '(event_status, activity_name, created_at)',
+    },
+    'attendance': {
+        'ix_attendance_activity_date_approval': '(activity_name, attendance_date, approval_status)',
+        'ix_attendance_approval_activity_created': '(approval_status, activity_name, created_at)',
+        'ix_attendance_student_approval_date': '(student_admission_id, approval_status, attendance_date)',
+        'ix_attendance_sub_activity_date': '(sub_activity_id, attendance_date, id)',
+        'ix_attendance_batch_approval': '(batch_id, approval_status)',
+    },
+}
+
+# Hot query shapes from app.py (endpoint -> SQL, sample parameters)
+HOT_QUERIES = [
+    ('GET /api/course-registrations (list)',
+     'SELECT * FROM course_registrations ORDER BY created_at DESC, id DESC LIMIT 101', ()),
+    ('GET /api/course-registrations?status=',
+     'SELECT * FROM course_registrations WHERE status = %s ORDER BY created_at DESC, id DESC LIMIT 101',
+     ('Pending HOD',)),
+    ('GET /api/course-registrations?activity=',
+     'SELECT * FROM course_registrations WHERE activity_name = %s OR activity_category = %s '
+     'ORDER BY created_at DESC, id DESC LIMIT 101', ('NCC', 'NCC')),
+    ('GET /api/course-registrations?department=',
+     'SELECT * FROM course_registrations WHERE department = %s ORDER BY created_at DESC, id DESC LIMIT 101',
+     ('Computer Science',)),
+    ('GET /api/course-registrations?course=',
+     'SELECT * FROM course_registrations WHERE course = %s ORDER BY created_at DESC, id DESC LIMIT 101',
+     ('BSc',)),
+    ('GET /api/student/<id>/application-status',
+     'SELECT * FROM course_registrations WHERE admission_id = %s ORDER BY created_at DESC', ('241101P',)),
+    ('GET /api/coordinator/sub-activity/<id>/students',
+     "SELECT * FROM course_registrations WHERE sub_activity_id = %s AND status IN ('Accepted', 'hod_approved')",
+     (1,)),
+    ('GET /api/events?activity=',
+     'SELECT * FROM events WHERE activity_name = %s ORDER BY event_date DESC, id DESC LIMIT 101', ('NCC',)),
+    ('GET /api/events?coordinatorEmail=',
+     'SELECT * FROM events WHERE coordinator_email = %s ORDER BY event_date DESC, id DESC LIMIT 101',
+     ('coordinator@example.com',)),
+    ('GET /api/events?subActivityId=',
+     'SELECT * FROM events WHERE sub_activity_id = %s ORDER BY event_date DESC, id DESC LIMIT 101', (1,)),
+    ('GET /api/events/pending-approval',
+     "SELECT * FROM events WHERE event_status = 'pending_approval' AND activity_name = %s ORDER BY created_at DESC",
+     ('NCC',)),
+    ('GET /api/attendance?activity=',
+     'SELECT * FROM attendance WHERE activity_name = %s ORDER BY attendance_date DESC, id DESC LIMIT 101',
+     ('NCC',)),
+    ('GET /api/attendance?subActivityId=',
+     'SELECT * FROM attendance WHERE sub_activity_id = %s ORDER BY attendance_date DESC, id DESC LIMIT 101',
+     (1,)),
+    ('Attendance status for activity/date',
+     "SELECT * FROM attendance WHERE activity_name = %s AND attendance_date = %s AND approval_status = 'approved'",
+     ('NCC', '2025-01-01')),
+    ('GET /api/attendance/pending',
+     "SELECT * FROM attendance WHERE approval_status = 'pending' AND activity_name = %s ORDER BY created_at DESC",
+     ('NCC',)),
+    ('GET /api/attendance/student/<id>',
+     "SELECT * FROM attendance WHERE student_admission_id = %s AND approval_status = 'approved' "
+     "ORDER BY attendance_date DESC", ('241101P',)),
+    ('POST /api/attendance/approve',
+     "SELECT * FROM attendance WHERE batch_id = %s AND approval_status = 'pending'", ('BATCH-1',)),
+]
+
+
+def index_exists(cursor, table, index):
+    cursor.execute("""
+        SELECT COUNT(*)
+        FROM information_schema.STATISTICS
+        WHERE TABLE_SCHEMA = DATABASE()
+        AND TABLE_NAME = %s
+        AND INDEX_NAME = %s
+    """, (table, index))
+    return cursor.fetchone()[0] > 0
+
+
+def check_plans(cursor):
+    """EXPLAIN every hot query. A query fails when a table is read with a full
+    scan and no index is even applicable; on tiny tables MySQL may still prefer
+    a scan over a usable index, which is only reported."""
+    for table in INDEXES:
+        cursor.execute(f'ANALYZE TABLE {table}')
+        cursor.fetchall()
+
+    failures = 0
+    for name, sql, params in HOT_QUERIES:
+        cursor.execute('EXPLAIN ' + sql, params)
+        columns = [d[0] for d in cursor.description]
+        plan = [dict(zip(columns, row)) for row in cursor.fetchall()]
+        scans = [step for step in plan if step.get('type') == 'ALL']
+        if not scans:
+            keys = ', '.join(str(step.get('key')) for step in plan)
+            print(f"  ✓ {name}: {keys}")
+        elif any(not step.get('possible_keys') for step in scans):
+            failures += 1
+            print(f"  ❌ {name}: full scan of {', '.join(step['table'] for step in scans)}, no usable index")
+        else:
+            print(f"  ⚠ {name}: optimizer chose a scan over {scans[0]['possible_keys']} "
+                  f"(~{scans[0].get('rows')} rows, table is small)")
+    return failures
+
+
+def run_migration(check_only=False):
+    """Run the migration"""
+    try:
+        print(f"🔄 Connecting to database: {db_name} on {db_host}:{db_port}")
+        conn = mysql.connector.connect(
+            user=db_user,
+            password=db_password,
+            host=db_host,
+            port=db_port,
+            database=db_name
+        )
+        cursor = conn.cursor()
+
+        if not check_only:
+            print("📝 Running migration: Adding composite indexes for hot filters...")
+
+            for table, indexes in INDEXES.items():
+                for index, columns in indexes.items():
+                    if index_exists(cursor, table, index):
+                        print(f"  ✓ {index} already exists, skipping...")
+                        continue
+                    print(f"  Creating index {index} on {table}...")
+                    cursor.execute(f'CREATE INDEX {index} ON {table} {columns}')
+
+            # Create migration log table if it doesn't exist
+            cursor.execute("""
+                CREATE TABLE IF NOT EXISTS migration_log (
+                    id INT AUTO_INCREMENT PRIMARY KEY,
+                    migration_name VARCHAR(255) UNIQUE,
+                    executed_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+                );
+            """)
+
+            # Log the migration using ON DUPLICATE KEY UPDATE
+            cursor.execute("""
+            INSERT INTO migration_log (migration_name, executed_at)
+            VALUES ('009_add_hot_filter_indexes', NOW())
+            ON DUPLICATE KEY UPDATE executed_at=NOW();
+            """)
+            conn.commit()
+            print("✅ Indexes created")
+
+        print("🔍 Checking query plans...")
+        failures = check_plans(cursor)
+
+        cursor.close()
+        conn.close()
+
+        if failures:
+            print(f"❌ {failures} hot queries still do a full table scan")
+            sys.exit(1)
+        print("✅ Migration completed successfully!" if not check_only else "✅ All hot queries use an index")
+
+    except MySQLError as e:
+        print(f"❌ Migration failed: {e}")
+        sys.exit(1)
+
+if __name__ == '__main__':
+    run_migration(check_only='--check' in sys.argv[1:])
@@ -0,0 +1,172 @@
+#!/usr/bin/env python3
+"""
+Migration Script: Promote registration roster fields to indexed columns
+Adds branch, year and section to registrations and course_registrations,
+backfills them from the data JSON in chunks and indexes them for the
+coordinator roster filters. New writes keep them in sync through the models.
+"""
+
+import os
+import sys
+import json
+from dotenv import load_dotenv
+import mysql.connector
+from mysql.connector import Error as MySQLError
+
+load_dotenv()
+
+# Database configuration
+db_user = os.getenv('DB_USER', 'root')
+db_password = os.getenv('DB_PASSWORD', '1234')
+db_host = os.getenv('DB_HOST', 'localhost')
+db_port = int(os.getenv('DB_PORT', '3306'))
+db_name = os.getenv('DB_NAME', 'school_db')
+
+BACKFILL_CHUNK = int(os.getenv('MIGRATION_CHUNK_SIZE', '1000'))
+
+# Column -> (data key, max length); mirrors REGISTRATION_ROSTER_COLUMNS in app.py
+ROSTER_COLUMNS = {
+    'branch': ('branch', 255),
+    'year': ('year', 20),
+    'section': ('section', 20),
+}
+
+INDEXES = {
+    'registrations': {
+        'ix_registrations_status_roster': '(status, year, branch, section)',
+        'ix_registrations_sub_activity_roster': '(sub_activity_id, year, branch, section)',
+    },
+    'course_registrations': {
+        'ix_course_registrations_branch_status': '(branch, status)',
+        'ix_course_registrations_sub_activity_roster': '(sub_activity_id, year, branch, section)',
+    },
+}
+
+
+def column_exists(cursor, table, column):
+    cursor.execute("""
+        SELECT COUNT(*)
+        FROM information_schema.COLUMNS
+        WHERE TABLE_SCHEMA = DATABASE()
+        AND TABLE_NAME = %s
+        AND COLUMN_NAME = %s
+    """, (table, column))
+    return cursor.fetchone()[0] > 0
+
+
+def index_exists(cursor, table, index):
+    cursor.execute("""
+        SELECT COUNT(*)
+        FROM information_schema.STATISTICS
+        WHERE TABLE_SCHEMA = DATABASE()
+        AND TABLE_NAME = %s
+        AND INDEX_NAME = %s
+    """, (table, index))
+    return cursor.fetchone()[0] > 0
+
+
+def column_values(data):
+    values = []
+    for key, length in ROSTER_COLUMNS.values():
+        value = data.get(key)
+        value = str(value).strip()[:length] if value not in (None, '') else None
+        values.append(value or None)
+    return values
+
+
+def backfill(conn, cursor, table):
+    """Copy data fields into the new columns, BACKFILL_CHUNK rows per transaction"""
+    assignments = ', '.join(f"{column} = %s" for column in ROSTER_COLUMNS)
+    last_id = 0
+    total = 0
+    while True:
+        cursor.execute(
+            f'SELECT id, data FROM {table} WHERE id > %s ORDER BY id LIMIT %s',
+            (last_id, BACKFILL_CHUNK)
+        )
+        rows = cursor.fetchall()
+        if not rows:
+            break
+        params = []
+        for row_id, raw in rows:
+            try:
+                data = json.loads(raw) if isinstance(raw, (str, bytes, bytearray)) else (raw or {})
+            except ValueError:
+                data = {}
+            params.append(column_values(data if isinstance(data, dict) else {}) + [row_id])
+        # updated_at / last_updated are left as is so the backfill does not look like an edit
+        cursor.executemany(
+            f'UPDATE {table} SET {assignments} WHERE id = %s',
+            params
+        )
+        conn.commit()
+        last_id = rows[-1][0]
+        total += len(rows)
+        print(f"  Progress: {total} {table} rows backfilled...")
+    return total
+
+
+def run_migration():
+    """Run the migration"""
+    try:
+        print(f"🔄 Connecting to database: {db_name} on {db_host}:{db_port}")
+        conn = mysql.connector.connect(
+            user=db_user,
+            password=db_password,
+            host=db_host,
+            port=db_port,
+            database=db_name
+        )
+        cursor = conn.cursor()
+
+        print("📝 Running migration: Adding roster columns to registrations...")
+
+        totals = {}
+        for table, indexes in INDEXES.items():
+            missing = [c for c in ROSTER_COLUMNS if not column_exists(cursor, table, c)]
+            if missing:
+                print(f"  Adding columns to {table}: {', '.join(missing)}")
+                cursor.execute(f'ALTER TABLE {table} ' + ', '.join(
+                    f'ADD COLUMN {c} VARCHAR({ROSTER_COLUMNS[c][1]})' for c in missing
+                ))
+            else:
+                print(f"  ✓ Columns already exist on {table}, skipping...")
+
+            print(f"  Backfilling {table} from data JSON...")
+            totals[table] = backfill(conn, cursor, table)
+
+            for index, columns in indexes.items():
+                if not index_exists(cursor, table, index):
+                    print(f"  Creating index {index}...")
+                    cursor.execute(f'CREATE INDEX {index} ON {table} {columns}')
+
+        # Create migration log table if it doesn't exist
+        cursor.execute("""
+            CREATE TABLE IF NOT EXISTS migration_log (
+                id INT AUTO_INCREMENT PRIMARY KEY,
+                migration_name VARCHAR(255) UNIQUE,
+                executed_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+            );
+        """)
+
+        # Log the migration using ON DUPLICATE KEY UPDATE
+        cursor.execute("""
+        INSERT INTO migration_log (migration_name, executed_at)
+        VALUES ('010_add_registration_roster_columns', NOW())
+        ON DUPLICATE KEY UPDATE executed_at=NOW();
+        """)
+        conn.commit()
+
+        print("✅ Migration completed successfully!")
+        for table, total in totals.items():
+            print(f"   - Backfilled: {total} {table}")
+
+        cursor.close()
+        conn.close()
+
+    except MySQLError as e:
+        print(f"❌ Migration failed: {e}")
+        sys.exit(1)
+
+if __name__ == '__main__':
+    run_migration()
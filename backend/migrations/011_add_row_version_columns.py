@@ -0,0 +1,90 @@
+#!/usr/bin/env python3
+"""
+Migration Script: Add row_version counters for conditional GET
+Adds an integer row_version column (bumped by the app on every update) to the
+tables whose detail endpoints answer 304s: users, students, sub_activities,
+course_registrations and events. Existing rows start at 0.
+"""
+
+import os
+import sys
+from dotenv import load_dotenv
+import mysql.connector
+from mysql.connector import Error as MySQLError
+
+load_dotenv()
+
+# Database configuration
+db_user = os.getenv('DB_USER', 'root')
+db_password = os.getenv('DB_PASSWORD', '1234')
+db_host = os.getenv('DB_HOST', 'localhost')
+db_port = int(os.getenv('DB_PORT', '3306'))
+db_name = os.getenv('DB_NAME', 'school_db')
+
+TABLES = ['users', 'students', 'sub_activities', 'course_registrations', 'events']
+
+
+def column_exists(cursor, table, column):
+    cursor.execute("""
+        SELECT COUNT(*)
+        FROM information_schema.COLUMNS
+        WHERE TABLE_SCHEMA = DATABASE()
+        AND TABLE_NAME = %s
+        AND COLUMN_NAME = %s
+    """, (table, column))
+    return cursor.fetchone()[0] > 0
+
+
+def run_migration():
+    """Run the migration"""
+    try:
+        print(f"🔄 Connecting to database: {db_name} on {db_host}:{db_port}")
+        conn = mysql.connector.connect(
+            user=db_user,
+            password=db_password,
+            host=db_host,
+            port=db_port,
+            database=db_name
+        )
+        cursor = conn.cursor()
+
+        print("📝 Running migration: Adding row_version columns...")
+
+        added = []
+        for table in TABLES:
+            if column_exists(cursor, table, 'row_version'):
+                print(f"  ✓ row_version already exists on {table}, skipping...")
+                continue
+            print(f"  Adding row_version to {table}...")
+            cursor.execute(f'ALTER TABLE {table} ADD COLUMN row_version INT NOT NULL DEFAULT 0')
+            added.append(table)
+
+        # Create migration log table if it doesn't exist
+        cursor.execute("""
+            CREATE TABLE IF NOT EXISTS migration_log (
+                id INT AUTO_INCREMENT PRIMARY KEY,
+                migration_name VARCHAR(255) UNIQUE,
+                executed_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+            );
+        """)
+
+        # Log the migration using ON DUPLICATE KEY UPDATE
+        cursor.execute("""
+        INSERT INTO migration_log (migration_name, executed_at)
+        VALUES ('011_add_row_version_columns', NOW())
+        ON DUPLICATE KEY UPDATE executed_at=NOW();
+        """)
+        conn.commit()
+
+        print("✅ Migration completed successfully!")
+        print(f"   - Columns added: {', '.join(added) if added else 'none'}")
+
+        cursor.close()
+        conn.close()
+
+    except MySQLError as e:
+        print(f"❌ Migration failed: {e}")
+        sys.exit(1)
+
+if __name__ == '__main__':
+    run_migration()
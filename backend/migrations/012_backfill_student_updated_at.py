@@ -0,0 +1,88 @@
+#!/usr/bin/env python3
+"""
+Migration Script: Backfill students.updated_at
+Rows written by the older import scripts have no updated_at. The roll number
+index re-reads such rows on every incremental refresh, so this stamps them
+with their created_at (or the current time) in chunks.
+"""
+
+import os
+import sys
+from dotenv import load_dotenv
+import mysql.connector
+from mysql.connector import Error as MySQLError
+
+load_dotenv()
+
+# Database configuration
+db_user = os.getenv('DB_USER', 'root')
+db_password = os.getenv('DB_PASSWORD', '1234')
+db_host = os.getenv('DB_HOST', 'localhost')
+db_port = int(os.getenv('DB_PORT', '3306'))
+db_name = os.getenv('DB_NAME', 'school_db')
+
+BACKFILL_CHUNK = int(os.getenv('MIGRATION_CHUNK_SIZE', '1000'))
+
+
+def backfill(conn, cursor):
+    """Stamp NULL updated_at values, BACKFILL_CHUNK rows per transaction"""
+    total = 0
+    while True:
+        cursor.execute(
+            'UPDATE students SET updated_at = COALESCE(created_at, UTC_TIMESTAMP()) '
+            'WHERE updated_at IS NULL LIMIT %s',
+            (BACKFILL_CHUNK,)
+        )
+        conn.commit()
+        if cursor.rowcount <= 0:
+            break
+        total += cursor.rowcount
+        print(f"  Progress: {total} students stamped...")
+    return total
+
+
+def run_migration():
+    """Run the migration"""
+    try:
+        print(f"🔄 Connecting to database: {db_name} on {db_host}:{db_port}")
+        conn = mysql.connector.connect(
+            user=db_user,
+            password=db_password,
+            host=db_host,
+            port=db_port,
+            database=db_name
+        )
+        cursor = conn.cursor()
+
+        print("📝 Running migration: Backfilling students.updated_at...")
+        total = backfill(conn, cursor)
+
+        # Create migration log table if it doesn't exist
+        cursor.execute("""
+            CREATE TABLE IF NOT EXISTS migration_log (
+                id INT AUTO_INCREMENT PRIMARY KEY,
+                migration_name VARCHAR(255) UNIQUE,
+                executed_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+            );
+        """)
+
+        # Log the migration using ON DUPLICATE KEY UPDATE
+        cursor.execute("""
+        INSERT INTO migration_log (migration_name, executed_at)
+        VALUES ('012_backfill_student_updated_at', NOW())
+        ON DUPLICATE KEY UPDATE executed_at=NOW();
+        """)
+        conn.commit()
+
+        print("✅ Migration completed successfully!")
+        print(f"   - Students stamped: {total}")
+
+        cursor.close()
+        conn.close()
+
+    except MySQLError as e:
+        print(f"❌ Migration failed: {e}")
+        sys.exit(1)
+
+if __name__ == '__main__':
+    run_migration()
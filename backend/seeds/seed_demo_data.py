@@ -145,6 +145,21 @@ try:
                         'approved',
                         'approved'
                     ))
+                    # Raw inserts bypass the app's mapper events, so write the enrollments row too
+                    cursor.execute('''
+                        INSERT INTO enrollments
+                        (source, source_id, admission_id, student_name, student_email, department,
+                         activity, activity_name, status, state, accepted_at, updated_at)
+                        VALUES ('legacy', %s, %s, %s, %s, %s, %s, %s, 'hod_approved', 'accepted', NOW(), NOW())
+                    ''', (
+                        cursor.lastrowid,
+                        admission_id,
+                        f'Student {admission_id}',
+                        f'student-{admission_id}@gmail.com',
+                        None,
+                        activity_name,
+                        activity_name
+                    ))
                     registrations_created += 1
                 except Exception as e:
                     pass  # Silently skip duplicates
@@ -0,0 +1,113 @@
+#!/usr/bin/env python3
+"""
+Slot reservation stress benchmark
+Creates a throwaway sub-activity with a small number of slots plus more
+pending registrations than slots, then approves all of them concurrently
+through the real approval endpoint. Verifies the sub-activity is never
+oversubscribed and reports approvals per second.
+
+Run from the backend directory against a scratch database:
+    python utils/benchmark_slot_reservation.py --slots 50 --requests 200 --workers 16
+"""
+
+import os
+import sys
+import time
+import argparse
+from concurrent.futures import ThreadPoolExecutor
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app import app, db, SubActivity, CourseRegistration, Enrollment, slot_metrics
+
+
+def setup(slots, requests_count):
+    """Create the benchmark sub-activity and its pending registrations"""
+    tag = f"BENCH-{int(time.time())}"
+    sub = SubActivity(
+        activity_name='BENCHMARK',
+        sub_activity_name=tag,
+        total_slots=slots,
+        filled_slots=0,
+        is_active=True
+    )
+    db.session.add(sub)
+    db.session.flush()
+    regs = [
+        CourseRegistration(
+            student_name=f'Benchmark Student {i}',
+            admission_id=f'{tag}-{i}',
+            activity_name='BENCHMARK',
+            sub_activity_id=sub.id,
+            status='Pending HOD',
+            data={}
+        )
+        for i in range(requests_count)
+    ]
+    db.session.add_all(regs)
+    db.session.commit()
+    return sub.id, [r.id for r in regs]
+
+
+def cleanup(sub_id):
+    # Bulk deletes skip the mapper events, so clear the read model rows too
+    Enrollment.query.filter_by(source='course', sub_activity_id=sub_id).delete()
+    CourseRegistration.query.filter_by(sub_activity_id=sub_id).delete()
+    SubActivity.query.filter_by(id=sub_id).delete()
+    db.session.commit()
+
+
+def approve(client, reg_id):
+    started = time.perf_counter()
+    response = client.post(
+        f'/api/course-registrations/{reg_id}/approve',
+        json={'action': 'approve', 'approverType': 'hod', 'approverEmail': 'benchmark@local'}
+    )
+    return response.status_code, (time.perf_counter() - started) * 1000
+
+
+def run_benchmark(slots, requests_count, workers, keep):
+    with app.app_context():
+        sub_id, reg_ids = setup(slots, requests_count)
+    print(f"[BENCH] Sub-activity {sub_id}: {slots} slots, {requests_count} approvals, {workers} workers")
+
+    client = app.test_client()
+    before = slot_metrics()
+    started = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        results = list(pool.map(lambda reg_id: approve(client, reg_id), reg_ids))
+    elapsed = time.perf_counter() - started
+    after = slot_metrics()
+
+    accepted = sum(1 for code, _ in results if code == 200)
+    full = sum(1 for code, _ in results if code == 409)
+    failed = len(results) - accepted - full
+    latencies = sorted(ms for _, ms in results)
+
+    with app.app_context():
+        sub = SubActivity.query.get(sub_id)
+        filled, active = sub.filled_slots, sub.is_active
+        accepted_rows = CourseRegistration.query.filter_by(sub_activity_id=sub_id, status='Accepted').count()
+        if not keep:
+            cleanup(sub_id)
+
+    print(f"[BENCH] Accepted: {accepted}, full (409): {full}, errors: {failed}")
+    print(f"[BENCH] filled_slots={filled}/{slots}, is_active={active}, accepted rows={accepted_rows}")
+    print(f"[BENCH] Deadlock retries: {after['retries'] - before['retries']}")
+    print(f"[BENCH] {len(results) / elapsed:.1f} approvals/s over {elapsed:.2f}s "
+          f"(p50 {latencies[len(latencies) // 2]:.1f}ms, p99 {latencies[int(len(latencies) * 0.99) - 1]:.1f}ms)")
+
+    expected = min(slots, requests_count)
+    ok = filled == accepted == accepted_rows == expected and failed == 0 and active == (expected < slots)
+    print("✅ No oversubscription" if ok else "❌ Slot accounting mismatch")
+    return ok
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Concurrent slot reservation benchmark')
+    parser.add_argument('--slots', type=int, default=50)
+    parser.add_argument('--requests', type=int, default=200)
+    parser.add_argument('--workers', type=int, default=16)
+    parser.add_argument('--keep', action='store_true', help='keep the benchmark rows for inspection')
+    args = parser.parse_args()
+    sys.exit(0 if run_benchmark(args.slots, args.requests, args.workers, args.keep) else 1)
@@ -0,0 +1,41 @@
+#!/usr/bin/env python3
+"""
+Static catalog export
+Writes the public activity, sub-activity, department and event calendar
+catalogs as content-hashed, gzip-precompressed JSON files plus manifest.json,
+for the static server or a CDN to serve guest pages without the API.
+Use it from a deploy step or cron; the running server re-exports on its own
+when CATALOG_EXPORT=on.
+
+Run from the backend directory:
+    python utils/export_static_catalog.py
+    python utils/export_static_catalog.py --dir /srv/cdn/catalog --url https://cdn.example.com/catalog
+"""
+
+import os
+import sys
+import argparse
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app import app, StaticCatalogExporter, CATALOG_EXPORT_DIR, CATALOG_EXPORT_URL, CATALOG_EXPORT_MAX_AGE
+
+
+def run_export(directory, url_prefix, max_age):
+    exporter = StaticCatalogExporter(directory, url_prefix.rstrip('/'), max_age)
+    with app.app_context():
+        manifest = exporter.export()
+    print(f"✅ Catalog version {manifest['version']} written to {directory}")
+    for name, entry in manifest['files'].items():
+        print(f"   - {name}: {entry['count']} items, {entry['bytes']} bytes -> {entry['url']}")
+    return manifest
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Export the public catalogs as static JSON')
+    parser.add_argument('--dir', default=CATALOG_EXPORT_DIR, help='output directory')
+    parser.add_argument('--url', default=CATALOG_EXPORT_URL, help='URL prefix written into the manifest')
+    parser.add_argument('--max-age', type=int, default=CATALOG_EXPORT_MAX_AGE,
+                        help='seconds to keep files dropped from the manifest (its max-age downstream)')
+    args = parser.parse_args()
+    run_export(args.dir, args.url, args.max_age)